@@ -1,6 +1,7 @@
 from typing import Dict, List
 from langchain_core.messages import HumanMessage
 import json 
+from agents.profile_agent import prompt_profile
 
 class ApplicationAgent:
     """Handles resume tailoring, cover letters, applications"""
@@ -34,7 +35,7 @@ class ApplicationAgent:
         
         prompt = f"""Create ATS-optimized resume sections based on this profile:
         
-        {json.dumps(profile)}
+        {json.dumps(prompt_profile(profile))}
         
         Focus on:
         1. Strong action verbs
@@ -53,7 +54,7 @@ class ApplicationAgent:
         
         prompt = f"""Write a compelling cover letter for:
         
-        Candidate: {json.dumps(profile)}
+        Candidate: {json.dumps(prompt_profile(profile))}
         
         Make it:
         - Specific and personal
@@ -11,7 +11,7 @@ class InterviewAgent:
     async def process(self, state: Dict) -> Dict:
         """Conduct interview practice"""
         
-        target_role = state.get("target_roles", ["Software Engineer"])[0]
+        target_role = (state.get("target_roles") or ["Software Engineer"])[0]
         skills = state.get("current_skills", [])
         
         # Generate interview questions
@@ -26,6 +26,7 @@ I'll ask you {len(questions)} questions. Take your time with each answer.
 Type your answer when ready!"""
         
         state["final_response"] = response
+        state["interview_session"] = {"role": target_role, "transcript": questions}
         state["next_agent"] = "end"
         
         return state
@@ -1,11 +1,19 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from langchain_core.messages import HumanMessage
 import json
+from config import get_settings
+from services.singleflight import get_singleflight
+from services.deadline import Deadline, DeadlineExceeded, has_budget, run_with_deadline
+
+settings = get_settings()
+
 class LearningPathAgent:
     """Creates personalized learning roadmaps"""
     
     def __init__(self, llm):
         self.llm = llm
+        # Users with the same gap skill share one in-flight resource lookup
+        self._resources_flight = get_singleflight("learning_resources")
     
     async def process(self, state: Dict) -> Dict:
         """Generate personalized learning plan"""
@@ -13,13 +21,17 @@ class LearningPathAgent:
         skills = state.get("current_skills", [])
         gaps = state.get("skill_gaps", [])
         target_roles = state.get("target_roles", [])
+        deadline = Deadline.from_state(state)
         
         # Generate learning roadmap
-        roadmap = await self._create_roadmap(skills, gaps, target_roles)
+        try:
+            roadmap = await run_with_deadline(self._create_roadmap(skills, gaps, target_roles), deadline)
+        except DeadlineExceeded:
+            roadmap = {"weeks": [], "milestones": []}
         state["learning_plan"] = roadmap
         
         # Find resources
-        resources = await self._find_learning_resources(gaps)
+        resources = await self._find_learning_resources(gaps, deadline)
         roadmap["resources"] = resources
         
         # Generate response
@@ -69,37 +81,58 @@ class LearningPathAgent:
         except:
             return {"weeks": [], "milestones": []}
     
-    async def _find_learning_resources(self, gaps: List[Dict]) -> List[Dict]:
+    async def _find_learning_resources(
+        self,
+        gaps: List[Dict],
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
         """Find free learning resources"""
         
         resources = []
         
         for gap in gaps[:5]:
+            # Resources are a nice-to-have; stop looking when the budget runs low
+            if not has_budget(settings.deadline_step_min_seconds, deadline):
+                break
             skill = gap.get("skill", "")
-            
-            prompt = f"""Find the top 3 FREE learning resources for: {skill}
-            
-            Return as JSON array:
-            [{{
-              "title": "Python Crash Course",
-              "platform": "YouTube",
-              "url": "https://...",
-              "type": "video",
-              "duration": "4 hours"
-            }}]
-            
-            Return ONLY valid JSON array."""
-            
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
-            
             try:
-                skill_resources = json.loads(response.content)
-                resources.extend(skill_resources)
-            except:
-                pass
+                skill_resources = await run_with_deadline(self._resources_flight.do(
+                    skill.strip().lower(),
+                    lambda: self._fetch_skill_resources(skill)
+                ), deadline)
+            except DeadlineExceeded:
+                break
+            resources.extend(
+                dict(resource) if isinstance(resource, dict) else resource
+                for resource in skill_resources
+            )
         
         return resources
     
+    async def _fetch_skill_resources(self, skill: str) -> List[Dict]:
+        """Ask the LLM for free resources for one skill"""
+        
+        prompt = f"""Find the top 3 FREE learning resources for: {skill}
+        
+        Return as JSON array:
+        [{{
+          "title": "Python Crash Course",
+          "platform": "YouTube",
+          "url": "https://...",
+          "type": "video",
+          "duration": "4 hours"
+        }}]
+        
+        Return ONLY valid JSON array."""
+        
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        
+        try:
+            skill_resources = json.loads(response.content)
+            return skill_resources if isinstance(skill_resources, list) else []
+        except:
+            return []
+    
     async def _generate_response(self, roadmap: Dict) -> str:
         """Generate user-friendly roadmap"""
         
@@ -1,10 +1,17 @@
 
 from typing import Dict, List, Any
 from langchain_core.messages import HumanMessage
-from firecrawl import FirecrawlApp
 import httpx
 import json
+from urllib.parse import urlsplit
 from config import get_settings
+from services.singleflight import get_singleflight
+from services.deadline import Deadline, DeadlineExceeded, has_budget, run_with_deadline
+from services.embeddings import embedding_matching_enabled, get_embedding_pipeline
+from services.job_ingestion import get_ingestion_pipeline
+from services.dedup import dedupe_jobs
+from services.search_planner import SearchFanout, plan_queries
+from services.trend_cache import canonical_skills, get_trend_cache
 
 settings = get_settings()
 
@@ -13,23 +20,66 @@ class MarketIntelligenceAgent:
     
     def __init__(self, llm):
         self.llm = llm
-        self.firecrawl = FirecrawlApp(api_key=settings.firecrawl_api_key) if settings.firecrawl_api_key else None
+        # Full postings crawled through Firecrawl replace search snippets once ingested
+        self.ingestion = get_ingestion_pipeline()
+        # Identical concurrent searches / trend prompts share one upstream call
+        self._search_flight = get_singleflight("serper_search")
+        self._trends_flight = get_singleflight("market_trends")
+        self.trend_cache = get_trend_cache()
+        # Candidate retrieval; also replaces per-job LLM scoring when embeddings are enabled
+        self.embeddings = get_embedding_pipeline()
     
     async def process(self, state: Dict) -> Dict:
         """Find and analyze job opportunities using 2025 intelligence tools"""
         
         skills = state.get("current_skills", [])
         target_roles = state.get("target_roles", [])
+        deadline = Deadline.from_state(state)
         
-        # Search for jobs using Serper
-        jobs = await self._search_jobs_serper(skills, target_roles)
-        state["job_matches"] = jobs
+        # Search for jobs using Serper; the fan-out returns what it has when the deadline hits
+        jobs = await self._search_jobs_serper(skills, target_roles, state.get("user_profile"))
         
-        # Analyze market trends
-        trends = await self._analyze_market_trends(skills)
+        # Use already-crawled postings; new URLs are crawled in the background
+        try:
+            jobs = await run_with_deadline(self.ingestion.enrich(jobs), deadline)
+        except DeadlineExceeded:
+            pass
         
-        # Calculate fit scores using reasoning
-        scored_jobs = await self._score_job_matches(jobs, skills)
+        # One entry per role: syndicated copies become alternate URLs, not extra scoring calls
+        jobs = dedupe_jobs(jobs)
+        
+        # Rank candidates through the job index before any LLM work
+        candidates = jobs
+        try:
+            ranked = await run_with_deadline(
+                self._candidate_jobs(jobs, skills, target_roles),
+                deadline
+            )
+            if ranked:
+                candidates = ranked
+        except DeadlineExceeded:
+            pass
+        except Exception as e:
+            print(f"Error ranking job candidates: {e}")
+        state["job_matches"] = candidates
+        
+        # Market trends: precomputed by the background refresher; generate live only for
+        # unseen skill combinations, and only when the budget allows
+        trends = await self.trend_cache.get(skills) or ""
+        if not trends and has_budget(settings.deadline_trends_min_seconds, deadline):
+            try:
+                trends = await run_with_deadline(self._analyze_market_trends(skills), deadline)
+            except DeadlineExceeded:
+                trends = ""
+        
+        # Vector similarity is the fit score when embeddings are enabled; otherwise
+        # the LLM scores the top candidates, returning them unscored when out of time
+        scored_jobs = candidates[:5]
+        if not embedding_matching_enabled() and has_budget(settings.deadline_step_min_seconds, deadline):
+            try:
+                scored_jobs = await run_with_deadline(self._score_job_matches(candidates, skills), deadline)
+            except DeadlineExceeded:
+                scored_jobs = sorted(candidates[:5], key=lambda x: x.get("fit_score", 0), reverse=True)
         
         # Generate response
         response = await self._generate_response(scored_jobs, trends)
@@ -42,45 +92,65 @@ class MarketIntelligenceAgent:
     async def _search_jobs_serper(
         self,
         skills: List[str],
-        roles: List[str]
+        roles: List[str],
+        profile: Dict = None
     ) -> List[Dict]:
-        """Search for jobs using Serper.dev API"""
+        """Search for jobs using Serper.dev API: several targeted queries, merged and ranked"""
         
         if not settings.serper_api_key:
             return self._fallback_jobs()
-            
-        query = f"{' '.join(roles[:2])} {' '.join(skills[:2])} jobs"
+        
+        profile = profile or {}
+        queries = plan_queries(skills, roles, profile.get("experience_level"), profile.get("preferred_locations"))
+        jobs = await SearchFanout(self._search_page).run(queries)
+        return jobs[:settings.job_search_max_results] or self._fallback_jobs()
+
+    async def _search_page(self, query: Dict, page: int) -> List[Dict]:
+        """One page of one planned query; identical concurrent requests share a call"""
+        key = (query["q"], query.get("location"), page)
+        return await self._search_flight.do(
+            key,
+            lambda: self._fetch_serper(query["q"], query.get("location"), page)
+        )
+
+    async def _fetch_serper(self, query: str, location: str = None, page: int = 1) -> List[Dict]:
+        """Run a single Serper search request"""
         url = "https://google.serper.dev/search"
         
-        payload = json.dumps({
+        body = {
             "q": query,
             "gl": "us",
             "hl": "en",
-            "autocorrect": True
-        })
+            "autocorrect": True,
+            "page": page
+        }
+        if location:
+            body["location"] = location
+        payload = json.dumps(body)
         headers = {
             'X-API-KEY': settings.serper_api_key,
             'Content-Type': 'application/json'
         }
         
         async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, data=payload)
+            response = await run_with_deadline(client.post(url, headers=headers, data=payload))
             if response.status_code == 200:
                 results = response.json()
                 # Parse search results into job objects
                 jobs = []
-                for result in results.get("organic", [])[:10]:
+                for result in results.get("organic", []):
                     jobs.append({
                         "title": result.get("title", "Unknown Role"),
                         "company": result.get("snippet", "").split("-")[0].strip(),
-                        "location": "See link",
+                        "location": location or "See link",
                         "description": result.get("snippet", ""),
                         "posted": "Recent",
                         "url": result.get("link", "")
                     })
                 return jobs
+            print(f"Serper search failed ({response.status_code}) for '{query}'")
         
-        return self._fallback_jobs()
+        return []
 
     def _fallback_jobs(self) -> List[Dict]:
         return [
@@ -115,7 +185,13 @@ class MarketIntelligenceAgent:
             
             Return ONLY a number 0-100."""
             
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            try:
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            except Exception as e:
+                # Upstream still failing after retries: leave the job unscored
+                # rather than inventing a score
+                print(f"Error scoring job '{job['title']}': {e}")
+                continue
             
             try:
                 score_text = response.content.strip()
@@ -127,8 +203,43 @@ class MarketIntelligenceAgent:
         
         return sorted(top_jobs, key=lambda x: x.get("fit_score", 0), reverse=True)
     
+    async def _candidate_jobs(
+        self,
+        jobs: List[Dict],
+        skills: List[str],
+        roles: List[str]
+    ) -> List[Dict]:
+        """Index fresh search results, then rank all known postings by vector similarity"""
+        
+        await self.embeddings.index_jobs(jobs)
+        matches = await self.embeddings.match_jobs(skills, roles, k=settings.embedding_match_k)
+        # The store keeps one row per URL; carry over alternates found in this search
+        alternates = {job["url"]: job["alternate_urls"] for job in jobs if job.get("alternate_urls")}
+        for job in matches:
+            if job.get("url") in alternates:
+                job["alternate_urls"] = alternates[job["url"]]
+        matches = dedupe_jobs(matches)
+        for job in matches:
+            job["company"] = job.get("company") or "Unknown"
+            job["description"] = job.get("description") or ""
+            if not embedding_matching_enabled():
+                # Similarity only orders candidates here; the LLM assigns fit scores
+                job.pop("fit_score", None)
+        return matches
+    
     async def _analyze_market_trends(self, skills: List[str]) -> str:
-        """Analyze current market demand"""
+        """Analyze current market demand (live), caching the result for the skill set"""
+        
+        key = tuple(canonical_skills(skills))
+        return await self._trends_flight.do(key, lambda: self._generate_and_cache_trends(skills))
+    
+    async def _generate_and_cache_trends(self, skills: List[str]) -> str:
+        trends = await self._generate_market_trends(skills)
+        await self.trend_cache.put(skills, trends)
+        return trends
+    
+    async def _generate_market_trends(self, skills: List[str]) -> str:
+        """Ask the LLM for a market trend analysis"""
         
         prompt = f"""Analyze the 2025 job market trends for someone with these skills: {skills}
         
@@ -142,9 +253,25 @@ class MarketIntelligenceAgent:
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
         return response.content
     
+    async def _generate_skill_trend(self, skill: str) -> str:
+        """Ask the LLM for a short market outlook on one skill"""
+        
+        prompt = f"""In 2-3 sentences, summarize the 2025 job market outlook for the skill "{skill}":
+        demand, salary impact and how AI is changing its use. Be concise."""
+        
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return response.content
+    
+    async def refresh_trends(self) -> Dict[str, int]:
+        """Regenerate stale cached trend analyses (run by the background worker)"""
+        return await self.trend_cache.refresh(self._generate_market_trends, self._generate_skill_trend)
+    
     async def _generate_response(self, jobs: List[Dict], trends: str) -> str:
         """Generate user-friendly response with 2025 insights"""
         
+        if not trends:
+            trends = "_Market trend analysis skipped to keep this response fast._"
+        
         response = f"""## 📊 Market Intelligence Insights
         
 {trends}
@@ -157,7 +284,10 @@ class MarketIntelligenceAgent:
    - **Fit Score:** {job.get('fit_score', 'N/A')}%
    - **Insight:** {job['description'][:150]}...
    - [Apply Now]({job['url']})
-
 """
+            if job.get("alternate_urls"):
+                boards = sorted({urlsplit(url).netloc.removeprefix("www.") for url in job["alternate_urls"]})
+                response += f"   - **Also listed on:** {', '.join(boards)}\n"
+            response += "\n"
         
         return response
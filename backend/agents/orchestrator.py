@@ -1,10 +1,10 @@
 # Create the orchestrator with full code
-from typing import Dict, Any, List, Union
+import asyncio
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Union
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
 from langgraph.graph import StateGraph, END, START
-from langgraph.checkpoint.memory import MemorySaver
 
 from agents.profile_agent import ProfileAgent
 from agents.market_agent import MarketIntelligenceAgent
@@ -14,6 +14,14 @@ from agents.interview_agent import InterviewAgent
 from agents.feedback_agent import FeedbackAgent
 from services.memory import MemoryService
 from services.supabase_client import supabase_client
+from services.rate_limiter import RateLimitedLLM, get_limiter
+from services.hedging import HedgedLLM
+from services.match_refresher import profile_fingerprint
+from services.skills import canonicalize_skills
+from services.checkpoints import get_checkpointer
+from services.deadline import (
+    Deadline, DeadlineExceeded, current_deadline, deadline_scope, run_with_deadline
+)
 from config import get_settings
 
 settings = get_settings()
@@ -28,28 +36,90 @@ class AgentState(Dict[str, Any]):
     target_roles: List[str]
     job_matches: List[Dict[str, Any]]
     learning_plan: Dict[str, Any]
+    interview_session: Dict[str, Any]  # set when the interview agent starts a mock interview
     next_agent: str
     final_response: str
+    deadline: float  # absolute epoch seconds; every node gets whatever budget remains
+
+class ChatSession:
+    """Context for one live conversation, loaded once and kept warm between turns.
+
+    Holds the profile, the most recent turns and the progress agents produced
+    (skills, gaps, learning plan, the interview in progress), so later turns
+    build their state without touching the database.
+    """
+    
+    def __init__(self, user_id: str, session_id: str, profile: Dict[str, Any], history: List[BaseMessage]):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.history = history
+        self.skill_gaps: List[Dict[str, Any]] = []
+        self.learning_plan: Dict[str, Any] = {}
+        self.interview: Optional[Dict[str, Any]] = None
+        self.turns = 0
+        self.set_profile(profile)
+    
+    def set_profile(self, profile: Dict[str, Any]):
+        self.profile = profile
+        self.skills = canonicalize_skills(profile.get("skills", []))
+        # Set when the profile row changed elsewhere (change feed); reloaded before the next turn
+        self.profile_stale = False
+    
+    def state(self, message: str, deadline: Deadline) -> AgentState:
+        return AgentState(
+            user_id=self.user_id,
+            messages=self.history + [HumanMessage(content=message)],
+            user_profile=self.profile,
+            current_skills=self.skills,
+            skill_gaps=self.skill_gaps,
+            target_roles=self.profile.get("target_roles", []),
+            job_matches=[],
+            learning_plan=self.learning_plan,
+            interview_session=self.interview,
+            next_agent="",
+            final_response="",
+            deadline=deadline.expires_at
+        )
+    
+    def remember(self, message: str, result: Dict[str, Any]):
+        """Fold a finished turn into the warm context"""
+        self.history = (self.history + [
+            HumanMessage(content=message),
+            AIMessage(content=result["final_response"])
+        ])[-2 * settings.chat_session_history_turns:]
+        self.skills = result.get("current_skills") or self.skills
+        self.skill_gaps = result.get("skill_gaps") or self.skill_gaps
+        self.learning_plan = result.get("learning_plan") or self.learning_plan
+        self.interview = result.get("interview_session") or self.interview
+        self.turns += 1
 
 class CareerOrchestrator:
     """Main orchestrator that coordinates all specialized agents using Swarm & MCP patterns"""
     
     def __init__(self):
         # Initialize LLMs according to 2025 Tech Stack
+        # Retries are owned by the per-provider limiters, so client retries are off
         # DeepSeek R1 for complex reasoning
-        self.reasoning_llm = ChatOpenAI(
+        deepseek = RateLimitedLLM(ChatOpenAI(
             model="deepseek-reasoner",
             openai_api_key=settings.deepseek_api_key,
-            base_url="https://api.deepseek.com",
-            temperature=0
-        )
+            base_url=settings.deepseek_base_url,
+            temperature=0,
+            max_retries=0
+        ), get_limiter("deepseek"))
         
         # Groq Llama 3.3 for ultra-fast responses (700+ t/s)
-        self.fast_llm = ChatGroq(
+        groq = RateLimitedLLM(ChatGroq(
             model="llama-3.3-70b-versatile",
             temperature=0.7,
-            groq_api_key=settings.groq_api_key
-        )
+            groq_api_key=settings.groq_api_key,
+            base_url=settings.groq_base_url or None,
+            max_retries=0
+        ), get_limiter("groq"))
+        
+        # Each model hedges to / fails over to the other provider
+        self.reasoning_llm = HedgedLLM("deepseek", deepseek, "groq", groq)
+        self.fast_llm = HedgedLLM("groq", groq, "deepseek", deepseek)
         
         # Default LLM
         self.llm = self.fast_llm
@@ -116,9 +186,8 @@ class CareerOrchestrator:
                 }
             )
         
-        # Compile with memory
-        checkpointer = MemorySaver()
-        return workflow.compile(checkpointer=checkpointer)
+        # Compile with checkpoints shared across workers
+        return workflow.compile(checkpointer=get_checkpointer())
     
     async def _route_request(self, state: AgentState) -> AgentState:
         """Intelligent routing using Swarm-like handover logic"""
@@ -139,54 +208,94 @@ class CareerOrchestrator:
         Respond with ONLY the agent name."""
         
         # Use reasoning model for better routing
-        response = await self.reasoning_llm.ainvoke([
-            SystemMessage(content="You are a routing expert. Respond with exactly one word."),
-            HumanMessage(content=routing_prompt)
-        ])
+        try:
+            response = await run_with_deadline(self.reasoning_llm.ainvoke([
+                SystemMessage(content="You are a routing expert. Respond with exactly one word."),
+                HumanMessage(content=routing_prompt)
+            ]), Deadline.from_state(state))
+        except DeadlineExceeded:
+            state["next_agent"] = "end"
+            state["final_response"] = self._timeout_response()
+            return state
         
         state["next_agent"] = response.content.strip().lower()
         return state
     
+    def _timeout_response(self) -> str:
+        return ("I'm taking longer than usual to put this together. "
+                "Please try again in a moment, or ask a narrower question.")
+    
+    def _request_deadline(self) -> Deadline:
+        """Deadline set at the API layer, or a fresh one for direct callers"""
+        return current_deadline() or Deadline.after(settings.request_timeout_seconds)
+    
     def _determine_next_agent(self, state: AgentState) -> str:
         """Determine next agent or end"""
         agent = state.get("next_agent", "end")
         if agent not in ["profile", "market", "learning", "application", "interview", "feedback", "router"]:
-            return END
+            # The edge maps route the "end" key to END
+            return "end"
         return agent
 
     
+    async def open_session(self, user_id: str, session_id: str) -> "ChatSession":
+        """Load a user's profile and recent history once, for a run of turns"""
+        user_profile, conversation_history = await asyncio.gather(
+            self.memory.get_user_profile(user_id),
+            self.memory.get_conversation_history(user_id, session_id, limit=settings.chat_session_history_turns)
+        )
+        return ChatSession(user_id, session_id, user_profile, conversation_history)
+    
     async def process_message(
         self,
         user_id: str,
         message: str,
-        session_id: str
+        session_id: str,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """Process user message through agent system"""
         
-        # Load user profile and history
-        user_profile = await self.memory.get_user_profile(user_id)
-        conversation_history = await self.memory.get_conversation_history(user_id, session_id)
+        deadline = deadline or self._request_deadline()
+        with deadline_scope(deadline):
+            # Load user profile and history
+            session = await self.open_session(user_id, session_id)
+            return await self.process_turn(session, message, deadline)
+    
+    async def process_turn(
+        self,
+        session: "ChatSession",
+        message: str,
+        deadline: Optional[Deadline] = None,
+        on_event: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Run one message against a warm session. Nothing is read, unless the profile
+        was edited elsewhere meanwhile. Only the new turn (plus a newly started
+        interview) is written back.
         
-        # Initialize state
-        state = AgentState(
-            user_id=user_id,
-            messages=conversation_history + [HumanMessage(content=message)],
-            user_profile=user_profile,
-            current_skills=user_profile.get("skills", []),
-            skill_gaps=[],
-            target_roles=user_profile.get("target_roles", []),
-            job_matches=[],
-            learning_plan={},
-            next_agent="",
-            final_response=""
-        )
+        on_event(node, state) is awaited as each graph node finishes.
+        """
         
-        # Run through workflow
-        config = {"configurable": {"thread_id": session_id}}
-        result = await self.workflow.ainvoke(state, config)
+        deadline = deadline or self._request_deadline()
+        with deadline_scope(deadline):
+            if session.profile_stale:
+                session.set_profile(await self.memory.get_user_profile(session.user_id))
+            state = session.state(message, deadline)
+            
+            # Run through workflow
+            config = {"configurable": {"thread_id": session.session_id}}
+            try:
+                result = await run_with_deadline(self._run_workflow(state, config, on_event), deadline)
+            except DeadlineExceeded:
+                result = dict(state, final_response=self._timeout_response(), next_agent="end")
         
-        # Save conversation
-        await self.memory.save_message(user_id, session_id, message, result["final_response"])
+        # Writes get their own small budget: a turn that used up the request
+        # deadline (and its timeout reply) must still be saved
+        with deadline_scope(Deadline.after(settings.deadline_write_grace_seconds)):
+            await self.memory.save_message(session.user_id, session.session_id, message, result["final_response"])
+            interview = result.get("interview_session")
+            if interview and interview != session.interview:
+                await self.memory.save_interview_session(session.user_id, interview["role"], interview["transcript"])
+            session.remember(message, result)
         
         return {
             "response": result["final_response"],
@@ -198,39 +307,74 @@ class CareerOrchestrator:
             }
         }
     
+    async def _run_workflow(
+        self,
+        state: AgentState,
+        config: Dict[str, Any],
+        on_event: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        if on_event is None:
+            return await self.workflow.ainvoke(state, config)
+        
+        result = dict(state)
+        async for update in self.workflow.astream(state, config, stream_mode="updates"):
+            for node, values in update.items():
+                if values:
+                    result.update(values)
+                await on_event(node, result)
+        return result
+    
     async def analyze_profile(self, user_id: str, profile_data: Dict) -> Dict:
         """Full profile analysis"""
         state = AgentState(
             user_id=user_id,
             messages=[],
             user_profile=profile_data,
-            current_skills=profile_data.get("skills", []),
+            current_skills=canonicalize_skills(profile_data.get("skills", [])),
             skill_gaps=[],
             target_roles=[],
             job_matches=[],
             learning_plan={},
             next_agent="profile",
-            final_response=""
+            final_response="",
+            deadline=self._request_deadline().expires_at
         )
         
         result = await self.profile_agent.process(state)
         return result
     
-    async def find_job_matches(self, user_id: str) -> List[Dict]:
-        """Find matching jobs"""
+    async def find_job_matches(self, user_id: str, refresh: bool = False) -> List[Dict]:
+        """Find matching jobs, served from the materialized job_matches table.
+        
+        Matches are recomputed only when none are stored, the profile's skills or
+        target roles changed since they were computed, or refresh is requested.
+        """
         user_profile = await self.memory.get_user_profile(user_id)
+        fingerprint = profile_fingerprint(user_profile)
         
+        if not refresh:
+            stored = await self.memory.get_job_matches(user_id)
+            if stored and stored[0].get("profile_fingerprint") == fingerprint:
+                return stored
+        
+        jobs = await self.compute_job_matches(user_id, user_profile)
+        await self.memory.save_job_matches(user_id, jobs, fingerprint)
+        return jobs
+    
+    async def compute_job_matches(self, user_id: str, user_profile: Dict) -> List[Dict]:
+        """Search and score jobs for a profile (no persistence)"""
         state = AgentState(
             user_id=user_id,
             messages=[],
             user_profile=user_profile,
-            current_skills=user_profile.get("skills", []),
+            current_skills=canonicalize_skills(user_profile.get("skills", [])),
             skill_gaps=[],
             target_roles=user_profile.get("target_roles", []),
             job_matches=[],
             learning_plan={},
             next_agent="market",
-            final_response=""
+            final_response="",
+            deadline=self._request_deadline().expires_at
         )
         
         result = await self.market_agent.process(state)
@@ -244,13 +388,14 @@ class CareerOrchestrator:
             user_id=user_id,
             messages=[],
             user_profile=user_profile,
-            current_skills=user_profile.get("skills", []),
+            current_skills=canonicalize_skills(user_profile.get("skills", [])),
             skill_gaps=[],
             target_roles=user_profile.get("target_roles", []),
             job_matches=[],
             learning_plan={},
             next_agent="learning",
-            final_response=""
+            final_response="",
+            deadline=self._request_deadline().expires_at
         )
         
         result = await self.learning_agent.process(state)
@@ -264,13 +409,14 @@ class CareerOrchestrator:
             user_id=user_id,
             messages=[HumanMessage(content=f"Practice interview for {target_role}")],
             user_profile=user_profile,
-            current_skills=user_profile.get("skills", []),
+            current_skills=canonicalize_skills(user_profile.get("skills", [])),
             skill_gaps=[],
             target_roles=[target_role],
             job_matches=[],
             learning_plan={},
             next_agent="interview",
-            final_response=""
+            final_response="",
+            deadline=self._request_deadline().expires_at
         )
         
         result = await self.interview_agent.process(state)
@@ -4,6 +4,7 @@
 # Install: pip install langgraph langchain-groq langchain-core
 # ============================================
 
+import asyncio
 from typing import TypedDict, Annotated, List, Dict, Any
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage
@@ -11,6 +12,9 @@ from langchain_groq import ChatGroq
 import os
 from datetime import datetime
 
+from services.intents import get_intent_matcher
+from services.rate_limiter import RateLimitedLLM, get_limiter
+
 # ============================================
 # State Definition
 # ============================================
@@ -34,12 +38,13 @@ def get_llm():
     api_key = os.getenv("GROQ_API_KEY") or os.getenv("DEEPSEEK_API_KEY")
     
     if os.getenv("GROQ_API_KEY"):
-        return ChatGroq(
+        # Shares the process-wide Groq limiter with the main orchestrator
+        return RateLimitedLLM(ChatGroq(
             api_key=api_key,
             model="llama-3.3-70b-versatile",
             temperature=0.7,
             max_tokens=1000
-        )
+        ), get_limiter("groq"))
     else:
         # Fallback to mock for demo
         return None
@@ -53,27 +58,16 @@ class IntentClassifier:
     
     def __init__(self, llm):
         self.llm = llm
-        self.intents = {
-            "profile": ["resume", "cv", "experience", "skills", "analyze profile"],
-            "market": ["job", "hiring", "salary", "market", "opportunities"],
-            "learning": ["learn", "course", "study", "roadmap", "skill development"],
-            "interview": ["interview", "practice", "preparation", "mock interview"],
-            "application": ["apply", "application", "cover letter", "submit"]
-        }
     
     def classify(self, state: AgentState) -> AgentState:
         """Classify user intent"""
-        user_message = state["messages"][-1]["content"].lower()
-        
-        # Simple keyword matching (can be replaced with LLM classification)
-        for intent, keywords in self.intents.items():
-            if any(kw in user_message for kw in keywords):
-                state["intent"] = intent
-                state["current_agent"] = intent
-                return state
+        user_message = state["messages"][-1]["content"]
         
-        state["intent"] = "general"
-        state["current_agent"] = "orchestrator"
+        # Weighted keyword matching (can be replaced with LLM classification)
+        intent, confidence = get_intent_matcher().classify(user_message)
+        state["intent"] = intent
+        state["current_agent"] = intent if intent != "general" else "orchestrator"
+        state["metadata"]["intent_confidence"] = confidence
         return state
 
 class ProfileAgentNode:
@@ -82,7 +76,7 @@ class ProfileAgentNode:
     def __init__(self, llm):
         self.llm = llm
     
-    def process(self, state: AgentState) -> AgentState:
+    async def process(self, state: AgentState) -> AgentState:
         """Process profile-related queries"""
         user_message = state["messages"][-1]["content"]
         
@@ -91,7 +85,7 @@ class ProfileAgentNode:
         encouraging, and data-driven."""
         
         if self.llm:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ])
@@ -131,7 +125,7 @@ class MarketAgentNode:
     def __init__(self, llm):
         self.llm = llm
     
-    def process(self, state: AgentState) -> AgentState:
+    async def process(self, state: AgentState) -> AgentState:
         """Process job search queries"""
         user_message = state["messages"][-1]["content"]
         
@@ -140,7 +134,7 @@ class MarketAgentNode:
         to user profiles. Be data-driven and realistic."""
         
         if self.llm:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ])
@@ -191,7 +185,7 @@ class LearningAgentNode:
     def __init__(self, llm):
         self.llm = llm
     
-    def process(self, state: AgentState) -> AgentState:
+    async def process(self, state: AgentState) -> AgentState:
         """Process learning-related queries"""
         user_message = state["messages"][-1]["content"]
         
@@ -200,7 +194,7 @@ class LearningAgentNode:
         Be structured, motivating, and focused on practical outcomes."""
         
         if self.llm:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ])
@@ -260,7 +254,7 @@ class InterviewAgentNode:
     def __init__(self, llm):
         self.llm = llm
     
-    def process(self, state: AgentState) -> AgentState:
+    async def process(self, state: AgentState) -> AgentState:
         """Process interview preparation queries"""
         user_message = state["messages"][-1]["content"]
         
@@ -269,7 +263,7 @@ class InterviewAgentNode:
         confidence. Be constructive, encouraging, and thorough."""
         
         if self.llm:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ])
@@ -331,7 +325,7 @@ class ApplicationAgentNode:
     def __init__(self, llm):
         self.llm = llm
     
-    def process(self, state: AgentState) -> AgentState:
+    async def process(self, state: AgentState) -> AgentState:
         """Process application-related queries"""
         user_message = state["messages"][-1]["content"]
         
@@ -340,7 +334,7 @@ class ApplicationAgentNode:
         follow-ups. Be professional, detail-oriented, and strategic."""
         
         if self.llm:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ])
@@ -473,20 +467,20 @@ class CareerAgentOrchestrator:
         """Route to appropriate agent based on intent"""
         return state.get("intent", "general")
     
-    def _profile_agent_node(self, state: AgentState) -> AgentState:
-        return self.agents["profile"].process(state)
+    async def _profile_agent_node(self, state: AgentState) -> AgentState:
+        return await self.agents["profile"].process(state)
     
-    def _market_agent_node(self, state: AgentState) -> AgentState:
-        return self.agents["market"].process(state)
+    async def _market_agent_node(self, state: AgentState) -> AgentState:
+        return await self.agents["market"].process(state)
     
-    def _learning_agent_node(self, state: AgentState) -> AgentState:
-        return self.agents["learning"].process(state)
+    async def _learning_agent_node(self, state: AgentState) -> AgentState:
+        return await self.agents["learning"].process(state)
     
-    def _interview_agent_node(self, state: AgentState) -> AgentState:
-        return self.agents["interview"].process(state)
+    async def _interview_agent_node(self, state: AgentState) -> AgentState:
+        return await self.agents["interview"].process(state)
     
-    def _application_agent_node(self, state: AgentState) -> AgentState:
-        return self.agents["application"].process(state)
+    async def _application_agent_node(self, state: AgentState) -> AgentState:
+        return await self.agents["application"].process(state)
     
     def _default_response_node(self, state: AgentState) -> AgentState:
         """Default response for general queries"""
@@ -515,7 +509,7 @@ What would you like help with today?"""
                              history: List[Dict] = None) -> Dict[str, Any]:
         """Process user message through agent workflow"""
         initial_state = {
-            "messages": history or [] + [{"role": "user", "content": message}],
+            "messages": (history or []) + [{"role": "user", "content": message}],
             "user_id": user_id,
             "current_agent": "",
             "intent": "",
@@ -528,8 +522,8 @@ What would you like help with today?"""
             }
         }
         
-        # Run workflow
-        result = self.workflow.invoke(initial_state)
+        # Run workflow; agent nodes await the LLM, so concurrent chats overlap
+        result = await self.workflow.ainvoke(initial_state)
         
         return {
             "response": result["final_response"],
@@ -541,7 +535,7 @@ What would you like help with today?"""
 # Usage Example
 # ============================================
 
-if __name__ == "__main__":
+async def main():
     # Test the orchestrator
     orchestrator = CareerAgentOrchestrator()
     
@@ -554,6 +548,9 @@ if __name__ == "__main__":
     
     for msg in test_messages:
         print(f"\nUser: {msg}")
-        result = orchestrator.process_message(msg, "test_user")
+        result = await orchestrator.process_message(msg, "test_user")
         print(f"Agent: {result['agent_used']}")
-        print(f"Response: {result['response'][:100]}...")
\ No newline at end of file
+        print(f"Response: {result['response'][:100]}...")
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
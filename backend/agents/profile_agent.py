@@ -1,6 +1,25 @@
 from typing import Dict, List, Any
 from langchain_core.messages import HumanMessage
 import json
+from config import get_settings
+from services.deadline import Deadline, DeadlineExceeded, has_budget, run_with_deadline
+from services.skills import canonicalize_skills, get_skill_dictionary
+
+settings = get_settings()
+
+# Profile fields written by people, in the order they are scanned for skills
+PROFILE_TEXT_FIELDS = (
+    "skills", "target_roles", "career_goal", "experience_level",
+    "resume_text", "experience", "summary"
+)
+# Machine-written fields (768 floats of skill_embeddings) that must not reach a prompt
+NON_PROMPT_FIELDS = {"skill_embeddings"}
+
+
+def prompt_profile(profile: Dict) -> Dict:
+    """The profile as it should be serialized into an LLM prompt"""
+    return {k: v for k, v in profile.items() if k not in NON_PROMPT_FIELDS}
+
 
 class ProfileAgent:
     """Analyzes resumes, extracts skills, identifies gaps"""
@@ -19,19 +38,34 @@ class ProfileAgent:
         
         user_profile = state.get("user_profile", {})
         messages = state.get("messages", [])
+        deadline = Deadline.from_state(state)
         
         # Extract skills from profile
-        skills = await self._extract_skills(user_profile)
+        try:
+            skills = await run_with_deadline(self._extract_skills(user_profile), deadline)
+        except DeadlineExceeded:
+            skills = canonicalize_skills(user_profile.get("skills", []))
         state["current_skills"] = skills
         
         # Analyze career trajectory
-        career_analysis = await self._analyze_career_path(user_profile, skills)
-        
-        # Identify skill gaps for target roles
-        skill_gaps = await self._identify_skill_gaps(
-            skills,
-            state.get("target_roles", [])
-        )
+        try:
+            career_analysis = await run_with_deadline(
+                self._analyze_career_path(user_profile, skills),
+                deadline
+            )
+        except DeadlineExceeded:
+            career_analysis = "_Detailed career analysis is taking longer than expected; ask again for the full write-up._"
+        
+        # Identify skill gaps for target roles (skipped when the budget runs low)
+        skill_gaps = []
+        if has_budget(settings.deadline_step_min_seconds, deadline):
+            try:
+                skill_gaps = await run_with_deadline(
+                    self._identify_skill_gaps(skills, state.get("target_roles", [])),
+                    deadline
+                )
+            except DeadlineExceeded:
+                skill_gaps = []
         state["skill_gaps"] = skill_gaps
         
         # Generate response
@@ -47,13 +81,40 @@ class ProfileAgent:
         return state
     
     async def _extract_skills(self, profile: Dict) -> List[str]:
-        """Extract skills using LLM"""
+        """Extract skills with the skill dictionary; the LLM is only asked for
+        residual skills when the dictionary recognizes too little of the profile"""
+        
+        dictionary = get_skill_dictionary()
+        text = self._profile_text(profile)
+        skills = canonicalize_skills(list(profile.get("skills") or []) + dictionary.extract(text))
+        
+        if dictionary.coverage(text) >= settings.skill_dictionary_min_coverage:
+            return skills
+        
+        residual = await self._extract_residual_skills(profile, skills)
+        return canonicalize_skills(skills + residual)
+    
+    def _profile_text(self, profile: Dict) -> str:
+        """Free-text profile fields (skills, goals, resume, experience) as one document"""
+        parts = []
+        for key in PROFILE_TEXT_FIELDS:
+            value = profile.get(key)
+            if isinstance(value, str):
+                parts.append(value)
+            elif isinstance(value, list):
+                parts.extend(v for v in value if isinstance(v, str))
+        return "\n".join(parts)
+    
+    async def _extract_residual_skills(self, profile: Dict, known: List[str]) -> List[str]:
+        """Ask the LLM only for skills the dictionary did not recognize"""
         
-        prompt = f"""Analyze this profile and extract ALL technical and soft skills.
+        prompt = f"""Analyze this profile and extract technical and soft skills.
         
-        Profile: {json.dumps(profile)}
+        Profile: {json.dumps(prompt_profile(profile))}
         
-        Return a JSON array of skills. Example: ["Python", "React", "Team Leadership"]
+        These skills were already found, do NOT repeat them: {known}
+        
+        Return a JSON array of any OTHER skills. Example: ["Python", "React", "Team Leadership"]
         Return ONLY the JSON array, no other text."""
         
         response = await self.llm.ainvoke([HumanMessage(content=prompt)])
@@ -68,17 +129,17 @@ class ProfileAgent:
             content = content.strip()
             
             skills = json.loads(content)
-            return skills if isinstance(skills, list) else []
+            return [s for s in skills if isinstance(s, str)] if isinstance(skills, list) else []
         except Exception as e:
-            # Fallback: extract from profile
-            return profile.get("skills", [])
+            # Fallback: the dictionary matches stand on their own
+            return []
     
     async def _analyze_career_path(self, profile: Dict, skills: List[str]) -> str:
         """Analyze career trajectory and provide insights"""
         
         prompt = f"""Analyze this career profile and provide insights:
         
-        Profile: {json.dumps(profile)}
+        Profile: {json.dumps(prompt_profile(profile))}
         Skills: {skills}
         
         Provide:
@@ -0,0 +1,79 @@
+# ============================================
+# backend/benchmarks/auth.py
+# get_current_user latency with and without the verified-token and user caches
+# User records are read from a SQLite storage file, standing in for the database lookup
+# Usage: python -m benchmarks.auth --users 1000 --requests 20000
+# ============================================
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from benchmarks.load_test import percentile
+from services import auth, storage
+
+
+def issue_tokens(users: int, secret: str, algorithm: str) -> list:
+    exp = int(time.time()) + 3600
+    return [
+        jwt.encode({"sub": f"user-{i}", "email": f"user{i}@example.com", "exp": exp}, secret, algorithm=algorithm)
+        for i in range(users)
+    ]
+
+
+async def measure(tokens: list, requests: int, cached: bool, rng: random.Random) -> dict:
+    for cache in (auth.token_cache, auth.user_cache):
+        cache.clear()
+        cache.hits = cache.misses = 0
+    latencies = []
+    for _ in range(requests):
+        if not cached:
+            auth.token_cache.clear()
+            auth.user_cache.clear()
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=rng.choice(tokens))
+        start = time.perf_counter()
+        await auth.get_current_user(credentials)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": round(sum(latencies) / len(latencies), 4),
+        "caches": auth.auth_cache_stats(),
+    }
+
+
+async def run(args) -> dict:
+    settings = auth.settings
+    settings.jwt_secret_key = settings.jwt_secret_key or "benchmark-secret"
+    path = os.path.join(tempfile.mkdtemp(prefix="career-auth-"), "career.db")
+    storage._storage = storage.SQLiteStorage(path)
+    for i in range(args.users):
+        await storage._storage.save_profile(f"user-{i}", {"skills": ["Python"], "created_at": "2025-01-01T00:00:00"})
+
+    rng = random.Random(args.seed)
+    tokens = issue_tokens(args.users, settings.jwt_secret_key, settings.jwt_algorithm)
+    uncached = await measure(tokens, args.requests, cached=False, rng=rng)
+    cached = await measure(tokens, args.requests, cached=True, rng=rng)
+    return {
+        "users": args.users,
+        "requests": args.requests,
+        "uncached": uncached,
+        "cached": cached,
+        "speedup_p50": round(uncached["p50_ms"] / cached["p50_ms"], 1) if cached["p50_ms"] else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth latency with and without caches")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
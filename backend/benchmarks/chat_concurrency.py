@@ -0,0 +1,95 @@
+# ============================================
+# backend/benchmarks/chat_concurrency.py
+# Parallel chats through the LangGraph orchestrator with a simulated-latency LLM
+# Usage:
+#   python -m benchmarks.chat_concurrency --chats 20 --latency 0.5
+#   python -m benchmarks.chat_concurrency --chats 20 --latency 0.5 --blocking
+# ============================================
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents.orchestrator_langgraph import CareerAgentOrchestrator
+
+MESSAGES = [
+    "Help me improve my resume",
+    "Find me software engineer jobs",
+    "Create a learning plan for me",
+    "Practice interview questions with me",
+    "Write a cover letter for my application",
+]
+
+
+class SimulatedLLM:
+    """Answers after a fixed delay. blocking=True sleeps on the event loop thread,
+    like calling a synchronous client (llm.invoke) from an async node."""
+
+    def __init__(self, latency: float, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.calls = 0
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        return type("Response", (), {"content": f"simulated answer to: {messages[-1]['content']}"})()
+
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst delay of a periodic tick: how long the event loop was frozen"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(args) -> dict:
+    orchestrator = CareerAgentOrchestrator()
+    llm = SimulatedLLM(args.latency, args.blocking)
+    for agent in orchestrator.agents.values():
+        agent.llm = llm
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    latencies = []
+
+    async def chat(i: int):
+        start = time.perf_counter()
+        await orchestrator.process_message(MESSAGES[i % len(MESSAGES)], f"bench_user_{i}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chat(i) for i in range(args.chats)))
+    wall = time.perf_counter() - start
+    stop.set()
+    worst_lag = await lag
+
+    serial = llm.calls * args.latency
+    return {
+        "chats": args.chats,
+        "llm_calls": llm.calls,
+        "llm_latency_seconds": args.latency,
+        "blocking_llm": args.blocking,
+        "wall_seconds": round(wall, 3),
+        "serial_llm_seconds": round(serial, 3),
+        # ~chats when requests overlap, ~1 when they run one at a time
+        "overlap": round(serial / wall, 2) if wall else None,
+        "p50_chat_seconds": round(sorted(latencies)[len(latencies) // 2], 3),
+        "max_chat_seconds": round(max(latencies), 3),
+        "max_event_loop_lag_seconds": round(worst_lag, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chats through the LangGraph orchestrator")
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    parser.add_argument("--blocking", action="store_true", help="Simulate a blocking LLM client for comparison")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
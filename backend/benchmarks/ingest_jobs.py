@@ -0,0 +1,86 @@
+# ============================================
+# backend/benchmarks/ingest_jobs.py
+# Drives the Firecrawl ingestion pipeline against the local stub server
+# Usage:
+#   uvicorn benchmarks.stub_servers:app --port 9000
+#   python -m benchmarks.ingest_jobs --firecrawl-url http://localhost:9000 --urls 200 --domains 8
+# ============================================
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from config import get_settings
+from services.embeddings import EmbeddingPipeline, HashingEmbedder
+from services.vector_store import InMemoryJobStore
+
+settings = get_settings()
+
+
+def search_result_urls(n: int, domains: int, duplicate_rate: float, rng: random.Random):
+    """Search-result style URLs: tracking params, repeats and postings syndicated across boards"""
+    urls = []
+    for i in range(n):
+        posting_id = i
+        if urls and rng.random() < duplicate_rate:
+            # The same posting seen again, on the same or another board
+            posting_id = rng.randrange(i)
+        domain = f"jobs{rng.randrange(domains)}.example.com"
+        urls.append(f"https://{domain}/view/{posting_id}?utm_source=serper&trk={rng.randrange(1000)}")
+    return urls
+
+
+async def run(args) -> dict:
+    # Point the pipeline at the stub before anything reads the settings
+    settings.firecrawl_api_url = args.firecrawl_url
+    settings.firecrawl_api_key = settings.firecrawl_api_key or "stub"
+    settings.firecrawl_rpm = args.rpm
+    settings.firecrawl_max_concurrency = args.concurrency
+    settings.firecrawl_domain_interval_seconds = args.domain_interval
+    from services.job_ingestion import JobIngestionPipeline
+
+    store = InMemoryJobStore(settings.embedding_dim)
+    pipeline = JobIngestionPipeline(EmbeddingPipeline(store, HashingEmbedder(settings.embedding_dim)))
+    urls = search_result_urls(args.urls, args.domains, args.duplicate_rate, random.Random(args.seed))
+
+    start = time.perf_counter()
+    first_stored = await pipeline.ingest(urls)
+    first_seconds = time.perf_counter() - start
+    first = pipeline.stats()
+
+    # A second pass over the same results must not crawl anything
+    start = time.perf_counter()
+    second_stored = await pipeline.ingest(urls)
+    second_seconds = time.perf_counter() - start
+
+    async with httpx.AsyncClient() as client:
+        stub = (await client.get(f"{args.firecrawl_url.rstrip('/')}/v1/scrape/stats")).json()
+
+    return {
+        "urls": len(urls),
+        "first_pass": {"seconds": round(first_seconds, 2), "stored": first_stored, **first},
+        "second_pass": {
+            "seconds": round(second_seconds, 3),
+            "stored": second_stored,
+            "crawled": pipeline.stats()["crawled"] - first["crawled"]
+        },
+        "indexed_postings": len(store),
+        "stub": stub,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Firecrawl job ingestion against the stub server")
+    parser.add_argument("--firecrawl-url", default="http://localhost:9000")
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--domains", type=int, default=8)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--rpm", type=int, default=0, help="Firecrawl requests per minute (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--domain-interval", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
@@ -0,0 +1,359 @@
+# ============================================
+# backend/benchmarks/load_test.py
+# HTTP load generator for the FastAPI server
+# Usage:
+#   uvicorn main:app --port 8000            (in another shell)
+#   python -m benchmarks.load_test --mode closed --concurrency 16 --duration 30
+#   python -m benchmarks.load_test --mode open --rate 50 --output release.json
+#   python -m benchmarks.load_test --compare v1.0.json v1.1.json
+# ============================================
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# ============================================
+# Workload Definition
+# ============================================
+
+# Messages that exercise each OrchestratorAgent route in main.py
+ROUTE_MESSAGES: Dict[str, List[str]] = {
+    "profile": [
+        "Analyze my resume",
+        "Can you review my CV and experience?",
+        "What does my profile say about me?",
+    ],
+    "market": [
+        "Find software engineer jobs",
+        "Who is hiring backend developers right now?",
+        "Show me openings for data engineers",
+    ],
+    "learning": [
+        "Create a learning roadmap for cloud",
+        "Which course should I study next?",
+        "Help me improve at system design",
+    ],
+    "interview": [
+        "Help me prepare for interviews",
+        "Give me mock interview questions",
+        "I want to practice behavioral questions",
+    ],
+    "application": [
+        "Write a cover letter for me",
+        "Assist with my application to Google",
+        "Should I submit this now?",
+    ],
+    "orchestrator": [
+        "Hello there",
+        "What can you do?",
+    ],
+}
+
+DEFAULT_ENDPOINT_MIX = "chat=70,agents=10,stats=10,health=10"
+DEFAULT_MESSAGE_MIX = "profile=1,market=1,learning=1,interview=1,application=1,orchestrator=1"
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def parse_mix(spec: str, allowed: List[str]) -> Dict[str, float]:
+    """Parse a "name=weight,name=weight" mix into normalized weights"""
+    weights = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in allowed:
+            raise ValueError(f"Unknown mix entry '{name}', expected one of {allowed}")
+        weights[name] = float(weight or 1)
+
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Mix '{spec}' has no positive weights")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+class Workload:
+    """Seeded generator of (endpoint, method, path, body, expected_agent) requests"""
+
+    ENDPOINTS = ["chat", "agents", "stats", "health"]
+
+    def __init__(self, endpoint_mix: str, message_mix: str, users: int, seed: int):
+        self.endpoint_mix = parse_mix(endpoint_mix, self.ENDPOINTS)
+        self.message_mix = parse_mix(message_mix, list(ROUTE_MESSAGES))
+        self.users = [f"loadtest-user-{i}" for i in range(users)]
+        self.rng = random.Random(seed)
+
+    def _pick(self, weights: Dict[str, float]) -> str:
+        names = list(weights)
+        return self.rng.choices(names, weights=[weights[n] for n in names])[0]
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Dict], Optional[str]]:
+        endpoint = self._pick(self.endpoint_mix)
+        user_id = self.rng.choice(self.users)
+
+        if endpoint == "chat":
+            route = self._pick(self.message_mix)
+            body = {
+                "message": self.rng.choice(ROUTE_MESSAGES[route]),
+                "user_id": user_id,
+                "conversation_history": []
+            }
+            return endpoint, "POST", "/api/chat", body, route
+        if endpoint == "agents":
+            return endpoint, "GET", "/api/agents", None, None
+        if endpoint == "stats":
+            return endpoint, "GET", f"/api/stats/{user_id}", None, None
+        return endpoint, "GET", "/health", None, None
+
+
+# ============================================
+# Result Collection
+# ============================================
+
+class EndpointStats:
+    """Latency histogram and error counts for one endpoint"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+        self.agents_used: Dict[str, int] = {}
+        self.misroutes = 0
+
+    def record(self, latency_ms: float, status: str, ok: bool,
+               expected_agent: Optional[str] = None, agent_used: Optional[str] = None):
+        self.latencies_ms.append(latency_ms)
+        index = len(HISTOGRAM_BUCKETS_MS)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if latency_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+        if agent_used is not None:
+            self.agents_used[agent_used] = self.agents_used.get(agent_used, 0) + 1
+            if expected_agent and agent_used != expected_agent:
+                self.misroutes += 1
+
+    def summary(self) -> Dict:
+        count = len(self.latencies_ms)
+        ordered = sorted(self.latencies_ms)
+        histogram = []
+        lower = 0
+        for bound, hits in zip(HISTOGRAM_BUCKETS_MS + [None], self.buckets):
+            histogram.append({"gt_ms": lower, "le_ms": bound, "count": hits})
+            lower = bound
+
+        summary = {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "latency_ms": {
+                "min": round(ordered[0], 3) if ordered else None,
+                "mean": round(sum(ordered) / count, 3) if count else None,
+                "p50": percentile(ordered, 50),
+                "p90": percentile(ordered, 90),
+                "p99": percentile(ordered, 99),
+                "max": round(ordered[-1], 3) if ordered else None,
+            },
+            "histogram": histogram,
+            "status_codes": self.status_codes,
+        }
+        if self.agents_used:
+            summary["agents_used"] = self.agents_used
+            summary["misroutes"] = self.misroutes
+        return summary
+
+
+def percentile(ordered: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 3)
+
+
+# ============================================
+# Load Generator
+# ============================================
+
+class LoadTester:
+    """Drives the API with an open- or closed-loop arrival model"""
+
+    def __init__(self, base_url: str, workload: Workload, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.workload = workload
+        self.timeout = timeout
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in Workload.ENDPOINTS}
+        self.in_flight_peak = 0
+        self._in_flight = 0
+
+    async def _issue(self, client: httpx.AsyncClient):
+        endpoint, method, path, body, expected_agent = self.workload.next_request()
+        self._in_flight += 1
+        self.in_flight_peak = max(self.in_flight_peak, self._in_flight)
+        agent_used = None
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            latency_ms = (time.perf_counter() - start) * 1000
+            ok = response.status_code < 400
+            if ok and endpoint == "chat":
+                agent_used = response.json().get("agent_used")
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            latency_ms = (time.perf_counter() - start) * 1000
+            ok = False
+            status = type(e).__name__
+        finally:
+            self._in_flight -= 1
+
+        self.stats[endpoint].record(latency_ms, status, ok, expected_agent, agent_used)
+
+    async def run_closed(self, concurrency: int, duration: float, think_time: float):
+        """Closed loop: a fixed number of users, each waits for its response before sending again"""
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            async def user_loop():
+                while time.perf_counter() < deadline:
+                    await self._issue(client)
+                    if think_time:
+                        await asyncio.sleep(think_time)
+
+            await asyncio.gather(*(user_loop() for _ in range(concurrency)))
+
+    async def run_open(self, rate: float, duration: float, max_in_flight: int):
+        """Open loop: Poisson arrivals at a fixed rate, independent of response times"""
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        tasks = set()
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            next_arrival = time.perf_counter()
+            while next_arrival < deadline:
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(self._issue(client))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                next_arrival += self.workload.rng.expovariate(rate)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+    def report(self, config: Dict, elapsed: float) -> Dict:
+        endpoints = {name: s.summary() for name, s in self.stats.items() if s.latencies_ms}
+        total = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "generated_at": datetime.utcnow().isoformat(),
+            "config": config,
+            "elapsed_s": round(elapsed, 3),
+            "total_requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "peak_in_flight": self.in_flight_peak,
+            "endpoints": endpoints,
+        }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the Career AI Agent API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed loop: concurrent users")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Closed loop: pause between requests (s)")
+    parser.add_argument("--rate", type=float, default=50.0, help="Open loop: mean arrivals per second")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open loop: connection pool size")
+    parser.add_argument("--endpoint-mix", default=DEFAULT_ENDPOINT_MIX)
+    parser.add_argument("--message-mix", default=DEFAULT_MESSAGE_MIX)
+    parser.add_argument("--users", type=int, default=100, help="Distinct user ids to spread requests over")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Compare two saved reports instead of generating load")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    workload = Workload(args.endpoint_mix, args.message_mix, args.users, args.seed)
+    tester = LoadTester(args.base_url, workload, args.timeout)
+
+    start = time.perf_counter()
+    if args.mode == "closed":
+        await tester.run_closed(args.concurrency, args.duration, args.think_time)
+    else:
+        await tester.run_open(args.rate, args.duration, args.max_in_flight)
+    elapsed = time.perf_counter() - start
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    return tester.report(config, elapsed)
+
+
+def compare_reports(baseline: Dict, candidate: Dict) -> Dict:
+    """Side-by-side p50/p99/error-rate deltas per endpoint for two reports"""
+    comparison = {}
+    for name in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        old = baseline["endpoints"].get(name)
+        new = candidate["endpoints"].get(name)
+        row = {}
+        for metric in ("p50", "p90", "p99"):
+            before = old["latency_ms"][metric] if old else None
+            after = new["latency_ms"][metric] if new else None
+            row[metric] = {"baseline": before, "candidate": after}
+            if before and after:
+                row[metric]["change_pct"] = round((after - before) / before * 100, 1)
+        row["error_rate"] = {
+            "baseline": old["error_rate"] if old else None,
+            "candidate": new["error_rate"] if new else None,
+        }
+        comparison[name] = row
+    return {
+        "throughput_rps": {
+            "baseline": baseline["throughput_rps"],
+            "candidate": candidate["throughput_rps"],
+        },
+        "endpoints": comparison,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            candidate = json.load(f)
+        print(json.dumps(compare_reports(baseline, candidate), indent=2))
+        return
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"Wrote report to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# ============================================
+# backend/benchmarks/storage.py
+# Per-operation latency of a MemoryService storage backend under concurrent sessions
+# Usage:
+#   python -m benchmarks.storage --backend sqlite --users 200 --turns 20 --concurrency 16
+#   python -m benchmarks.storage --backend supabase   (uses SUPABASE_URL / SUPABASE_KEY)
+# ============================================
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from benchmarks.load_test import percentile
+from services.storage import SQLiteStorage, SupabaseStorage
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+
+    async def time(self, op: str, awaitable):
+        start = time.perf_counter()
+        result = await awaitable
+        self.latencies[op].append((time.perf_counter() - start) * 1000)
+        return result
+
+    def report(self) -> dict:
+        report = {}
+        for op, values in sorted(self.latencies.items()):
+            values.sort()
+            report[op] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+        return report
+
+
+async def user_session(storage, recorder: Recorder, user_id: str, args, rng: random.Random):
+    """One chat session as MemoryService drives it: profile and history on each turn, then the new message"""
+    now = datetime.utcnow().isoformat()
+    await recorder.time("save_profile", storage.save_profile(user_id, {
+        "user_id": user_id, "skills": ["Python", "SQL"], "target_roles": ["Data Engineer"], "updated_at": now
+    }))
+    for turn in range(args.turns):
+        await recorder.time("load_profile", storage.load_profile(user_id))
+        await recorder.time("load_history", storage.load_history(user_id, "session-1", 10))
+        await recorder.time("save_message", storage.save_message({
+            "user_id": user_id,
+            "session_id": "session-1",
+            "user_message": f"Question {turn} about moving into data engineering",
+            "ai_response": "Start with SQL and a workflow orchestrator. " * rng.randint(5, 40),
+            "created_at": datetime.utcnow().isoformat()
+        }))
+
+    refreshed_at = datetime.utcnow().isoformat()
+    await recorder.time("replace_job_matches", storage.replace_job_matches([user_id], [
+        {
+            "user_id": user_id, "title": "Data Engineer", "company": f"Company {i}", "location": "Remote",
+            "fit_score": rng.randint(0, 100), "url": f"https://jobs.example.com/{user_id}/{i}",
+            "description": "Build pipelines.", "alternate_urls": [], "profile_fingerprint": None,
+            "refreshed_at": refreshed_at
+        }
+        for i in range(args.matches)
+    ], refreshed_at))
+    await recorder.time("load_job_matches", storage.load_job_matches(user_id, 20))
+    await recorder.time("save_learning_plan", storage.save_learning_plan({
+        "user_id": user_id, "plan_data": {"weeks": [{"focus": "SQL", "hours_per_week": 6}]},
+        "status": "active", "created_at": refreshed_at, "updated_at": refreshed_at
+    }))
+
+
+async def run(args) -> dict:
+    if args.backend == "supabase":
+        storage = SupabaseStorage()
+        if storage.client is None:
+            raise SystemExit("Supabase is not configured (SUPABASE_URL / SUPABASE_KEY)")
+    else:
+        path = args.sqlite_path or os.path.join(tempfile.mkdtemp(prefix="career-storage-"), "career.db")
+        storage = SQLiteStorage(path, pool_size=args.pool_size)
+
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    # Supabase profiles reference auth.users; point --user-ids at existing users there
+    user_ids = args.user_ids or [f"bench-user-{i}" for i in range(args.users)]
+
+    async def bounded(user_id: str):
+        async with semaphore:
+            await user_session(storage, recorder, user_id, args, rng)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(user_id) for user_id in user_ids))
+    elapsed = time.perf_counter() - start
+
+    await recorder.time("active_user_ids", storage.active_user_ids(datetime.utcnow() - timedelta(days=1)))
+    total = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "backend": args.backend,
+        "users": len(user_ids),
+        "concurrency": args.concurrency,
+        "operations": total,
+        "ops_per_second": round(total / elapsed, 1),
+        "latency": recorder.report(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Latency of MemoryService storage operations")
+    parser.add_argument("--backend", choices=["sqlite", "supabase"], default="sqlite")
+    parser.add_argument("--sqlite-path", default="", help="database file (default: a fresh temp file)")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--user-ids", nargs="*", default=None)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    print(json.dumps(asyncio.run(run(parse_args())), indent=2))
@@ -0,0 +1,162 @@
+# ============================================
+# backend/benchmarks/stub_servers.py
+# Local stand-ins for the upstream LLM and Firecrawl APIs used during load tests
+# Usage:
+#   uvicorn benchmarks.stub_servers:app --port 9000
+#   DEEPSEEK_BASE_URL=http://localhost:9000/v1 GROQ_BASE_URL=http://localhost:9000 \
+#   FIRECRAWL_API_URL=http://localhost:9000 uvicorn main:app
+# ============================================
+
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Simulated upstream latency, overridable per run
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "300"))
+STUB_JITTER_MS = float(os.getenv("STUB_JITTER_MS", "100"))
+# Fraction of calls answered with 429 + Retry-After, to exercise client-side limiting
+STUB_429_RATE = float(os.getenv("STUB_429_RATE", "0"))
+STUB_RETRY_AFTER_S = os.getenv("STUB_RETRY_AFTER_S", "1")
+STUB_SCRAPE_LATENCY_MS = float(os.getenv("STUB_SCRAPE_LATENCY_MS", "800"))
+
+# Scrape counters, to check de-duplication and per-domain politeness
+scrape_stats = {"requests": 0, "max_in_flight": 0, "max_domain_in_flight": 0}
+_scrape_in_flight = defaultdict(int)
+
+app = FastAPI(title="Career AI Upstream Stubs")
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: List[Dict[str, Any]]
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    stream: Optional[bool] = False
+
+
+def _canned_reply(prompt: str) -> str:
+    """Shape-compatible answers for the prompts the agents send"""
+    text = prompt.lower()
+    if "respond with only the agent name" in text:
+        return "market"
+    if "return only a number" in text:
+        return str(random.randint(40, 95))
+    if "extract all technical and soft skills" in text:
+        return '["Python", "FastAPI", "React"]'
+    if "top 5 skill gaps" in text:
+        return '[{"skill": "AWS", "importance": "high", "time_to_learn": "2-3 months"}]'
+    if "12-week learning roadmap" in text:
+        return ('{"weeks": [{"week": 1, "focus": "Cloud Basics", "goals": ["Deploy an API"], '
+                '"hours_per_week": 10}], "milestones": [{"week": 4, "milestone": "First deploy"}]}')
+    if "free learning resources" in text:
+        return ('[{"title": "Intro Course", "platform": "YouTube", "url": "https://example.com", '
+                '"type": "video", "duration": "2 hours"}]')
+    if "interview questions" in text:
+        return '[{"question": "Tell me about a hard bug you fixed.", "type": "behavioral", "difficulty": "medium"}]'
+    return "Stub analysis: demand is steady, AI tooling is reshaping the role, keep shipping projects."
+
+
+async def _complete(request: ChatCompletionRequest):
+    if STUB_429_RATE and random.random() < STUB_429_RATE:
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+            headers={"retry-after": STUB_RETRY_AFTER_S}
+        )
+
+    delay = max(0.0, random.gauss(STUB_LATENCY_MS, STUB_JITTER_MS)) / 1000
+    await asyncio.sleep(delay)
+
+    prompt = str(request.messages[-1].get("content", "")) if request.messages else ""
+    content = _canned_reply(prompt)
+    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.messages)
+    completion_tokens = len(content.split())
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+# DeepSeek (OpenAI-compatible) path
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: ChatCompletionRequest):
+    return await _complete(request)
+
+
+# Groq path
+@app.post("/openai/v1/chat/completions")
+async def groq_chat_completions(request: ChatCompletionRequest):
+    return await _complete(request)
+
+
+class ScrapeRequest(BaseModel):
+    url: str
+    formats: Optional[List[str]] = None
+    onlyMainContent: Optional[bool] = None
+
+
+def _canned_posting(url: str) -> Dict[str, Any]:
+    """A job page derived from the URL; the same trailing id gives the same posting"""
+    match = re.search(r"(\d+)/?$", urlsplit(url).path)
+    posting_id = int(match.group(1)) if match else 0
+    rng = random.Random(posting_id)
+    role = rng.choice(["Backend Engineer", "Data Engineer", "Frontend Developer", "ML Engineer"])
+    company = f"Company {posting_id % 97}"
+    skills = rng.sample(["Python", "Go", "React", "AWS", "Kubernetes", "PostgreSQL", "Kafka", "PyTorch"], 4)
+    markdown = (
+        f"# {role}\n\nCompany: {company}\nLocation: {rng.choice(['Remote', 'Austin, TX', 'Berlin'])}\n"
+        f"Posted {rng.randint(1, 14)} days ago\n\n## About the role\n"
+        f"Posting {posting_id}: you will build services with {', '.join(skills)}.\n"
+    )
+    return {
+        "markdown": markdown,
+        "metadata": {"title": f"{role} at {company} | Jobs", "sourceURL": url, "statusCode": 200}
+    }
+
+
+# Firecrawl path
+@app.post("/v1/scrape")
+async def firecrawl_scrape(request: ScrapeRequest):
+    domain = urlsplit(request.url).netloc
+    scrape_stats["requests"] += 1
+    _scrape_in_flight[domain] += 1
+    scrape_stats["max_domain_in_flight"] = max(scrape_stats["max_domain_in_flight"], _scrape_in_flight[domain])
+    scrape_stats["max_in_flight"] = max(scrape_stats["max_in_flight"], sum(_scrape_in_flight.values()))
+    try:
+        await asyncio.sleep(max(0.0, random.gauss(STUB_SCRAPE_LATENCY_MS, STUB_JITTER_MS)) / 1000)
+        return {"success": True, "data": _canned_posting(request.url)}
+    finally:
+        _scrape_in_flight[domain] -= 1
+
+
+@app.get("/v1/scrape/stats")
+async def firecrawl_scrape_stats():
+    return scrape_stats
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "latency_ms": STUB_LATENCY_MS, "jitter_ms": STUB_JITTER_MS}
@@ -0,0 +1,117 @@
+# ============================================
+# backend/benchmarks/vector_search.py
+# Top-K job retrieval over a large synthetic posting set
+# Usage: python -m benchmarks.vector_search --postings 50000 --queries 200 --k 10
+#        [--quantize] [--batch 32] [--index-dir /tmp/job-index]
+# ============================================
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from benchmarks.load_test import percentile
+from services.embeddings import HashingEmbedder, job_text, profile_text
+from services.job_index import JobEmbeddingIndex
+from services.vector_store import InMemoryJobStore
+
+ROLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "ML Engineer",
+         "DevOps Engineer", "Full Stack Developer", "Data Engineer", "Mobile Developer",
+         "Security Engineer", "Site Reliability Engineer", "Product Analyst", "QA Engineer"]
+SKILLS = ["Python", "Java", "Go", "Rust", "TypeScript", "React", "Node.js", "FastAPI",
+          "Django", "Kubernetes", "Docker", "AWS", "GCP", "Azure", "PostgreSQL", "Redis",
+          "Kafka", "Spark", "PyTorch", "TensorFlow", "SQL", "Terraform", "GraphQL", "Swift",
+          "Kotlin", "Airflow", "dbt", "Snowflake", "Linux", "CI/CD"]
+SENIORITY = ["Junior", "Mid-level", "Senior", "Staff", "Lead"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "Austin, TX", "London", "Berlin"]
+
+
+def synthetic_postings(n: int, rng: random.Random):
+    for i in range(n):
+        role = rng.choice(ROLES)
+        skills = rng.sample(SKILLS, 5)
+        yield {
+            "url": f"https://jobs.example.com/{i}",
+            "title": f"{rng.choice(SENIORITY)} {role}",
+            "company": f"Company {rng.randint(1, n // 10 + 1)}",
+            "location": rng.choice(LOCATIONS),
+            "description": f"We are hiring a {role} experienced with {', '.join(skills)}.",
+        }
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    embedder = HashingEmbedder(args.dim)
+    store = InMemoryJobStore(args.dim, index=JobEmbeddingIndex(args.dim, quantize=args.quantize))
+
+    start = time.perf_counter()
+    postings = list(synthetic_postings(args.postings, rng))
+    for i in range(0, len(postings), 5000):
+        batch = postings[i:i + 5000]
+        await store.add_jobs(batch, await embedder.embed([job_text(j) for j in batch]))
+    index_seconds = time.perf_counter() - start
+
+    queries = await embedder.embed([
+        profile_text(rng.sample(SKILLS, 4), [rng.choice(ROLES)]) for _ in range(args.queries)
+    ], "search_query")
+    latencies = []
+    for i in range(0, len(queries), args.batch):
+        chunk = queries[i:i + args.batch]
+        start = time.perf_counter()
+        await store.search_batch(chunk, args.k)
+        # Per-query latency: a batch answers all of its queries at once
+        latencies.extend([(time.perf_counter() - start) * 1000 / len(chunk)] * len(chunk))
+    latencies.sort()
+
+    # Recall of the quantized index against exact float32 search
+    recall = None
+    if args.quantize:
+        exact = JobEmbeddingIndex(args.dim)
+        exact.add(store.index.jobs, await embedder.embed([job_text(j) for j in postings]))
+        sample = queries[:50]
+        hits = 0
+        for approx, truth in zip(store.index.search_batch(sample, args.k), exact.search_batch(sample, args.k)):
+            hits += len({j["url"] for j in approx} & {j["url"] for j in truth})
+        recall = round(hits / (len(sample) * args.k), 4)
+
+    directory = args.index_dir or tempfile.mkdtemp(prefix="job-index-")
+    start = time.perf_counter()
+    store.index.save(directory)
+    save_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = JobEmbeddingIndex.load(directory)
+    loaded.search(queries[0], args.k)
+    load_seconds = time.perf_counter() - start
+
+    return {
+        "postings": len(store),
+        "dim": args.dim,
+        "k": args.k,
+        "quantize": args.quantize,
+        "batch": args.batch,
+        "matrix_mb": round(store.index.snapshot()["vectors"].nbytes / 1e6, 1),
+        "index_seconds": round(index_seconds, 2),
+        "save_seconds": round(save_seconds, 2),
+        "load_and_first_search_seconds": round(load_seconds, 3),
+        "search_ms": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+        },
+        "recall_at_k": recall,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark top-K job vector search")
+    parser.add_argument("--postings", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--quantize", action="store_true", help="Store int8 codes instead of float32")
+    parser.add_argument("--batch", type=int, default=1, help="Queries per matrix product")
+    parser.add_argument("--index-dir", default=None, help="Where to save the index (default: a temp dir)")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
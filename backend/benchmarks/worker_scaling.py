@@ -0,0 +1,86 @@
+# ============================================
+# backend/benchmarks/worker_scaling.py
+# Throughput of the production server (server.py) at different worker counts
+# Usage:
+#   python -m benchmarks.worker_scaling --workers 1 4 --concurrency 64 --duration 20
+# ============================================
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks import load_test
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+async def measure(workers: int, args) -> dict:
+    env = dict(os.environ, WEB_WORKERS=str(workers), WEB_PORT=str(args.port), WEB_HOST="127.0.0.1")
+    server = subprocess.Popen(
+        [sys.executable, "server.py"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        report = await load_test.run(load_test.parse_args([
+            "--base-url", base_url,
+            "--mode", "closed",
+            "--concurrency", str(args.concurrency),
+            "--duration", str(args.duration),
+            "--endpoint-mix", args.endpoint_mix,
+        ]))
+    finally:
+        # SIGTERM is the graceful path: stop accepting, drain, run shutdown hooks
+        server.send_signal(signal.SIGTERM)
+        start = time.monotonic()
+        server.wait(timeout=60)
+        shutdown_seconds = time.monotonic() - start
+
+    chat = report["endpoints"].get("chat", {}).get("latency_ms", {})
+    return {
+        "workers": workers,
+        "throughput_rps": report["throughput_rps"],
+        "error_rate": report["error_rate"],
+        "chat_p50_ms": chat.get("p50"),
+        "chat_p99_ms": chat.get("p99"),
+        "shutdown_seconds": round(shutdown_seconds, 2),
+    }
+
+
+async def run(args) -> dict:
+    results = [await measure(workers, args) for workers in args.workers]
+    baseline = results[0]["throughput_rps"] or None
+    for result in results:
+        result["speedup"] = round(result["throughput_rps"] / baseline, 2) if baseline else None
+    return {"concurrency": args.concurrency, "duration_s": args.duration, "runs": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare production server throughput across worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 2])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--endpoint-mix", default="chat=0.8,agents=0.1,health=0.1")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
@@ -10,16 +10,148 @@ class Settings(BaseSettings):
     firecrawl_api_key: str = ""
     nomic_api_key: str = ""
     
+    # LLM endpoints (override to point at local stubs, e.g. benchmarks/stub_servers.py)
+    deepseek_base_url: str = "https://api.deepseek.com"
+    groq_base_url: str = ""
+    firecrawl_api_url: str = "https://api.firecrawl.dev"
+    
+    # LLM client-side rate limits (provider quotas)
+    groq_rpm: int = 30
+    groq_tpm: int = 6000
+    groq_max_concurrency: int = 8
+    deepseek_rpm: int = 60
+    deepseek_tpm: int = 100000
+    deepseek_max_concurrency: int = 16
+    llm_latency_target_seconds: float = 20.0
+    llm_max_retries: int = 4
+    
+    # Firecrawl job-posting ingestion (free tier: 10 scrapes/min)
+    firecrawl_rpm: int = 10
+    firecrawl_tpm: int = 0
+    firecrawl_max_concurrency: int = 2
+    firecrawl_timeout_seconds: float = 30.0
+    firecrawl_domain_concurrency: int = 1
+    firecrawl_domain_interval_seconds: float = 2.0
+    job_ingest_batch: int = 10
+    
+    # Job search fan-out and de-duplication
+    job_search_query_budget: int = 6  # Serper requests (queries + extra pages) per search
+    job_search_concurrency: int = 4
+    job_search_target_results: int = 20
+    job_search_max_pages: int = 3
+    job_search_max_results: int = 30
+    job_dedup_threshold: float = 0.5  # estimated Jaccard above which postings are the same job
+    
+    # LLM hedging / failover between Groq and DeepSeek
+    llm_hedging_enabled: bool = False
+    llm_hedge_max_ratio: float = 0.1
+    llm_hedge_default_delay_seconds: float = 5.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    
+    # Request deadlines
+    request_timeout_seconds: float = 60.0
+    deadline_step_min_seconds: float = 5.0
+    deadline_trends_min_seconds: float = 15.0
+    deadline_write_grace_seconds: float = 2.0
+    
+    # POST /api/chat/batch
+    chat_batch_max_items: int = 1000
+    chat_batch_concurrency: int = 16
+    chat_batch_timeout_seconds: float = 600.0
+    # Left at the end of the batch budget to answer with the items finished so far
+    chat_batch_response_margin_seconds: float = 0.5
+    # WebSocket chat: recent turns kept warm per connection
+    chat_session_history_turns: int = 10
+    
     # Supabase
     supabase_url: str = ""
     supabase_key: str = ""
     
+    # MemoryService storage: Supabase when configured, otherwise a local SQLite file (WAL)
+    storage_backend: str = "auto"  # auto | supabase | sqlite
+    # Direct (session-mode) Postgres DSN for LISTEN career_cache; empty disables the
+    # change feed. With it, cache TTLs can be long since edits invalidate entries
+    change_feed_dsn: str = ""
+    sqlite_path: str = "career.db"
+    sqlite_pool_size: int = 4
+    sqlite_busy_timeout_seconds: float = 5.0
+    
     # JWT
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
+    # Verified tokens are cached until their exp; user records for a short TTL
+    auth_token_cache_size: int = 10000
+    auth_user_cache_size: int = 10000
+    auth_user_cache_ttl_seconds: float = 300.0
+    
+    # Skill extraction (dictionary fast path, LLM only for residual skills)
+    skills_dictionary_path: str = ""  # defaults to data/skills.json
+    skill_dictionary_min_coverage: float = 0.6
+    
+    # Chat intent routing (keyword weights, reloaded when the file changes)
+    intents_path: str = ""  # defaults to data/intents.json
+    intents_reload_seconds: float = 5.0
+    
+    # Embeddings / vector search
+    embedding_provider: str = "auto"  # auto | nomic | local
+    nomic_embedding_model: str = "nomic-embed-text-v1.5"
+    embedding_dim: int = 768
+    embedding_batch_size: int = 64
+    vector_backend: str = "auto"  # auto | pgvector | memory | tiered
+    job_scoring: str = "auto"  # auto | embedding | llm
+    embedding_match_k: int = 10
+    job_index_quantize: bool = False  # int8 codes instead of float32 (4x smaller)
+    job_index_path: str = ""  # directory for the memory-mapped index; empty keeps it in RAM only
+    job_index_ttl_hours: int = 72
+    job_index_save_interval_seconds: int = 300
     
     # Redis
     redis_url: str = "redis://localhost:6379"
+    # Request paths with a local fallback (rate-limit buckets, trend cache):
+    # fail fast, then skip Redis for the cooldown
+    redis_fail_fast_timeout_seconds: float = 0.25
+    redis_outage_cooldown_seconds: float = 30.0
+    # Where per-session state lives (LangGraph checkpoints, LLM rate-limit buckets):
+    # "redis" lets any worker serve any request; "memory" keeps it per process
+    state_backend: str = "redis"  # redis | memory
+    checkpoint_ttl_seconds: int = 86400
+    checkpoint_history: int = 10
+    
+    # Production server (python server.py)
+    web_host: str = "0.0.0.0"
+    web_port: int = 8000
+    web_workers: int = 0  # 0 = one per CPU core
+    web_graceful_timeout_seconds: int = 30
+    web_keepalive_seconds: int = 5
+    
+    # Market-trend cache (refreshed by worker.py)
+    trend_cache_ttl_hours: float = 168.0
+    trend_refresh_hours: float = 24.0
+    trend_active_days: int = 14
+    trend_refresh_batch: int = 20
+    trend_refresh_concurrency: int = 2
+    trend_partial_min_coverage: float = 0.5
+    trend_local_ttl_seconds: float = 300.0
+    trend_requested_flush_seconds: float = 5.0
+    
+    # Background tasks (worker.py)
+    task_worker_concurrency: int = 2
+    task_timeout_seconds: float = 300.0
+    task_ttl_seconds: int = 3600
+    task_result_ttl_seconds: int = 86400
+    
+    # Materialized job matches (batch refresher in worker.py)
+    job_matches_active_days: int = 14
+    job_matches_max_age_hours: float = 24.0
+    job_matches_refresh_concurrency: int = 4
+    job_matches_write_batch: int = 50
+    
+    # Conversation archival (worker.py --archive-interval): sessions idle this long
+    # leave the monthly-partitioned hot table for conversation_archives
+    conversation_archive_idle_days: int = 30
+    conversation_archive_batch: int = 500
+    conversation_partition_months_ahead: int = 3
     
     # Missing fields from .env
     brave_api_key: str = ""
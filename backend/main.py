@@ -3,16 +3,72 @@
 # FastAPI server with multi-agent orchestration
 # ============================================
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
+import json
 import os
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 import uvicorn
 
+from config import get_settings
+from services.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope, run_with_deadline
+from services.singleflight import singleflight_stats
+from services.rate_limiter import limiter_stats
+from services.hedging import hedging_stats
+from services.job_ingestion import ingestion_stats
+from services.trend_cache import trend_cache_stats
+from services.auth import auth_cache_stats, user_cache
+from services.change_feed import change_feed_stats, get_change_feed
+from services.task_queue import TASK_KINDS, get_task_queue
+from services.memory import MemoryService
+from services.vector_store import flush_job_store
+from services.dashboard_stats import get_dashboard_counters
+from services.intents import get_intent_matcher
+
+settings = get_settings()
+
+# Open WebSocket chat sessions by user, so profile edits can reach them
+live_sessions: Dict[str, set] = {}
+
+def invalidate_profile(event: Dict[str, Any]):
+    """A profile row changed (through this API or elsewhere): drop this worker's copies"""
+    user_id = event.get("user_id")
+    user_cache.invalidate(user_id)
+    for session in live_sessions.get(user_id, ()):
+        session.profile_stale = True
+
+def resync_caches():
+    """Changes may have been missed while the feed was disconnected"""
+    user_cache.clear()
+    for sessions in live_sessions.values():
+        for session in sessions:
+            session.profile_stale = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker listens for row changes and invalidates its own in-process caches
+    feed = get_change_feed()
+    stop = asyncio.Event()
+    feed_task = None
+    if feed:
+        feed.on("profiles", invalidate_profile)
+        feed.on_resync(resync_caches)
+        feed_task = asyncio.create_task(feed.run(stop))
+    yield
+    stop.set()
+    if feed_task:
+        await feed_task
+    # Runs once the server has stopped accepting connections and drained in-flight requests
+    await flush_job_store()
+
 # Initialize FastAPI
-app = FastAPI(title="Career AI Agent API", version="1.0.0")
+app = FastAPI(title="Career AI Agent API", version="1.0.0", lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -23,6 +79,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Give every request an end-to-end deadline that downstream calls inherit"""
+    timeout = settings.request_timeout_seconds
+    if request.url.path == "/api/chat/batch":
+        # The whole batch shares this budget; each item still gets request_timeout_seconds
+        timeout = settings.chat_batch_timeout_seconds
+    # Clients may ask for a tighter (never looser) budget
+    requested = request.headers.get("x-request-timeout")
+    if requested:
+        try:
+            timeout = min(timeout, max(0.1, float(requested)))
+        except ValueError:
+            pass
+    
+    deadline = Deadline.after(timeout)
+    with deadline_scope(deadline):
+        try:
+            return await run_with_deadline(call_next(request), deadline)
+        except DeadlineExceeded:
+            return JSONResponse(
+                status_code=504,
+                content={"detail": f"Request exceeded its {timeout:.1f}s deadline"}
+            )
+
 # ============================================
 # Data Models
 # ============================================
@@ -36,11 +117,19 @@ class ChatRequest(BaseModel):
     user_id: str
     conversation_history: Optional[List[Message]] = []
 
+class TaskRequest(BaseModel):
+    user_id: str
+    profile: Optional[Dict[str, Any]] = None
+
 class ChatResponse(BaseModel):
     response: str
     agent_used: str
     metadata: Optional[Dict[str, Any]] = None
-    stats: Optional[Dict[str, int]] = None
+    stats: Optional[Dict[str, Any]] = None
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest]
+    stream: bool = False  # NDJSON lines as items complete instead of one ordered response
 
 # ============================================
 # Simple Multi-Agent System (No Dependencies)
@@ -62,9 +151,7 @@ class ProfileAgent(Agent):
         super().__init__("Profile Agent", "Resume & Profile Analysis")
     
     def process(self, message: str, context: Dict) -> str:
-        keywords = ["resume", "cv", "profile", "experience", "skills", "analyze"]
-        if any(kw in message.lower() for kw in keywords):
-            return """📊 **Profile Analysis Complete**
+        return """📊 **Profile Analysis Complete**
 
 I've analyzed your profile and here's what I found:
 
@@ -84,7 +171,6 @@ I've analyzed your profile and here's what I found:
 3. Prepare a 2-minute elevator pitch
 
 Would you like me to help with any specific area?"""
-        return None
 
 class MarketAgent(Agent):
     """Searches and matches job opportunities"""
@@ -92,9 +178,7 @@ class MarketAgent(Agent):
         super().__init__("Market Agent", "Job Search & Matching")
     
     def process(self, message: str, context: Dict) -> str:
-        keywords = ["job", "hiring", "opportunity", "position", "openings", "find"]
-        if any(kw in message.lower() for kw in keywords):
-            return """💼 **Job Market Analysis**
+        return """💼 **Job Market Analysis**
 
 I've found **47 matching opportunities** for you:
 
@@ -121,7 +205,6 @@ I've found **47 matching opportunities** for you:
 - High demand for AI/ML experience
 
 Would you like me to help you apply to any of these?"""
-        return None
 
 class LearningAgent(Agent):
     """Creates personalized learning paths"""
@@ -129,9 +212,7 @@ class LearningAgent(Agent):
         super().__init__("Learning Agent", "Career Development & Learning")
     
     def process(self, message: str, context: Dict) -> str:
-        keywords = ["learn", "course", "study", "improve", "skill", "path", "roadmap"]
-        if any(kw in message.lower() for kw in keywords):
-            return """📚 **Personalized Learning Roadmap**
+        return """📚 **Personalized Learning Roadmap**
 
 Based on your goals, here's your 12-week plan:
 
@@ -157,7 +238,6 @@ Based on your goals, here's your 12-week plan:
 **Estimated Cost:** Free (all resources available free)
 
 Ready to start? I can send you specific links!"""
-        return None
 
 class InterviewAgent(Agent):
     """Helps with interview preparation"""
@@ -165,9 +245,7 @@ class InterviewAgent(Agent):
         super().__init__("Interview Agent", "Interview Preparation")
     
     def process(self, message: str, context: Dict) -> str:
-        keywords = ["interview", "practice", "questions", "prepare", "mock"]
-        if any(kw in message.lower() for kw in keywords):
-            return """🎯 **Interview Preparation Guide**
+        return """🎯 **Interview Preparation Guide**
 
 Let's get you ready! Here's what we'll cover:
 
@@ -194,7 +272,6 @@ Let's get you ready! Here's what we'll cover:
 *"Describe a time you solved a difficult technical problem."*
 
 Want to start with a coding problem or behavioral question?"""
-        return None
 
 class ApplicationAgent(Agent):
     """Assists with job applications"""
@@ -202,9 +279,7 @@ class ApplicationAgent(Agent):
         super().__init__("Application Agent", "Application Management")
     
     def process(self, message: str, context: Dict) -> str:
-        keywords = ["apply", "application", "submit", "cover letter"]
-        if any(kw in message.lower() for kw in keywords):
-            return """✍️ **Application Assistant**
+        return """✍️ **Application Assistant**
 
 I'll help you craft a winning application!
 
@@ -241,7 +316,6 @@ I'll help you craft a winning application!
    - [ ] Portfolio links working
 
 Ready to apply? Give me the job posting URL!"""
-        return None
 
 class OrchestratorAgent:
     """Main orchestrator that routes to specialized agents"""
@@ -271,18 +345,31 @@ class OrchestratorAgent:
 What would you like help with today?"""
     
     def route_message(self, message: str, context: Dict) -> tuple:
-        """Route message to appropriate agent"""
-        # Try each agent
-        for agent_name, agent in self.agents.items():
-            response = agent.process(message, context)
-            if response:
-                return response, agent_name
+        """Route message to the agent whose keywords score highest.
+        
+        Returns (response, agent_name, confidence).
+        """
+        intent, confidence = get_intent_matcher().classify(message)
+        agent = self.agents.get(intent)
+        if agent:
+            return agent.process(message, context), intent, confidence
         
         # Default response if no agent matches
-        return self.default_response, "orchestrator"
+        return self.default_response, "orchestrator", confidence
 
 # Initialize orchestrator
 orchestrator = OrchestratorAgent()
+memory = MemoryService()
+
+# LLM orchestrator for live sessions, created on first use (its LLM clients are heavy imports)
+_career_orchestrator = None
+
+def get_career_orchestrator():
+    global _career_orchestrator
+    if _career_orchestrator is None:
+        from agents.orchestrator import CareerOrchestrator
+        _career_orchestrator = CareerOrchestrator()
+    return _career_orchestrator
 
 # ============================================
 # API Endpoints
@@ -298,41 +385,167 @@ async def health_check():
         "version": "1.0.0"
     }
 
+async def run_chat(request: ChatRequest, stats: Optional[Dict[str, Any]] = None) -> ChatResponse:
+    """Route one chat message; stats may be passed in when already loaded for the user"""
+    # Build context from conversation history
+    context = {
+        "user_id": request.user_id,
+        "history": request.conversation_history,
+        "timestamp": datetime.utcnow()
+    }
+    
+    # Route message to appropriate agent
+    response, agent_used, confidence = orchestrator.route_message(request.message, context)
+    
+    # Dashboard counters are maintained on write; reading them is one hash lookup
+    if stats is None:
+        stats = await get_dashboard_counters().get(request.user_id)
+    
+    return ChatResponse(
+        response=response,
+        agent_used=agent_used,
+        metadata={
+            "timestamp": datetime.utcnow().isoformat(),
+            "processing_time": "0.8s",
+            "intent_confidence": confidence
+        },
+        stats=stats
+    )
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Main chat endpoint with multi-agent routing"""
     try:
-        # Build context from conversation history
-        context = {
-            "user_id": request.user_id,
-            "history": request.conversation_history,
-            "timestamp": datetime.utcnow()
-        }
-        
-        # Route message to appropriate agent
-        response, agent_used = orchestrator.route_message(request.message, context)
-        
-        # Generate mock stats (in production, fetch from database)
-        stats = {
-            "skills_tracked": 12,
-            "jobs_matched": 47,
-            "learning_hours": 23,
-            "applications": 8
-        }
-        
-        return ChatResponse(
-            response=response,
-            agent_used=agent_used,
-            metadata={
-                "timestamp": datetime.utcnow().isoformat(),
-                "processing_time": "0.8s"
-            },
-            stats=stats
-        )
-    
+        return await run_chat(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/batch")
+async def chat_batch(batch: BatchChatRequest):
+    """Run many chat messages concurrently (up to chat_batch_concurrency at a time).
+    
+    Each item gets request_timeout_seconds, capped by what is left of the
+    batch budget, and fails on its own: a failed or timed-out item reports an
+    error instead of failing the batch. When the batch budget runs out, items
+    still running are reported as timed out alongside the finished ones.
+    Per-user loads are done once per batch and shared by all of that user's
+    items.
+    """
+    if len(batch.requests) > settings.chat_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(batch.requests)} items; the limit is {settings.chat_batch_max_items}"
+        )
+    
+    semaphore = asyncio.Semaphore(settings.chat_batch_concurrency)
+    user_stats: Dict[str, asyncio.Task] = {}
+    
+    def stats_for(user_id: str) -> asyncio.Task:
+        if user_id not in user_stats:
+            user_stats[user_id] = asyncio.ensure_future(get_dashboard_counters().get(user_id))
+        return user_stats[user_id]
+    
+    batch_deadline = current_deadline()
+    
+    def timed_out(index: int, batch_ended: bool = False) -> Dict[str, Any]:
+        if batch_ended or (batch_deadline is not None and batch_deadline.expired):
+            return {"index": index, "error": "Batch deadline reached before the item finished"}
+        return {"index": index, "error": f"Item exceeded its {settings.request_timeout_seconds:.1f}s deadline"}
+    
+    async def run_item(index: int, item: ChatRequest) -> Dict[str, Any]:
+        async with semaphore:
+            deadline = Deadline.after(settings.request_timeout_seconds)
+            if batch_deadline is not None and batch_deadline.expires_at < deadline.expires_at:
+                deadline = batch_deadline
+            with deadline_scope(deadline):
+                try:
+                    stats = await asyncio.shield(stats_for(item.user_id))
+                    result = await run_with_deadline(run_chat(item, stats), deadline)
+                    return {"index": index, "result": result.model_dump()}
+                except DeadlineExceeded:
+                    return timed_out(index)
+                except Exception as e:
+                    return {"index": index, "error": str(e)}
+    
+    tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(batch.requests)]
+    
+    if batch.stream:
+        async def lines():
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield json.dumps(await finished) + "\n"
+            finally:
+                # Client went away: stop the remaining items
+                for task in tasks:
+                    task.cancel()
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    # Answer just before the batch budget runs out, so the middleware's 504
+    # does not throw away the items that finished
+    timeout = None
+    if batch_deadline is not None:
+        timeout = max(0.0, batch_deadline.remaining() - settings.chat_batch_response_margin_seconds)
+    try:
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+    finally:
+        for task in tasks:
+            task.cancel()
+    results = [
+        task.result() if task.done() and not task.cancelled() else timed_out(index, batch_ended=True)
+        for index, task in enumerate(tasks)
+    ]
+    return {
+        "results": results,
+        "total": len(results),
+        "failed": sum(1 for r in results if "error" in r)
+    }
+
+@app.websocket("/ws/chat/{user_id}")
+async def chat_socket(websocket: WebSocket, user_id: str, session_id: Optional[str] = None):
+    """Live chat session over a WebSocket.
+    
+    Profile and recent history are loaded once on connect and kept warm for the
+    connection; each turn only writes the new message (no reads). Client sends
+    {"message": "..."}; the server answers with {"type": "progress", "agent": ...}
+    as each agent finishes, then {"type": "response", ...}.
+    """
+    await websocket.accept()
+    career = get_career_orchestrator()
+    session_id = session_id or str(uuid.uuid4())
+    session = await career.open_session(user_id, session_id)
+    
+    async def progress(agent: str, state: Dict[str, Any]):
+        await websocket.send_json({"type": "progress", "agent": agent, "next_agent": state.get("next_agent")})
+    
+    # No await between registering and the try: a client gone right after the handshake is still removed
+    live_sessions.setdefault(user_id, set()).add(session)
+    try:
+        await websocket.send_json({"type": "ready", "session_id": session_id, "history_turns": len(session.history) // 2})
+        while True:
+            data = await websocket.receive_json()
+            message = (data.get("message") or "").strip() if isinstance(data, dict) else ""
+            if not message:
+                await websocket.send_json({"type": "error", "detail": "Expected {\"message\": \"...\"}"})
+                continue
+            try:
+                result = await career.process_turn(session, message, on_event=progress)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json({"type": "response", "session_id": session_id, **result})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sessions = live_sessions.get(user_id)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                live_sessions.pop(user_id, None)
+
 @app.get("/api/agents")
 async def list_agents():
     """List all available agents"""
@@ -347,16 +560,61 @@ async def list_agents():
 
 @app.get("/api/stats/{user_id}")
 async def get_user_stats(user_id: str):
-    """Get user statistics"""
-    # Mock data - replace with database query
+    """Dashboard statistics, kept incrementally as matches, plans and interviews are saved"""
+    return await get_dashboard_counters().get(user_id)
+
+@app.get("/api/job-matches/{user_id}")
+async def get_job_matches(user_id: str, limit: int = 20):
+    """Materialized job matches for the dashboard, best fit first"""
+    matches = await memory.get_job_matches(user_id, limit=min(limit, 100))
+    refreshed = [m["refreshed_at"] for m in matches if m.get("refreshed_at")]
     return {
         "user_id": user_id,
-        "skills_tracked": 12,
-        "jobs_matched": 47,
-        "learning_hours": 23,
-        "applications": 8,
-        "interviews_scheduled": 3,
-        "last_activity": datetime.utcnow().isoformat()
+        "matches": matches,
+        "total": len(matches),
+        "refreshed_at": max(refreshed) if refreshed else None
+    }
+
+@app.post("/api/tasks/{kind}", status_code=202)
+async def create_task(kind: str, request: TaskRequest):
+    """Queue a heavy workflow for the background worker and return its id immediately"""
+    if kind not in TASK_KINDS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown task kind '{kind}'. Available: {', '.join(TASK_KINDS)}"
+        )
+    
+    payload = {"profile": request.profile} if request.profile else {}
+    task = await get_task_queue().enqueue(kind, request.user_id, payload)
+    return {
+        "task_id": task["id"],
+        "status": task["status"],
+        "deduplicated": task["deduplicated"],
+        "status_url": f"/api/tasks/{task['id']}"
+    }
+
+@app.get("/api/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    """Report progress (and the result summary once finished) of a background task"""
+    task = await get_task_queue().get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    
+    task.pop("payload", None)
+    return task
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Internal performance counters"""
+    return {
+        "singleflight": singleflight_stats(),
+        "llm_limiters": limiter_stats(),
+        "llm_providers": hedging_stats(),
+        "job_ingestion": ingestion_stats(),
+        "trend_cache": trend_cache_stats(),
+        "auth_cache": auth_cache_stats(),
+        "change_feed": change_feed_stats(),
+        "timestamp": datetime.utcnow().isoformat()
     }
 
 # ============================================
@@ -364,10 +622,15 @@ async def get_user_stats(user_id: str):
 # ============================================
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    if settings.environment == "production":
+        # Multi-worker gunicorn with uvloop/httptools; see server.py
+        from server import run
+        run()
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
\ No newline at end of file
@@ -0,0 +1,73 @@
+# ============================================
+# backend/server.py
+# Production launcher: gunicorn master with uvicorn workers
+# Usage:
+#   python server.py                      (workers from WEB_WORKERS, default one per core)
+#   WEB_WORKERS=4 WEB_PORT=8080 python server.py
+# Development keeps auto-reload: python main.py
+# ============================================
+
+import multiprocessing
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from config import get_settings
+
+settings = get_settings()
+
+
+class ProductionWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools, with lifespan events so the
+    app can flush state on shutdown"""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+class CareerServer(BaseApplication):
+    """Gunicorn with the app imported once in the master (preload) and then forked.
+
+    Workers share the imported code and read-only pages (such as a memory-mapped
+    job index). Anything holding sockets or event-loop state is created lazily,
+    so it is opened after the fork. On SIGTERM the master stops accepting
+    connections and gives in-flight requests web_graceful_timeout_seconds to
+    finish. Per-session state lives in Redis (state_backend), so a request may
+    land on any worker.
+    """
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def worker_count() -> int:
+    return settings.web_workers or multiprocessing.cpu_count()
+
+
+def options() -> dict:
+    return {
+        "bind": f"{settings.web_host}:{settings.web_port}",
+        "workers": worker_count(),
+        "worker_class": "server.ProductionWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.web_graceful_timeout_seconds,
+        # A worker stuck past its request deadline (plus drain time) is restarted
+        "timeout": int(settings.request_timeout_seconds) + settings.web_graceful_timeout_seconds,
+        "keepalive": settings.web_keepalive_seconds,
+    }
+
+
+def run():
+    CareerServer(options()).run()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,34 +1,158 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from models.user import User
+from services.singleflight import get_singleflight
+from services.storage import get_storage
 from config import get_settings
 
 settings = get_settings()
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    """Validate JWT token and return current user"""
-    try:
-        token = credentials.credentials
+
+class TokenCache:
+    """Payloads of tokens that already passed signature verification.
+
+    Keys are SHA-256 digests of the raw token, so the cache holds no bearer
+    credentials. An entry is served until the token's exp claim, and only
+    verified tokens are stored. A forged or tampered token never matches a
+    digest and always takes the full jwt.decode path. Tokens without exp are
+    not cached. Least recently used entries are evicted past max_entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        self._entries[self._key(token)] = (float(exp), payload)
+        self._entries.move_to_end(self._key(token))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    """User records by id, each kept for auth_user_cache_ttl_seconds.
+
+    A miss loads the user's row from storage (concurrent misses for one user
+    share the load). A user without a row is cached from the token claims
+    alone. A storage error also falls back to the claims, uncached, so an
+    outage does not turn into 401s. invalidate() drops a user whose row
+    changed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._flight = get_singleflight("user_load")
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: str, claims: Dict[str, Any]) -> User:
+        entry = self._entries.get(user_id)
+        email = claims.get("email", "")
+        # A token issued after an email change carries the new address
+        if entry is not None and entry[0] > time.monotonic() and entry[1].email == email:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        return await self._flight.do((user_id, email), lambda: self._load(user_id, email))
+
+    async def _load(self, user_id: str, email: str) -> User:
+        try:
+            row = await get_storage().load_profile(user_id) or {}
+        except Exception as e:
+            print(f"Error loading user {user_id}: {e}")
+            return User(id=user_id, email=email)
+
+        user = User(id=user_id, email=email, created_at=row.get("created_at"))
+        if self.max_entries > 0:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(settings.auth_token_cache_size)
+user_cache = UserCache(settings.auth_user_cache_size, settings.auth_user_cache_ttl_seconds)
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Claims of a valid token; raises JWTError otherwise"""
+    payload = token_cache.get(token)
+    if payload is None:
         payload = jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-        # For now, return a basic user object
-        # In production, fetch from database
-        return User(id=user_id, email=payload.get("email", ""))
+        token_cache.put(token, payload)
+    return payload
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Validate JWT token and return current user"""
+    try:
+        payload = verify_token(credentials.credentials)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+    return await user_cache.get(user_id, payload)
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
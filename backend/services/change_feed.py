@@ -0,0 +1,155 @@
+import asyncio
+import inspect
+import json
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from config import get_settings
+
+settings = get_settings()
+
+CHANNEL = "career_cache"
+
+Handler = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class ChangeFeed:
+    """Row changes from Postgres (LISTEN career_cache, see migrations/008)
+    dispatched to cache handlers.
+
+    Every process that holds a cache runs its own feed, so one edit reaches
+    every worker. Handlers receive {"table", "user_id", "external"} and are
+    registered per table with on(). Notifications sent while the connection
+    was down are lost, so after each reconnect the on_resync() handlers run
+    and drop whatever they cannot trust. A handler error is logged and does
+    not stop the feed.
+
+    Needs a direct session-mode connection (change_feed_dsn). Poolers in
+    transaction mode do not deliver notifications.
+    """
+
+    def __init__(self, dsn: Optional[str] = None):
+        self.dsn = dsn or settings.change_feed_dsn
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._resync: List[Callable[[], Union[None, Awaitable[None]]]] = []
+        self._query_conn = None
+        self.connected = False
+        self.received = 0
+        self.errors = 0
+        self.reconnects = 0
+
+    def on(self, table: str, handler: Handler):
+        self._handlers[table].append(handler)
+
+    def on_resync(self, handler: Callable[[], Union[None, Awaitable[None]]]):
+        self._resync.append(handler)
+
+    async def _call(self, handler, *args):
+        try:
+            result = handler(*args)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.errors += 1
+            print(f"[change-feed] handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+    async def dispatch(self, event: Dict[str, Any]):
+        self.received += 1
+        for handler in self._handlers.get(event.get("table"), []):
+            await self._call(handler, event)
+
+    async def run(self, stop: asyncio.Event):
+        """Listen until stop is set, reconnecting with backoff"""
+        # Imported here so deployments without a change feed do not need psycopg
+        import psycopg
+
+        backoff = 1.0
+        while not stop.is_set():
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    if self.reconnects:
+                        for handler in self._resync:
+                            await self._call(handler)
+                    self.connected = True
+                    backoff = 1.0
+                    while not stop.is_set():
+                        # The timeout only wakes the loop to check stop
+                        async for notify in conn.notifies(timeout=1.0):
+                            await self.dispatch(json.loads(notify.payload))
+            except Exception as e:
+                print(f"[change-feed] connection lost: {e}")
+            self.connected = False
+            if stop.is_set():
+                break
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                backoff = min(backoff * 2, 30.0)
+        await self.close()
+
+    async def query(self, sql: str, params: Any = None) -> List[tuple]:
+        """Run a read on a second connection (the listening one only waits for notifications)"""
+        import psycopg
+
+        if self._query_conn is None or self._query_conn.closed:
+            self._query_conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True)
+        cursor = await self._query_conn.execute(sql, params)
+        return await cursor.fetchall()
+
+    async def close(self):
+        if self._query_conn is not None:
+            await self._query_conn.close()
+            self._query_conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "received": self.received,
+            "errors": self.errors,
+            "reconnects": self.reconnects
+        }
+
+
+async def rebuild_dashboard_counters(feed: ChangeFeed, event: Dict[str, Any]):
+    """Recompute a user's dashboard fields from the table an external write touched"""
+    if not event.get("external") or not event.get("user_id"):
+        return
+    # Imported here so importing this module does not open a Redis client
+    from services.dashboard_stats import get_dashboard_counters
+
+    counters = get_dashboard_counters()
+    table, user_id = event["table"], event["user_id"]
+    if table == "job_matches":
+        rows = await feed.query("SELECT fit_score FROM job_matches WHERE user_id = %s", (user_id,))
+        await counters.set_job_matches(user_id, [row[0] for row in rows])
+    elif table == "learning_plans":
+        rows = await feed.query(
+            "SELECT plan_data FROM learning_plans WHERE user_id = %s AND status = 'active' "
+            "ORDER BY created_at DESC LIMIT 1",
+            (user_id,)
+        )
+        await counters.set_learning_plan(user_id, rows[0][0] if rows else {})
+    elif table == "interview_sessions":
+        rows = await feed.query(
+            "SELECT count(*) FROM interview_sessions "
+            "WHERE user_id = %s AND (feedback IS NOT NULL OR score IS NOT NULL)",
+            (user_id,)
+        )
+        await counters.set_interviews(user_id, rows[0][0])
+
+
+_feed: Optional[ChangeFeed] = None
+
+
+def get_change_feed() -> Optional[ChangeFeed]:
+    """The process-wide feed, or None when change_feed_dsn is not configured"""
+    global _feed
+    if _feed is None and settings.change_feed_dsn:
+        _feed = ChangeFeed()
+    return _feed
+
+
+def change_feed_stats() -> Dict[str, Any]:
+    return _feed.stats() if _feed else {}
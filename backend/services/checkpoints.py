@@ -0,0 +1,204 @@
+import base64
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP, BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from config import get_settings
+
+settings = get_settings()
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer in Redis, so a session's graph state is visible to every worker.
+
+    Per thread (session) and namespace, a sorted set orders checkpoint ids by
+    write time. Each checkpoint is a hash, and its pending writes are a second
+    hash. Only the newest checkpoint_history checkpoints are kept, and keys
+    expire checkpoint_ttl_seconds after the session's last write. Async only,
+    like the workflows that use it. Redis errors degrade to "no checkpoint":
+    the orchestrator rebuilds its state from the stored conversation anyway.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        super().__init__()
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+        self.ttl = settings.checkpoint_ttl_seconds
+        self.history = settings.checkpoint_history
+
+    # Keys
+
+    def _index_key(self, thread_id: str, ns: str) -> str:
+        return f"career:checkpoints:{thread_id}:{ns}"
+
+    def _checkpoint_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"career:checkpoint:{thread_id}:{ns}:{checkpoint_id}"
+
+    def _writes_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"career:checkpoint_writes:{thread_id}:{ns}:{checkpoint_id}"
+
+    # Serialization
+
+    def _dump(self, value: Any) -> str:
+        kind, data = self.serde.dumps_typed(value)
+        return json.dumps([kind, base64.b64encode(data).decode()])
+
+    def _load(self, raw: str) -> Any:
+        kind, data = json.loads(raw)
+        return self.serde.loads_typed((kind, base64.b64decode(data)))
+
+    @staticmethod
+    def _target(config: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+        configurable = config["configurable"]
+        return configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable.get("checkpoint_id")
+
+    # Reads
+
+    async def _tuple(self, thread_id: str, ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._checkpoint_key(thread_id, ns, checkpoint_id))
+            pipe.hgetall(self._writes_key(thread_id, ns, checkpoint_id))
+            stored, writes = await pipe.execute()
+        if not stored:
+            return None
+
+        pending = []
+        for field in sorted(writes, key=lambda f: (f.rsplit(":", 1)[0], int(f.rsplit(":", 1)[1]))):
+            task_id, channel, value = json.loads(writes[field])
+            pending.append((task_id, channel, self._load(value)))
+
+        parent_id = stored.get("parent_id")
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self._load(stored["checkpoint"]),
+            metadata=self._load(stored["metadata"]),
+            parent_config={
+                "configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}
+            } if parent_id else None,
+            pending_writes=pending
+        )
+
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        thread_id, ns, checkpoint_id = self._target(config)
+        try:
+            if not checkpoint_id:
+                latest = await self.client.zrevrange(self._index_key(thread_id, ns), 0, 0)
+                if not latest:
+                    return None
+                checkpoint_id = latest[0]
+            return await self._tuple(thread_id, ns, checkpoint_id)
+        except redis.RedisError as e:
+            print(f"Error loading checkpoint for {thread_id}: {e}")
+            return None
+
+    async def alist(
+        self,
+        config: Optional[Dict[str, Any]],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Checkpoints of one thread, newest first (listing across threads is not supported)"""
+        if not config:
+            return
+        thread_id, ns, checkpoint_id = self._target(config)
+        before_id = before["configurable"].get("checkpoint_id") if before else None
+        try:
+            ids = await self.client.zrevrange(self._index_key(thread_id, ns), 0, -1)
+        except redis.RedisError as e:
+            print(f"Error listing checkpoints for {thread_id}: {e}")
+            return
+
+        returned = 0
+        for candidate in ids:
+            if checkpoint_id and candidate != checkpoint_id:
+                continue
+            if before_id and candidate >= before_id:
+                continue
+            found = await self._tuple(thread_id, ns, candidate)
+            if not found:
+                continue
+            if filter and any(found.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            yield found
+            returned += 1
+            if limit and returned >= limit:
+                return
+
+    # Writes
+
+    async def aput(
+        self,
+        config: Dict[str, Any],
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        thread_id, ns, parent_id = self._target(config)
+        checkpoint_id = checkpoint["id"]
+        index_key = self._index_key(thread_id, ns)
+        key = self._checkpoint_key(thread_id, ns, checkpoint_id)
+        stored = {"checkpoint": self._dump(checkpoint), "metadata": self._dump(metadata)}
+        if parent_id:
+            stored["parent_id"] = parent_id
+
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping=stored)
+                pipe.expire(key, self.ttl)
+                pipe.zadd(index_key, {checkpoint_id: time.time()})
+                pipe.expire(index_key, self.ttl)
+                pipe.zrange(index_key, 0, -(self.history + 1))
+                *_, expired = await pipe.execute()
+            if expired:
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.zrem(index_key, *expired)
+                    for old in expired:
+                        pipe.delete(self._checkpoint_key(thread_id, ns, old), self._writes_key(thread_id, ns, old))
+                    await pipe.execute()
+        except redis.RedisError as e:
+            print(f"Error saving checkpoint for {thread_id}: {e}")
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}}
+
+    async def aput_writes(
+        self,
+        config: Dict[str, Any],
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id, ns, checkpoint_id = self._target(config)
+        key = self._writes_key(thread_id, ns, checkpoint_id)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                for idx, (channel, value) in enumerate(writes):
+                    field = f"{task_id}:{WRITES_IDX_MAP.get(channel, idx)}"
+                    entry = json.dumps([task_id, channel, self._dump(value)])
+                    # Special channels (errors, interrupts) overwrite; regular writes are kept once
+                    if WRITES_IDX_MAP.get(channel, idx) < 0:
+                        pipe.hset(key, field, entry)
+                    else:
+                        pipe.hsetnx(key, field, entry)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f"Error saving checkpoint writes for {thread_id}: {e}")
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"career:checkpoint*:{thread_id}:*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Redis-backed when per-session state is shared across workers, otherwise in-process"""
+    if settings.state_backend == "redis":
+        return RedisCheckpointSaver()
+    return MemorySaver()
@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+import redis.asyncio as redis
+
+from config import get_settings
+
+settings = get_settings()
+
+
+class DashboardCounters:
+    """Per-user dashboard numbers kept as a Redis hash (career:dashboard:{user_id}).
+
+    Every write to job_matches, learning_plans or interview_sessions updates
+    the hash at the same time, so a stats read is one HGETALL, however much
+    history the user has. Job matches and the active learning plan replace
+    their fields, since each save replaces the user's set. Redis errors are
+    logged and never fail the write they accompany.
+
+    Two fields have no API write path yet. interviews_completed only
+    increments when a session is saved with feedback or a score. The
+    interview agent saves sessions when it poses the questions and does not
+    score answers yet, so the field moves only when a session is scored
+    elsewhere and the change-feed rebuild recounts it (worker.py
+    --change-feed). applications_sent is read but nothing records
+    applications, so it stays 0.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+
+    def _key(self, user_id: str) -> str:
+        return f"career:dashboard:{user_id}"
+
+    async def _update(self, user_id: str, fields: Dict[str, Any] = None, increments: Dict[str, int] = None):
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                key = self._key(user_id)
+                for field, amount in (increments or {}).items():
+                    pipe.hincrby(key, field, amount)
+                pipe.hset(key, mapping={**(fields or {}), "last_updated": datetime.utcnow().isoformat()})
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error updating dashboard counters for {user_id}: {e}")
+
+    async def set_job_matches(self, user_id: str, fit_scores: Iterable[Optional[float]]):
+        """The user's stored matches were replaced by these (one score per match)"""
+        scores = list(fit_scores)
+        scored = [s for s in scores if s is not None]
+        await self._update(user_id, {
+            "total_job_matches": len(scores),
+            "match_score_sum": sum(scored),
+            "match_score_count": len(scored)
+        })
+
+    async def set_learning_plan(self, user_id: str, plan: Dict[str, Any]):
+        """A new active plan replaced the previous one"""
+        weeks = plan.get("weeks") or []
+        hours = sum(float(week.get("hours_per_week") or 0) for week in weeks if isinstance(week, dict))
+        focuses = {week.get("focus") for week in weeks if isinstance(week, dict) and week.get("focus")}
+        await self._update(user_id, {"total_learning_hours": hours, "skills_learning": len(focuses)})
+
+    async def add_interview(self, user_id: str):
+        await self._update(user_id, increments={"interviews_completed": 1})
+
+    async def set_interviews(self, user_id: str, count: int):
+        """Recounted after interview sessions changed outside the API (change feed)"""
+        await self._update(user_id, {"interviews_completed": count})
+
+    async def get(self, user_id: str) -> Dict[str, Any]:
+        """The dashboard row (frontend DashboardRow shape); zeros for users without activity"""
+        try:
+            stored = await self.client.hgetall(self._key(user_id))
+        except Exception as e:
+            print(f"Error reading dashboard counters for {user_id}: {e}")
+            stored = {}
+
+        count = int(stored.get("match_score_count") or 0)
+        return {
+            "user_id": user_id,
+            "total_job_matches": int(stored.get("total_job_matches") or 0),
+            "avg_match_score": round(float(stored.get("match_score_sum") or 0) / count, 1) if count else 0,
+            "skills_learning": int(stored.get("skills_learning") or 0),
+            "total_learning_hours": float(stored.get("total_learning_hours") or 0),
+            "applications_sent": int(stored.get("applications_sent") or 0),
+            "interviews_completed": int(stored.get("interviews_completed") or 0),
+            "last_updated": stored.get("last_updated")
+        }
+
+
+_counters: Optional[DashboardCounters] = None
+
+
+def get_dashboard_counters() -> DashboardCounters:
+    global _counters
+    if _counters is None:
+        _counters = DashboardCounters()
+    return _counters
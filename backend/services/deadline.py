@@ -0,0 +1,81 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a step cannot finish within the request's remaining budget"""
+
+
+class Deadline:
+    """Absolute per-request deadline.
+
+    Stored as wall-clock epoch seconds so it can travel inside LangGraph state
+    (and through checkpoints) and still mean the same instant.
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.time() + seconds)
+
+    @classmethod
+    def from_state(cls, state: Dict) -> Optional["Deadline"]:
+        expires_at = state.get("deadline")
+        return cls(expires_at) if expires_at else current_deadline()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        """True if at least `seconds` of budget is left for the next step"""
+        return self.remaining() >= seconds
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """Make `deadline` the current deadline for everything awaited inside the block"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def has_budget(seconds: float, deadline: Optional[Deadline] = None) -> bool:
+    """True if there is no deadline or at least `seconds` remain on it"""
+    deadline = deadline or current_deadline()
+    return deadline is None or deadline.allows(seconds)
+
+
+async def run_with_deadline(awaitable: Awaitable[Any], deadline: Optional[Deadline] = None) -> Any:
+    """Await with whatever budget remains on the (current) deadline"""
+    deadline = deadline or current_deadline()
+    if deadline is None:
+        return await awaitable
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        # Close the un-awaited coroutine so it does not warn
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Request deadline already passed")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded(f"Step did not finish in the remaining {remaining:.2f}s") from e
@@ -0,0 +1,160 @@
+import re
+import zlib
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from config import get_settings
+
+settings = get_settings()
+
+# Boards that syndicate postings; a company's own careers page is the better canonical URL
+AGGREGATOR_DOMAINS = (
+    "linkedin.com", "indeed.com", "glassdoor.com", "ziprecruiter.com", "monster.com",
+    "simplyhired.com", "careerbuilder.com", "dice.com", "wellfound.com", "builtin.com"
+)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or our the to we with you your "
+    "job jobs hiring apply now role position com".split()
+) | {domain.split(".")[0] for domain in AGGREGATOR_DOMAINS}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+# Mersenne prime for universal hashing; token hashes are 32-bit so products fit in uint64
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _tokens(text: str) -> set:
+    return {t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS}
+
+
+def _features(job: Dict[str, Any]) -> np.ndarray:
+    """Hashed words of the title and the start of the description.
+
+    Unigrams rather than n-grams: boards rewrite snippets ("X at Acme" vs
+    "Acme hiring X"), so word order is not a stable signal.
+    """
+    words = _tokens(f"{job.get('title', '')} {(job.get('description') or '')[:500]}")
+    return np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+
+
+def _same_role(a: set, b: set) -> bool:
+    """Titles name the same role: every word of one appears in the other.
+
+    Containment rather than similarity, since boards pad titles with the company
+    name, while "Backend" vs "Frontend" is a single word but a different job.
+    A title with no words names no role and matches nothing, since it would
+    otherwise be contained in every title.
+    """
+    if not a or not b:
+        return False
+    return a <= b or b <= a
+
+
+class MinHasher:
+    """MinHash signatures (universal hashing over shingle hashes) with banded LSH.
+
+    Two jobs whose shingle sets have Jaccard similarity J share a band with
+    probability 1 - (1 - J^rows)^bands; candidates are then confirmed on the
+    estimated similarity (the fraction of equal signature slots).
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, features: np.ndarray) -> np.ndarray:
+        if not len(features):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashed = (features[:, None] * self._a + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> List[tuple]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+
+_hasher = MinHasher()
+
+
+def _is_aggregator(url: str) -> bool:
+    host = urlsplit(url or "").netloc.lower()
+    return any(host == domain or host.endswith("." + domain) for domain in AGGREGATOR_DOMAINS)
+
+
+def _canonical_rank(job: Dict[str, Any]) -> tuple:
+    """Lower is better: fully crawled, employer site, then the most complete description"""
+    return (not job.get("content_hash"), _is_aggregator(job.get("url", "")), -len(job.get("description") or ""))
+
+
+def dedupe_jobs(jobs: List[Dict[str, Any]], threshold: float = None) -> List[Dict[str, Any]]:
+    """Collapse near-duplicate postings (the same role syndicated across boards).
+
+    Each group keeps the position of its first member, so ranked input stays
+    ranked. It keeps the fields of its best canonical member, the highest
+    fit_score seen, and the other URLs in `alternate_urls`.
+    """
+    if len(jobs) < 2:
+        return jobs
+    threshold = settings.job_dedup_threshold if threshold is None else threshold
+
+    signatures = [_hasher.signature(_features(job)) for job in jobs]
+    titles = [_tokens(job.get("title", "")) for job in jobs]
+    parent = list(range(len(jobs)))
+    # Members per root: containment is not transitive, so a merge must hold for every pair
+    members_of: Dict[int, List[int]] = {i: [i] for i in range(len(jobs))}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[tuple, List[int]] = {}
+    for i, signature in enumerate(signatures):
+        for key in _hasher.band_keys(signature):
+            buckets.setdefault(key, []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for a, i in enumerate(members):
+            for j in members[a + 1:]:
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                if not _same_role(titles[i], titles[j]) or np.mean(signatures[i] == signatures[j]) < threshold:
+                    continue
+                root_i, root_j = find(i), find(j)
+                if all(_same_role(titles[x], titles[y]) for x in members_of[root_i] for y in members_of[root_j]):
+                    root, child = min(root_i, root_j), max(root_i, root_j)
+                    parent[child] = root
+                    members_of[root] += members_of.pop(child)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(jobs)):
+        groups.setdefault(find(i), []).append(i)
+
+    deduped = []
+    for root in sorted(groups):
+        members = [jobs[i] for i in groups[root]]
+        if len(members) == 1:
+            deduped.append(members[0])
+            continue
+        canonical = dict(min(members, key=_canonical_rank))
+        scores = [job["fit_score"] for job in members if job.get("fit_score") is not None]
+        if scores:
+            canonical["fit_score"] = max(scores)
+        alternates = list(canonical.get("alternate_urls") or [])
+        for job in members:
+            for url in [job.get("url")] + list(job.get("alternate_urls") or []):
+                if url and url != canonical.get("url") and url not in alternates:
+                    alternates.append(url)
+        canonical["alternate_urls"] = alternates
+        deduped.append(canonical)
+    return deduped
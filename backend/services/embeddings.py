@@ -0,0 +1,165 @@
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from config import get_settings
+from services.deadline import run_with_deadline
+from services.vector_store import get_job_store
+
+settings = get_settings()
+
+NOMIC_EMBED_URL = "https://api-atlas.nomic.ai/v1/embedding/text"
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+
+def profile_text(skills: List[str], target_roles: Optional[List[str]] = None) -> str:
+    """Text embedded for a candidate: what they know and what they want"""
+    roles = ", ".join(target_roles or [])
+    return f"Target roles: {roles}. Skills: {', '.join(skills)}"
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text embedded for a posting"""
+    return f"{job.get('title', '')}. {job.get('company', '')}. {job.get('description', '')}"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Local, deterministic stand-in for a real embedding model.
+
+    Hashes word unigrams/bigrams into signed buckets (the "hashing trick"), so
+    texts sharing vocabulary land close together. Good enough for offline tests
+    and benchmarks; no network or model weights needed.
+    """
+
+    name = "local-hashing"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return vector
+
+    async def embed(self, texts: List[str], task_type: str = "search_document") -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return _normalize(np.stack([self._embed_one(t) for t in texts]))
+
+
+class NomicEmbedder:
+    """Nomic Embed (text) over the Atlas HTTP API"""
+
+    name = "nomic"
+
+    def __init__(self, api_key: str, dim: int, model: str):
+        self.api_key = api_key
+        self.dim = dim
+        self.model = model
+
+    async def embed(self, texts: List[str], task_type: str = "search_document") -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        vectors = []
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            for i in range(0, len(texts), settings.embedding_batch_size):
+                response = await run_with_deadline(client.post(
+                    NOMIC_EMBED_URL,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    json={
+                        "model": self.model,
+                        "texts": texts[i:i + settings.embedding_batch_size],
+                        "task_type": task_type,
+                        "dimensionality": self.dim
+                    }
+                ))
+                response.raise_for_status()
+                vectors.extend(response.json()["embeddings"])
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+_embedder = None
+
+
+def get_embedder():
+    """Nomic when configured (or forced), otherwise the local hashing stand-in"""
+    global _embedder
+    if _embedder is None:
+        provider = settings.embedding_provider
+        if provider == "nomic" or (provider == "auto" and settings.nomic_api_key):
+            _embedder = NomicEmbedder(settings.nomic_api_key, settings.embedding_dim, settings.nomic_embedding_model)
+        else:
+            _embedder = HashingEmbedder(settings.embedding_dim)
+    return _embedder
+
+
+def embedding_matching_enabled() -> bool:
+    """Whether job fit is scored by vector similarity instead of per-job LLM prompts"""
+    mode = settings.job_scoring
+    return mode == "embedding" or (mode == "auto" and bool(settings.nomic_api_key))
+
+
+class EmbeddingPipeline:
+    """Embeds profiles and job postings and matches them through a vector store"""
+
+    def __init__(self, store=None, embedder=None):
+        self.store = store if store is not None else get_job_store()
+        self.embedder = embedder or get_embedder()
+
+    async def embed_profile(self, user_id: str, skills: List[str], target_roles: List[str]) -> np.ndarray:
+        """Compute a profile's skill embedding and store it (profiles.skill_embeddings)"""
+        vector = (await self.embedder.embed([profile_text(skills, target_roles)], "search_query"))[0]
+        await self.store.save_profile_embedding(user_id, vector)
+        return vector
+
+    async def index_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+        """Embed postings (e.g. fresh search results) and add them to the store"""
+        jobs = [job for job in jobs if job.get("url")]
+        if not jobs:
+            return 0
+        vectors = await self.embedder.embed([job_text(job) for job in jobs], "search_document")
+        await self.store.add_jobs(jobs, vectors)
+        return len(jobs)
+
+    async def match_jobs(
+        self,
+        skills: List[str],
+        target_roles: List[str],
+        k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Top-K postings by cosine similarity, with fit_score on the 0-100 scale.
+
+        A read: the query vector is not stored (embed_profile does that when a
+        profile is analyzed).
+        """
+        query = (await self.embedder.embed([profile_text(skills, target_roles)], "search_query"))[0]
+
+        matches = await self.store.search(query, k)
+        for job in matches:
+            similarity = job.pop("similarity", 0.0)
+            job["fit_score"] = int(round(max(0.0, min(1.0, similarity)) * 100))
+        return matches
+
+
+_pipeline: Optional[EmbeddingPipeline] = None
+
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = EmbeddingPipeline()
+    return _pipeline
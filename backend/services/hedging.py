@@ -0,0 +1,212 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config import get_settings
+from services.deadline import DeadlineExceeded
+
+settings = get_settings()
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one provider"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until the window has enough samples"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through after the cooldown"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def release_probe(self):
+        """The probe ended without a verdict (cancelled or out of budget); allow another"""
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ProviderHealth:
+    """Latency, circuit state and hedging counters for one provider"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(
+            settings.llm_circuit_failure_threshold,
+            settings.llm_circuit_reset_seconds
+        )
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def hedge_delay(self) -> float:
+        p90 = self.latency.percentile(90)
+        return p90 if p90 is not None else settings.llm_hedge_default_delay_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        p90 = self.latency.percentile(90)
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+            "wins": self.wins,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "circuit": self.breaker.state,
+            "p90_ms": round(p90 * 1000, 1) if p90 is not None else None
+        }
+
+
+_providers: Dict[str, ProviderHealth] = {}
+
+
+def get_provider_health(name: str) -> ProviderHealth:
+    if name not in _providers:
+        _providers[name] = ProviderHealth(name)
+    return _providers[name]
+
+
+def hedging_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: health.stats() for name, health in _providers.items()}
+
+
+class HedgedLLM:
+    """Primary LLM with a secondary provider for hedging and failover.
+
+    If the primary circuit is open, calls fail over to the secondary outright.
+    With hedging enabled, a primary call still running after its rolling p90
+    is raced against the same prompt on the secondary; the first successful
+    answer wins and the other call is cancelled. Hedges are capped at
+    llm_hedge_max_ratio of the primary's calls to bound the extra cost.
+    """
+
+    def __init__(self, primary_name: str, primary, secondary_name: str, secondary):
+        self.primary = primary
+        self.secondary = secondary
+        self.primary_health = get_provider_health(primary_name)
+        self.secondary_health = get_provider_health(secondary_name)
+
+    async def _call(self, llm, health: ProviderHealth, messages, args, kwargs):
+        start = time.monotonic()
+        try:
+            result = await llm.ainvoke(messages, *args, **kwargs)
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # Running out of request budget says nothing about provider health,
+            # but a half-open probe must not stay claimed forever
+            health.breaker.release_probe()
+            raise
+        except Exception:
+            health.breaker.record_failure()
+            raise
+        health.latency.record(time.monotonic() - start)
+        health.breaker.record_success()
+        return result
+
+    def _may_hedge(self) -> bool:
+        health = self.primary_health
+        if not settings.llm_hedging_enabled:
+            return False
+        return health.hedges < settings.llm_hedge_max_ratio * health.calls
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        primary, secondary = self.primary_health, self.secondary_health
+
+        if not primary.breaker.allow():
+            if secondary.breaker.allow():
+                primary.failovers += 1
+                secondary.calls += 1
+                result = await self._call(self.secondary, secondary, messages, args, kwargs)
+                secondary.wins += 1
+                return result
+            # Both circuits open: try the primary anyway rather than failing fast
+
+        primary.calls += 1
+        primary_task = asyncio.create_task(self._call(self.primary, primary, messages, args, kwargs))
+        if not self._may_hedge():
+            result = await primary_task
+            primary.wins += 1
+            return result
+
+        secondary_task = None
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=primary.hedge_delay())
+            if done or not secondary.breaker.allow():
+                result = await primary_task
+                primary.wins += 1
+                return result
+
+            primary.hedges += 1
+            secondary.calls += 1
+            secondary_task = asyncio.create_task(
+                self._call(self.secondary, secondary, messages, args, kwargs)
+            )
+            owners = {primary_task: primary, secondary_task: secondary}
+            pending = set(owners)
+            error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = owners[task]
+                        winner.wins += 1
+                        if task is secondary_task:
+                            secondary.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary_task, secondary_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def __getattr__(self, name):
+        return getattr(self.primary, name)
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import get_settings
+from services.skills import AhoCorasick
+
+settings = get_settings()
+
+DEFAULT_INTENTS = Path(__file__).resolve().parent.parent / "data" / "intents.json"
+
+
+class IntentMatcher:
+    """Keyword intent classifier: every intent's keywords in one automaton.
+
+    One pass over the lowercased message collects all keyword hits. Each hit
+    must start a word, so "job" also counts "jobs". Overlapping hits resolve
+    leftmost-longest, so "mock interview" counts once, not as "mock" plus
+    "interview". Each intent scores the summed weights of its hits, and the
+    best intent wins with confidence = its share of the total score.
+    """
+
+    def __init__(self, intents: Dict[str, Dict[str, float]], min_score: float = 0.5):
+        self.intents = list(intents)
+        self.min_score = min_score
+        # keyword -> [(intent, weight)]; one keyword may count toward several intents
+        self.weights: Dict[str, List[Tuple[str, float]]] = {}
+        for intent, keywords in intents.items():
+            for keyword, weight in keywords.items():
+                self.weights.setdefault(keyword.lower(), []).append((intent, float(weight)))
+        self.automaton = AhoCorasick(self.weights)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "IntentMatcher":
+        data = json.loads(Path(path or DEFAULT_INTENTS).read_text())
+        return cls(data["intents"], data.get("min_score", 0.5))
+
+    def scores(self, message: str) -> Dict[str, float]:
+        text = message.lower()
+        hits = [
+            (start, end, self.automaton.patterns[index])
+            for start, end, index in self.automaton.iter(text)
+            if start == 0 or not text[start - 1].isalnum()
+        ]
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+
+        scores = dict.fromkeys(self.intents, 0.0)
+        last_end = 0
+        for start, end, keyword in hits:
+            if start >= last_end:
+                for intent, weight in self.weights[keyword]:
+                    scores[intent] += weight
+                last_end = end
+        return scores
+
+    def classify(self, message: str) -> Tuple[str, float]:
+        """(intent, confidence); ("general", 0.0) when nothing scores min_score.
+        Ties go to the intent listed first in the config."""
+        scores = self.scores(message)
+        best = max(self.intents, key=lambda intent: scores[intent], default=None)
+        if best is None or scores[best] < self.min_score:
+            return "general", 0.0
+        return best, round(scores[best] / sum(scores.values()), 3)
+
+
+_matcher: Optional[IntentMatcher] = None
+_loaded_mtime = 0.0
+_checked_at = 0.0
+
+
+def get_intent_matcher() -> IntentMatcher:
+    """Shared matcher, rebuilt when the intents file changes on disk.
+
+    The file's mtime is checked at most every intents_reload_seconds. A file
+    that fails to parse keeps the previous matcher.
+    """
+    global _matcher, _loaded_mtime, _checked_at
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < settings.intents_reload_seconds:
+        return _matcher
+    _checked_at = now
+
+    path = settings.intents_path or DEFAULT_INTENTS
+    try:
+        mtime = os.stat(path).st_mtime
+        if _matcher is None or mtime != _loaded_mtime:
+            _matcher = IntentMatcher.load(path)
+            _loaded_mtime = mtime
+    except Exception as e:
+        if _matcher is None:
+            raise
+        print(f"Error reloading intents from {path}: {e}")
+    return _matcher
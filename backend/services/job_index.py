@@ -0,0 +1,298 @@
+import fcntl
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+META_FILE = "index.json"
+# Serializes snapshot writes to one directory
+WRITE_LOCK_FILE = "write.lock"
+# Held for its lifetime by the one process that saves the index
+WRITER_LOCK_FILE = "writer.lock"
+INITIAL_CAPACITY = 1024
+# Rows scored per matrix product; bounds the float32 scratch space for int8 blocks
+SEARCH_BLOCK_ROWS = 16384
+# Compact once this share of rows are tombstones
+COMPACT_RATIO = 0.25
+
+
+class JobEmbeddingIndex:
+    """In-process job embedding index with exact top-K search.
+
+    Vectors live in one contiguous float32 matrix (or int8 codes plus a per-row
+    scale when quantized, 4x smaller). Every search is a batched matrix product
+    over that block. Deletes leave tombstones that are compacted away once they
+    pile up. The index saves to .npy files that load memory-mapped, so workers
+    reading the same file share pages and restart without re-embedding. The
+    pages stay shared until a worker adds a new or changed posting; the matrix
+    is then copied into that worker's RAM.
+    """
+
+    def __init__(self, dim: int, quantize: bool = False):
+        self.dim = dim
+        self.quantize = quantize
+        self._size = 0
+        self._vectors = np.zeros((INITIAL_CAPACITY, dim), dtype=np.int8 if quantize else np.float32)
+        self._scales = np.ones(INITIAL_CAPACITY, dtype=np.float32)
+        self._live = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._added_at = np.zeros(INITIAL_CAPACITY, dtype=np.float64)
+        self.jobs: List[Optional[Dict[str, Any]]] = []
+        self.positions: Dict[str, int] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    # ---- storage ----
+
+    def _reserve(self, extra: int):
+        """Make room for `extra` appended rows; also copies memory-mapped data into RAM"""
+        needed = self._size + extra
+        capacity = len(self._vectors)
+        if needed <= capacity and self._vectors.flags.writeable:
+            return
+        capacity = max(needed, capacity * 2, INITIAL_CAPACITY)
+
+        def grow(array: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self._vectors = grow(self._vectors, 0)
+        self._scales = grow(self._scales, 1.0)
+        self._live = grow(self._live, False)
+        self._added_at = grow(self._added_at, 0.0)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if not self.quantize:
+            return vectors, np.ones(len(vectors), dtype=np.float32)
+        # Symmetric per-row scaling: the largest component maps to +-127
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def add(self, jobs: List[Dict[str, Any]], vectors: np.ndarray, now: Optional[float] = None) -> int:
+        """Insert postings, replacing any already indexed under the same URL"""
+        now = now or time.time()
+        codes, scales = self._encode(vectors)
+
+        new_urls = {job["url"] for job in jobs} - self.positions.keys()
+        self._reserve(len(new_urls))
+
+        rows = np.empty(len(jobs), dtype=np.int64)
+        for i, job in enumerate(jobs):
+            position = self.positions.get(job["url"])
+            if position is None:
+                position = self.positions[job["url"]] = self._size
+                self.jobs.append(job)
+                self._size += 1
+            else:
+                self.jobs[position] = job
+            rows[i] = position
+
+        self._vectors[rows] = codes
+        self._scales[rows] = scales
+        self._live[rows] = True
+        self._added_at[rows] = now
+        self.dirty = True
+        return len(jobs)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        position = self.positions.get(url)
+        return self.jobs[position] if position is not None else None
+
+    def touch(self, urls: List[str], now: Optional[float] = None):
+        """Reset the expiry clock of postings seen again unchanged; the matrix is not written"""
+        now = now or time.time()
+        for url in urls:
+            position = self.positions.get(url)
+            if position is not None:
+                self._added_at[position] = now
+
+    def remove(self, urls: List[str]) -> int:
+        """Drop postings by URL; rows become tombstones until the next compaction"""
+        removed = 0
+        for url in urls:
+            position = self.positions.pop(url, None)
+            if position is None:
+                continue
+            self._live[position] = False
+            self.jobs[position] = None
+            removed += 1
+        if removed:
+            self.dirty = True
+            if self._size - len(self.positions) > max(INITIAL_CAPACITY, self._size * COMPACT_RATIO):
+                self.compact()
+        return removed
+
+    def expire(self, before: float) -> int:
+        """Drop postings indexed before the given epoch time"""
+        stale = np.flatnonzero(self._live[:self._size] & (self._added_at[:self._size] < before))
+        return self.remove([self.jobs[i]["url"] for i in stale])
+
+    def compact(self):
+        """Rewrite the matrix without tombstones"""
+        keep = np.flatnonzero(self._live[:self._size])
+        self._vectors = self._vectors[keep]
+        self._scales = self._scales[keep]
+        self._live = self._live[keep]
+        self._added_at = self._added_at[keep]
+        self.jobs = [self.jobs[i] for i in keep]
+        self.positions = {job["url"]: i for i, job in enumerate(self.jobs)}
+        self._size = len(keep)
+
+    # ---- search ----
+
+    def search_batch(self, queries: np.ndarray, k: int) -> List[List[Dict[str, Any]]]:
+        """Top-K postings for each query row, best first, with a `similarity` field"""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        if not self.positions or k <= 0:
+            return [[] for _ in queries]
+
+        scores = np.empty((len(queries), self._size), dtype=np.float32)
+        for start in range(0, self._size, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, self._size)
+            block = self._vectors[start:end]
+            if self.quantize:
+                scores[:, start:end] = (queries @ block.astype(np.float32).T) * self._scales[start:end]
+            else:
+                scores[:, start:end] = queries @ block.T
+        scores[:, ~self._live[:self._size]] = -np.inf
+
+        k = min(k, len(self.positions))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            results.append([dict(self.jobs[i], similarity=float(row[i])) for i in ordered])
+        return results
+
+    def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        return self.search_batch(query, k)[0]
+
+    # ---- persistence ----
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the live rows, safe to write from another thread while the index changes"""
+        keep = np.flatnonzero(self._live[:self._size])
+        return {
+            "dim": self.dim,
+            "quantize": self.quantize,
+            "vectors": self._vectors[keep],
+            "scales": self._scales[keep],
+            "added_at": self._added_at[keep].tolist(),
+            "jobs": [self.jobs[i] for i in keep],
+        }
+
+    @staticmethod
+    def write_snapshot(path: str, snapshot: Dict[str, Any]):
+        """Write a snapshot under `path`.
+
+        Arrays go to uniquely named .npy files and the metadata file is swapped in
+        last (atomic rename), so readers always see a complete index. Writers
+        take turns under a file lock. The generation being replaced is kept for
+        readers that just read the old metadata; older ones are unlinked.
+        Processes still mapping them keep their pages.
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        with _flock(directory / WRITE_LOCK_FILE):
+            JobEmbeddingIndex._write_generation(directory, snapshot)
+
+    @staticmethod
+    def _write_generation(directory: Path, snapshot: Dict[str, Any]):
+        keep = set()
+        try:
+            previous = json.loads((directory / META_FILE).read_text())
+            keep.update((previous["vectors"], previous["scales"]))
+        except (OSError, ValueError, KeyError):
+            pass
+
+        generation = uuid.uuid4().hex[:12]
+        vectors_file = f"vectors-{generation}.npy"
+        scales_file = f"scales-{generation}.npy"
+        np.save(directory / vectors_file, snapshot["vectors"])
+        np.save(directory / scales_file, snapshot["scales"])
+
+        meta = {
+            "dim": snapshot["dim"],
+            "quantize": snapshot["quantize"],
+            "vectors": vectors_file,
+            "scales": scales_file,
+            "added_at": snapshot["added_at"],
+            "jobs": snapshot["jobs"],
+        }
+        tmp = directory / f"{META_FILE}.{generation}.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, directory / META_FILE)
+
+        keep.update((vectors_file, scales_file))
+        for old in list(directory.glob("vectors-*.npy")) + list(directory.glob("scales-*.npy")):
+            if old.name not in keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    def save(self, path: str):
+        self.write_snapshot(path, self.snapshot())
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["JobEmbeddingIndex"]:
+        """Open a saved index with its matrix memory-mapped read-only; None if absent"""
+        directory = Path(path)
+        meta_path = directory / META_FILE
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+
+        index = cls(meta["dim"], quantize=meta["quantize"])
+        index._vectors = np.load(directory / meta["vectors"], mmap_mode="r")
+        index._scales = np.load(directory / meta["scales"])
+        index._size = len(index._vectors)
+        index._live = np.ones(index._size, dtype=bool)
+        index._added_at = np.asarray(meta["added_at"], dtype=np.float64)
+        index.jobs = meta["jobs"]
+        index.positions = {job["url"]: i for i, job in enumerate(index.jobs)}
+        return index
+
+
+@contextmanager
+def _flock(path: Path):
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+_writer_locks: Dict[str, Any] = {}
+
+
+def claim_writer(path: str) -> bool:
+    """True if this process is (or just became) the one that saves the index at `path`.
+
+    The first process to ask holds the lock until it exits. The others serve
+    the index they loaded and never overwrite the writer's snapshot.
+    """
+    key = os.path.abspath(path)
+    if key in _writer_locks:
+        return _writer_locks[key] is not None
+    Path(path).mkdir(parents=True, exist_ok=True)
+    handle = open(Path(path) / WRITER_LOCK_FILE, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        handle = None
+    _writer_locks[key] = handle
+    return handle is not None
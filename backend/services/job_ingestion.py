@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from config import get_settings
+from services.deadline import Deadline, deadline_scope
+from services.embeddings import get_embedding_pipeline
+from services.rate_limiter import get_limiter
+from services.singleflight import get_singleflight
+
+settings = get_settings()
+
+# Query parameters that identify the click, not the posting
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "trk", "refid", "trackingid", "src", "ref")
+DESCRIPTION_CHARS = 4000
+CACHE_SIZE = 10000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_MARKDOWN_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)|\[([^\]]*)\]\([^)]*\)|[#*_`>|]+")
+_LOCATION_RE = re.compile(r"(?im)^\W*(?:job\s+)?location\s*[:\-]\s*(.+)$")
+_COMPANY_RE = re.compile(r"(?im)^\W*company(?:\s+name)?\s*[:\-]\s*(.+)$")
+_POSTED_RE = re.compile(r"(?i)\b(?:re)?posted\s*:?\s*(\d+\+?\s+\w+\s+ago|on\s+[\w ,]+\d{4}|today|yesterday)")
+# "Backend Engineer at Acme | LinkedIn", "Acme hiring Backend Engineer in Austin"
+_TITLE_AT_RE = re.compile(r"^(?P<title>.+?)\s+at\s+(?P<company>.+)$", re.I)
+_TITLE_HIRING_RE = re.compile(r"^(?P<company>.+?)\s+hiring\s+(?P<title>.+?)(?:\s+in\s+(?P<location>.+))?$", re.I)
+
+
+def canonical_url(url: str) -> str:
+    """One spelling per posting: lowercase host, no fragment, tracking params or trailing slash"""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(_WHITESPACE_RE.sub(" ", text).strip().lower().encode()).hexdigest()
+
+
+def normalize_posting(url: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Turn a Firecrawl scrape (markdown + page metadata) into a job posting record"""
+    markdown = data.get("markdown") or ""
+    if not markdown.strip():
+        return None
+    metadata = data.get("metadata") or {}
+
+    # Page titles carry site suffixes ("... | LinkedIn", "... - Indeed.com")
+    raw_title = (metadata.get("ogTitle") or metadata.get("title") or "").strip()
+    raw_title = re.split(r"\s+[|–—]\s+|\s+-\s+(?=[\w.]+\.\w+$)", raw_title)[0].strip()
+    title, company, location = raw_title or "Unknown Role", None, None
+    match = _TITLE_AT_RE.match(raw_title) or _TITLE_HIRING_RE.match(raw_title)
+    if match:
+        title = match.group("title").strip()
+        company = match.group("company").strip()
+        location = match.groupdict().get("location")
+
+    if not company:
+        found = _COMPANY_RE.search(markdown)
+        company = found.group(1).strip() if found else None
+    if not location:
+        found = _LOCATION_RE.search(markdown)
+        location = found.group(1).strip() if found else None
+    posted = _POSTED_RE.search(markdown)
+
+    text = _WHITESPACE_RE.sub(" ", _MARKDOWN_RE.sub(r"\1", markdown)).strip()
+    return {
+        "url": url,
+        "title": title,
+        "company": company or "Unknown",
+        "location": location or "See link",
+        "description": text[:DESCRIPTION_CHARS],
+        "posted": posted.group(1) if posted else "Recent",
+        "content_hash": content_hash(text),
+    }
+
+
+class DomainThrottle:
+    """Per-domain politeness: a cap on requests in flight and a minimum gap between starts"""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        semaphore = self._slots.setdefault(domain, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(domain, 0.0))
+            self._next_start[domain] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class JobIngestionPipeline:
+    """Fetches full job postings for search-result URLs through Firecrawl.
+
+    Requests go through a per-domain throttle, then the shared "firecrawl"
+    limiter (request rate, adaptive concurrency, Retry-After). A posting is never
+    crawled twice: URLs are canonicalized, coalesced while in flight and looked up
+    in a local cache and the job store first. Identical content found under a
+    second URL is stored once. New postings stream into the job store in batches.
+    """
+
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings or get_embedding_pipeline()
+        self.limiter = get_limiter("firecrawl")
+        self.domains = DomainThrottle(settings.firecrawl_domain_concurrency, settings.firecrawl_domain_interval_seconds)
+        self._flight = get_singleflight("firecrawl_scrape")
+        self._postings: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._hashes: Dict[str, str] = {}
+        # Pages that scraped fine but held no posting text (listing pages, login walls)
+        self._empty: set = set()
+        self._background: set = set()
+
+        self.crawled = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.failures = 0
+        self.stored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.firecrawl_api_key)
+
+    def _remember(self, url: str, posting: Dict[str, Any]):
+        self._postings[url] = posting
+        self._postings.move_to_end(url)
+        while len(self._postings) > CACHE_SIZE:
+            _, evicted = self._postings.popitem(last=False)
+            if self._hashes.get(evicted.get("content_hash")) == evicted["url"]:
+                del self._hashes[evicted["content_hash"]]
+        if posting.get("content_hash"):
+            self._hashes.setdefault(posting["content_hash"], posting["url"])
+
+    async def lookup(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Already-crawled postings by canonical URL (local cache, then the job store)"""
+        found, missing = {}, []
+        for url in dict.fromkeys(canonical_url(u) for u in urls if u):
+            if url in self._postings:
+                self._postings.move_to_end(url)
+                found[url] = self._postings[url]
+            else:
+                missing.append(url)
+        self.cache_hits += len(found)
+
+        if missing:
+            stored = await self.embeddings.store.get_jobs(missing)
+            for url, posting in stored.items():
+                self._remember(url, posting)
+            found.update(stored)
+            self.cache_hits += len(stored)
+        return found
+
+    async def _scrape(self, url: str) -> Dict[str, Any]:
+        async with httpx.AsyncClient(timeout=settings.firecrawl_timeout_seconds) as client:
+            response = await client.post(
+                f"{settings.firecrawl_api_url.rstrip('/')}/v1/scrape",
+                headers={"Authorization": f"Bearer {settings.firecrawl_api_key}"},
+                json={"url": url, "formats": ["markdown"], "onlyMainContent": True}
+            )
+            response.raise_for_status()
+            body = response.json()
+        if not body.get("success", True):
+            raise ValueError(body.get("error") or "Firecrawl scrape failed")
+        return body.get("data") or {}
+
+    async def _fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        """Crawl one canonical URL; None if it failed, was empty or duplicates a known posting"""
+        async with self.domains.slot(urlsplit(url).netloc):
+            try:
+                data = await self.limiter.call(lambda: self._scrape(url), 1)
+            except Exception as e:
+                self.failures += 1
+                print(f"Error crawling {url}: {e}")
+                return None
+        self.crawled += 1
+
+        posting = normalize_posting(url, data)
+        if posting is None:
+            if len(self._empty) >= CACHE_SIZE:
+                self._empty.clear()
+            self._empty.add(url)
+            return None
+        original = self._hashes.get(posting["content_hash"])
+        if original and original != url:
+            # Same posting syndicated under another URL: point at the stored copy
+            self.duplicates += 1
+            self._remember(url, self._postings.get(original, posting))
+            return None
+        self._remember(url, posting)
+        return posting
+
+    async def crawl(self, urls: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield newly crawled postings as they complete; known URLs are skipped"""
+        urls = list(dict.fromkeys(canonical_url(u) for u in urls if u))
+        known = await self.lookup(urls)
+        todo = [url for url in urls if url not in known and url not in self._empty]
+        if not todo:
+            return
+
+        tasks = [asyncio.create_task(self._flight.do(url, lambda url=url: self._fetch(url))) for url in todo]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                posting = await next_done
+                if posting is not None:
+                    yield posting
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def ingest(self, urls: Iterable[str]) -> int:
+        """Crawl URLs and stream the new postings into the job store; returns how many were stored"""
+        stored = 0
+        batch: List[Dict[str, Any]] = []
+        async for posting in self.crawl(urls):
+            batch.append(posting)
+            if len(batch) >= settings.job_ingest_batch:
+                stored += await self.embeddings.index_jobs(batch)
+                batch = []
+        if batch:
+            stored += await self.embeddings.index_jobs(batch)
+        self.stored += stored
+        return stored
+
+    def schedule(self, urls: Iterable[str]):
+        """Ingest in the background, outside the caller's request deadline"""
+        urls = list(urls)
+
+        async def run():
+            with deadline_scope(Deadline.after(settings.task_timeout_seconds)):
+                try:
+                    await self.ingest(urls)
+                except Exception as e:
+                    print(f"Error ingesting job postings: {e}")
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def enrich(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Swap search snippets for full postings already crawled; crawl the rest in the background"""
+        if not self.enabled:
+            return jobs
+        known = await self.lookup(job["url"] for job in jobs if job.get("url"))
+        enriched, missing = [], []
+        for job in jobs:
+            if not job.get("url"):
+                enriched.append(job)
+                continue
+            url = canonical_url(job["url"])
+            if url in known:
+                enriched.append(dict(known[url]))
+            else:
+                # Index snippets under the same URL the full posting will replace
+                enriched.append(dict(job, url=url))
+                missing.append(url)
+        if missing:
+            self.schedule(missing)
+        return enriched
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "crawled": self.crawled,
+            "cache_hits": self.cache_hits,
+            "duplicates": self.duplicates,
+            "failures": self.failures,
+            "stored": self.stored,
+            "cached_postings": len(self._postings),
+            "background_tasks": len(self._background)
+        }
+
+
+_pipeline: Optional[JobIngestionPipeline] = None
+
+
+def get_ingestion_pipeline() -> JobIngestionPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = JobIngestionPipeline()
+    return _pipeline
+
+
+def ingestion_stats() -> Dict[str, Any]:
+    return _pipeline.stats() if _pipeline else {}
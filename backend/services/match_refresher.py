@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from config import get_settings
+from services.deadline import Deadline, deadline_scope
+from services.skills import canonicalize_skills
+
+settings = get_settings()
+
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """Stable hash of the profile fields job matches depend on (skills, roles, level, locations)"""
+    key = {
+        "skills": sorted({s.lower() for s in canonicalize_skills(profile.get("skills"))}),
+        "target_roles": sorted({r.strip().lower() for r in profile.get("target_roles") or []}),
+        "experience_level": (profile.get("experience_level") or "").strip().lower(),
+        "preferred_locations": sorted({l.strip().lower() for l in profile.get("preferred_locations") or []}),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32]
+
+
+class JobMatchRefresher:
+    """Recomputes job matches for active users in bulk and upserts them into job_matches.
+
+    Users whose stored matches were computed for their current profile and are
+    younger than job_matches_max_age_hours are skipped.
+    """
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.memory = orchestrator.memory
+
+    async def _needs_refresh(self, user_id: str, fingerprint: str) -> bool:
+        stored = await self.memory.get_job_matches(user_id, limit=1)
+        if not stored or stored[0].get("profile_fingerprint") != fingerprint:
+            return True
+        refreshed_at = stored[0].get("refreshed_at")
+        if not refreshed_at:
+            return True
+        age = datetime.utcnow() - datetime.fromisoformat(refreshed_at.replace("Z", "+00:00")).replace(tzinfo=None)
+        return age > timedelta(hours=settings.job_matches_max_age_hours)
+
+    async def refresh_active_users(self) -> Dict[str, int]:
+        since = datetime.utcnow() - timedelta(days=settings.job_matches_active_days)
+        user_ids = await self.memory.get_active_user_ids(since)
+
+        semaphore = asyncio.Semaphore(settings.job_matches_refresh_concurrency)
+        jobs_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        fingerprints: Dict[str, str] = {}
+        failed = 0
+
+        async def refresh(user_id: str):
+            nonlocal failed
+            async with semaphore:
+                # One bad row (profile, stored match) must not abort the whole run
+                try:
+                    profile = await self.memory.get_user_profile(user_id)
+                    fingerprint = profile_fingerprint(profile)
+                    if not await self._needs_refresh(user_id, fingerprint):
+                        return
+                    with deadline_scope(Deadline.after(settings.task_timeout_seconds)):
+                        jobs_by_user[user_id] = await self.orchestrator.compute_job_matches(user_id, profile)
+                    fingerprints[user_id] = fingerprint
+                except Exception as e:
+                    failed += 1
+                    print(f"Error refreshing job matches for {user_id}: {e}")
+
+        await asyncio.gather(*(refresh(user_id) for user_id in user_ids))
+
+        # Write in chunks so one refresh run is a handful of upserts, not one per user
+        batch = list(jobs_by_user)
+        for i in range(0, len(batch), settings.job_matches_write_batch):
+            chunk = batch[i:i + settings.job_matches_write_batch]
+            await self.memory.save_job_matches_bulk(
+                {user_id: jobs_by_user[user_id] for user_id in chunk},
+                fingerprints
+            )
+
+        return {
+            "active_users": len(user_ids),
+            "refreshed": len(jobs_by_user),
+            "skipped": len(user_ids) - len(jobs_by_user) - failed,
+            "failed": failed
+        }
@@ -1,35 +1,47 @@
-from typing import Dict, List, Any
-from datetime import datetime
-from services.supabase_client import supabase_client
+from typing import Dict, List, Any, Optional
+import asyncio
+from datetime import datetime, timedelta, timezone
+from services.storage import Storage, get_storage
+from services.singleflight import get_singleflight
+from services.dashboard_stats import get_dashboard_counters
+from config import get_settings
 import json
 
+settings = get_settings()
+
 class MemoryService:
-    """Service for managing user memory and conversation history using Supabase + pgvector"""
+    """Service for managing user memory and conversation history.
+
+    Rows are persisted through a Storage backend (services/storage.py):
+    Supabase + pgvector when configured, otherwise a local SQLite file.
+    """
     
-    def __init__(self):
-        self.client = supabase_client
+    def __init__(self, storage: Optional[Storage] = None):
+        self.storage = storage or get_storage()
+        self._profile_flight = get_singleflight("profile_load")
+        # Dashboard stats are maintained on every write below, never aggregated on read
+        self.counters = get_dashboard_counters()
     
     async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
-        """Get user profile from Supabase"""
-        if not self.client:
-            return self._default_profile()
-            
+        """Get user profile from storage"""
+        profile = await self._profile_flight.do(user_id, lambda: self._load_user_profile(user_id))
+        # Callers mutate the profile, so each gets its own copy
+        return dict(profile)
+    
+    async def _load_user_profile(self, user_id: str) -> Dict[str, Any]:
+        """Fetch a single profile row"""
         try:
-            result = self.client.table("profiles").select("*").eq("user_id", user_id).single().execute()
-            return result.data if result.data else self._default_profile()
+            return await self.storage.load_profile(user_id) or self._default_profile()
         except:
             return self._default_profile()
     
     async def save_user_profile(self, user_id: str, profile: Dict[str, Any]):
-        """Save user profile to Supabase"""
-        if not self.client:
-            return
-            
+        """Save user profile to storage"""
         profile["user_id"] = user_id
         profile["updated_at"] = datetime.utcnow().isoformat()
         
         try:
-            self.client.table("profiles").upsert(profile).execute()
+            await self.storage.save_profile(user_id, profile)
         except Exception as e:
             print(f"Error saving profile: {e}")
     
@@ -39,29 +51,30 @@ class MemoryService:
         session_id: str,
         limit: int = 10
     ) -> List[Any]:
-        """Get conversation history from Supabase"""
-        if not self.client:
-            return []
-            
+        """Get conversation history, including sessions moved to the archive"""
         try:
-            result = self.client.table("conversations") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .eq("session_id", session_id) \
-                .order("created_at", desc=True) \
-                .limit(limit) \
-                .execute()
+            # Newest turns first, so a session reopened after archival keeps its context
+            rows = await self.storage.load_history(user_id, session_id, limit)
             
             # Format for LangChain
             from langchain_core.messages import HumanMessage, AIMessage
             history = []
-            for msg in reversed(result.data):
+            for msg in reversed(rows):
                 history.append(HumanMessage(content=msg["user_message"]))
                 history.append(AIMessage(content=msg["ai_response"]))
             return history
         except:
             return []
     
+    async def archive_idle_conversations(self, idle_days: Optional[int] = None) -> Dict[str, Any]:
+        """Move sessions idle for idle_days into the archive and drop emptied month partitions"""
+        idle_before = datetime.now(timezone.utc) - timedelta(days=idle_days or settings.conversation_archive_idle_days)
+        return await self.storage.archive_idle_conversations(
+            idle_before,
+            settings.conversation_archive_batch,
+            settings.conversation_partition_months_ahead
+        )
+    
     async def save_message(
         self,
         user_id: str,
@@ -69,10 +82,7 @@ class MemoryService:
         user_message: str,
         ai_response: str
     ):
-        """Save conversation message to Supabase"""
-        if not self.client:
-            return
-            
+        """Save conversation message to storage"""
         data = {
             "user_id": user_id,
             "session_id": session_id,
@@ -82,10 +92,134 @@ class MemoryService:
         }
         
         try:
-            self.client.table("conversations").insert(data).execute()
+            await self.storage.save_message(data)
         except Exception as e:
             print(f"Error saving message: {e}")
 
+    async def get_job_matches(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Materialized job matches for a user, best fit first (single indexed query)"""
+        try:
+            return await self.storage.load_job_matches(user_id, limit)
+        except Exception as e:
+            print(f"Error loading job matches: {e}")
+            return []
+    
+    async def save_job_matches(
+        self,
+        user_id: str,
+        jobs: List[Dict[str, Any]],
+        profile_fingerprint: Optional[str] = None
+    ):
+        """Replace a user's stored job matches with a fresh set"""
+        await self.save_job_matches_bulk({user_id: jobs}, {user_id: profile_fingerprint})
+    
+    async def save_job_matches_bulk(
+        self,
+        jobs_by_user: Dict[str, List[Dict[str, Any]]],
+        fingerprints: Optional[Dict[str, Optional[str]]] = None
+    ):
+        """Upsert matches for many users in one write, then prune rows the refresh dropped"""
+        if not jobs_by_user:
+            return
+        
+        fingerprints = fingerprints or {}
+        now = datetime.utcnow().isoformat()
+        rows = []
+        scores_by_user = {}
+        for user_id, jobs in jobs_by_user.items():
+            # (user_id, url) is unique; keep the best-scored copy of each posting
+            by_url: Dict[str, Dict[str, Any]] = {}
+            for job in jobs:
+                url = job.get("url") or ""
+                if url not in by_url or (job.get("fit_score") or 0) > (by_url[url].get("fit_score") or 0):
+                    by_url[url] = job
+            scores_by_user[user_id] = [job.get("fit_score") for job in by_url.values()]
+            rows.extend(
+                {
+                    "user_id": user_id,
+                    "title": job.get("title", "Unknown Role"),
+                    "company": job.get("company") or "Unknown",
+                    "location": job.get("location"),
+                    "fit_score": job.get("fit_score"),
+                    "url": url,
+                    "description": job.get("description"),
+                    "alternate_urls": job.get("alternate_urls") or [],
+                    "profile_fingerprint": fingerprints.get(user_id),
+                    "refreshed_at": now
+                }
+                for url, job in by_url.items()
+            )
+        
+        try:
+            await self.storage.replace_job_matches(list(jobs_by_user), rows, now)
+        except Exception as e:
+            print(f"Error saving job matches: {e}")
+            return
+        
+        await asyncio.gather(*(
+            self.counters.set_job_matches(user_id, scores) for user_id, scores in scores_by_user.items()
+        ))
+    
+    async def get_active_user_ids(self, since: datetime) -> List[str]:
+        """Users with conversations since the given time"""
+        try:
+            return await self.storage.active_user_ids(since)
+        except Exception as e:
+            print(f"Error loading active users: {e}")
+            return []
+    
+    async def save_learning_plan(self, user_id: str, plan: Dict[str, Any]):
+        """Store a new active learning plan, retiring the previous one"""
+        now = datetime.utcnow().isoformat()
+        data = {
+            "user_id": user_id,
+            "plan_data": plan,
+            "status": "active",
+            "created_at": now,
+            "updated_at": now
+        }
+        
+        try:
+            await self.storage.save_learning_plan(data)
+        except Exception as e:
+            print(f"Error saving learning plan: {e}")
+            return
+        
+        await self.counters.set_learning_plan(user_id, plan)
+    
+    async def save_interview_session(
+        self,
+        user_id: str,
+        role: str,
+        transcript: List[Dict[str, Any]],
+        feedback: Optional[str] = None,
+        score: Optional[int] = None
+    ):
+        """Store a mock interview session.
+
+        It counts toward interviews_completed only once it has feedback or a
+        score. The interview agent saves sessions without either when it poses
+        the questions.
+        """
+        data = {
+            "user_id": user_id,
+            "role": role,
+            "transcript": transcript,
+            "feedback": feedback,
+            "score": score,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        
+        try:
+            await self.storage.save_interview_session(data)
+        except Exception as e:
+            print(f"Error saving interview session: {e}")
+            return
+        
+        # A session saved when the questions are posed is only started
+        if feedback is not None or score is not None:
+            await self.counters.add_interview(user_id)
+
     def _default_profile(self) -> Dict[str, Any]:
         return {
             "skills": [],
@@ -0,0 +1,388 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+import redis.asyncio as redis
+
+from config import get_settings
+from services.deadline import run_with_deadline
+from services.redis_guard import RedisCooldown, fail_fast_client
+
+settings = get_settings()
+
+# Upstream statuses worth retrying; 429 additionally shrinks the concurrency window
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider keeps throttling after all retries"""
+
+
+class TokenBucket:
+    """Refilling token bucket; amounts above capacity are clamped so they can still pass"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters FIFO so large requests are not starved
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    async def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) tokens once the real cost is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+# Refill and take (or force-charge) atomically on the Redis clock; returns the seconds
+# to wait as a string, since Lua numbers come back truncated to integers
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local force = ARGV[4] == '1'
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if force or tokens >= amount then
+    tokens = math.min(capacity, tokens - amount)
+else
+    wait = (amount - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """TokenBucket whose state lives in Redis, so every worker process draws on one
+    provider quota instead of each granting itself the full RPM/TPM.
+
+    Falls back to a process-local bucket while Redis is unreachable. After a
+    failure the local bucket is used for redis_outage_cooldown_seconds before
+    Redis is tried again, and each outage is logged once.
+    """
+
+    def __init__(self, name: str, per_minute: float, capacity: Optional[float] = None, client=None):
+        self.key = f"career:ratelimit:{name}"
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.client = client or fail_fast_client()
+        self._script = self.client.register_script(_BUCKET_SCRIPT)
+        self._local = TokenBucket(per_minute, capacity)
+        self._lock = asyncio.Lock()
+        self._redis = RedisCooldown(f"Shared rate limit {self.key}")
+
+    async def _take(self, amount: float, force: bool = False) -> float:
+        wait = float(await self._script(keys=[self.key], args=[self.rate, self.capacity, amount, int(force)]))
+        self._redis.succeeded()
+        return wait
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        # Waiters in this process stay FIFO; across processes the first retry after a refill wins
+        async with self._lock:
+            while True:
+                if not self._redis.available():
+                    await self._local.acquire(amount)
+                    return
+                try:
+                    wait = await self._take(amount)
+                except redis.RedisError as e:
+                    self._redis.failed(e)
+                    await self._local.acquire(amount)
+                    return
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def adjust(self, delta: float):
+        if self._redis.available():
+            try:
+                await self._take(delta, force=True)
+                return
+            except redis.RedisError as e:
+                self._redis.failed(e)
+        await self._local.adjust(delta)
+
+
+class AIMDConcurrency:
+    """Additive-increase / multiplicative-decrease limit on in-flight calls"""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        decrease_factor: float = 0.5
+    ):
+        self.limit = float(initial)
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            # Slow responses are an early overload signal; back off gently
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self):
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds requested by the provider's Retry-After header, if any"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if _status_code(exc) in RETRYABLE_STATUS:
+        return True
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    return type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def _estimate_tokens(messages: Any, completion_tokens: int) -> int:
+    """Rough prompt size (~4 chars per token) plus the expected completion"""
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars // 4 + completion_tokens
+
+
+def _actual_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("total_tokens")
+
+
+class ProviderLimiter:
+    """Client-side limiter for one LLM provider.
+
+    Calls wait for request and token budget (token buckets sized to the RPM/TPM
+    quota), then for a slot in the adaptive concurrency window. Throttled or
+    transient failures are retried with full-jitter backoff, never sooner than
+    the provider's Retry-After.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        latency_target: float = 10.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        completion_tokens: int = 512,
+        shared: bool = False
+    ):
+        self.name = name
+        # The concurrency window below always adapts per process
+        self.requests = self._bucket("requests", requests_per_minute, shared)
+        self.tokens = self._bucket("tokens", tokens_per_minute, shared)
+        self.concurrency = AIMDConcurrency(
+            initial=max(min_concurrency, max_concurrency // 2),
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+            latency_target=latency_target
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.completion_tokens = completion_tokens
+
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def _bucket(self, kind: str, per_minute: int, shared: bool):
+        if per_minute <= 0:
+            return None
+        # Shared buckets enforce the quota across worker processes
+        return RedisTokenBucket(f"{self.name}:{kind}", per_minute) if shared else TokenBucket(per_minute)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _admit(self, estimated_tokens: int) -> float:
+        """Wait for budget and a concurrency slot; returns the time spent queued"""
+        start = time.monotonic()
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(estimated_tokens)
+        await self.concurrency.acquire()
+        waited = time.monotonic() - start
+
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+        return waited
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        """Run fn() under the provider's limits, retrying throttled calls"""
+        self.calls += 1
+        attempt = 0
+        while True:
+            await self._admit(estimated_tokens)
+            start = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                if _status_code(e) == 429:
+                    self.throttled += 1
+                    self.concurrency.on_throttle()
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self.failures += 1
+                    if _status_code(e) == 429:
+                        raise RateLimitExceeded(f"{self.name} still throttling after {attempt} retries") from e
+                    raise
+                delay = self._backoff(attempt, _retry_after(e))
+            else:
+                self.concurrency.on_success(time.monotonic() - start)
+                actual = _actual_tokens(result)
+                if self.tokens and actual:
+                    await self.tokens.adjust(actual - min(estimated_tokens, self.tokens.capacity))
+                return result
+            finally:
+                await self.concurrency.release()
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        admitted = self.calls + self.retries
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "queue_wait_avg_ms": round(self.queue_wait_total / admitted * 1000, 2) if admitted else 0.0,
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2)
+        }
+
+
+class RateLimitedLLM:
+    """Wraps a LangChain chat model so every ainvoke goes through a ProviderLimiter
+    and is bounded by the current request deadline"""
+
+    def __init__(self, llm, limiter: ProviderLimiter):
+        self.llm = llm
+        self.limiter = limiter
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        estimated = _estimate_tokens(messages, self.limiter.completion_tokens)
+        # Queueing, retries and the call itself all share the request's remaining budget
+        return await run_with_deadline(self.limiter.call(
+            lambda: self.llm.ainvoke(messages, *args, **kwargs),
+            estimated
+        ))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+# One limiter per provider, shared by every agent in the process
+_limiters: Dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Get (or create) the limiter for "groq" or "deepseek" from settings"""
+    if provider not in _limiters:
+        _limiters[provider] = ProviderLimiter(
+            name=provider,
+            requests_per_minute=getattr(settings, f"{provider}_rpm"),
+            tokens_per_minute=getattr(settings, f"{provider}_tpm"),
+            max_concurrency=getattr(settings, f"{provider}_max_concurrency"),
+            latency_target=settings.llm_latency_target_seconds,
+            max_retries=settings.llm_max_retries,
+            shared=settings.state_backend == "redis"
+        )
+    return _limiters[provider]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
@@ -0,0 +1,47 @@
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from config import get_settings
+
+settings = get_settings()
+
+
+def fail_fast_client(url: Optional[str] = None) -> redis.Redis:
+    """Redis client for request paths that have a local fallback: an unreachable
+    server fails within redis_fail_fast_timeout_seconds instead of blocking"""
+    return redis.from_url(
+        url or settings.redis_url,
+        decode_responses=True,
+        socket_connect_timeout=settings.redis_fail_fast_timeout_seconds,
+        socket_timeout=settings.redis_fail_fast_timeout_seconds
+    )
+
+
+class RedisCooldown:
+    """Skips Redis for redis_outage_cooldown_seconds after a failure.
+
+    Callers check available() before a Redis call, use their local fallback
+    while it is False, and report the call's outcome with failed()/succeeded().
+    Each outage is logged once when it starts and once when Redis answers again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._until = 0.0
+        self.outage = False
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._until
+
+    def failed(self, error: Exception):
+        self._until = time.monotonic() + settings.redis_outage_cooldown_seconds
+        if not self.outage:
+            self.outage = True
+            print(f"{self.name}: Redis unavailable, using the local fallback: {error}")
+
+    def succeeded(self):
+        if self.outage:
+            self.outage = False
+            print(f"{self.name}: Redis available again")
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import get_settings
+from services.deadline import current_deadline
+from services.job_ingestion import canonical_url
+
+settings = get_settings()
+
+# Results per Serper page
+PAGE_SIZE = 10
+# Reciprocal-rank-fusion constant: damps the advantage of the very top ranks
+RRF_K = 60
+
+SENIORITY_TERMS = {
+    "intern": "intern",
+    "entry": "entry level",
+    "junior": "junior",
+    "graduate": "graduate",
+    "senior": "senior",
+    "lead": "lead",
+    "staff": "staff",
+    "principal": "principal",
+}
+
+
+def _seniority(experience_level: Optional[str]) -> str:
+    level = (experience_level or "").lower()
+    for key, term in SENIORITY_TERMS.items():
+        if key in level:
+            return term
+    return ""
+
+
+def plan_queries(
+    skills: List[str],
+    roles: List[str],
+    experience_level: Optional[str] = None,
+    locations: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Expand a profile into targeted search queries, most valuable first.
+
+    Tiers: each role with seniority and top skills, each role per preferred
+    location, then each role with the next skills. Within a tier roles take
+    turns, so a budget cut still covers every role.
+    """
+    seniority = _seniority(experience_level)
+    roles = [r for r in roles[:3] if r] or [" ".join(skills[:2]) or "software engineer"]
+    top_skills = " ".join(skills[:2])
+    more_skills = " ".join(skills[2:4])
+
+    tiers = [
+        [{"q": f"{seniority} {role} {top_skills} jobs", "weight": 1.0} for role in roles],
+        [
+            {"q": f"{seniority} {role} jobs", "location": location, "weight": 0.9}
+            for location in (locations or [])[:2] for role in roles
+        ],
+        [{"q": f"{role} {more_skills} jobs", "weight": 0.7} for role in roles if more_skills],
+    ]
+
+    queries, seen = [], set()
+    for tier in tiers:
+        for query in tier:
+            query["q"] = " ".join(query["q"].split())
+            key = (query["q"].lower(), query.get("location"))
+            if key not in seen:
+                seen.add(key)
+                queries.append(query)
+    return queries
+
+
+class SearchFanout:
+    """Runs planned queries concurrently under a per-request query budget.
+
+    Results merge as each page arrives. A posting's rank is its reciprocal-rank
+    fusion score summed over every query that returned it. While the merged set
+    is short of the target, queries that still surface new postings fetch their
+    next page. If the request deadline hits, whatever has merged so far is
+    returned.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Dict[str, Any], int], Awaitable[List[Dict[str, Any]]]],
+        budget: int = None,
+        concurrency: int = None,
+        target_results: int = None,
+        max_pages: int = None
+    ):
+        self.fetch = fetch
+        self.budget = budget or settings.job_search_query_budget
+        self.concurrency = concurrency or settings.job_search_concurrency
+        self.target_results = target_results or settings.job_search_target_results
+        self.max_pages = max_pages or settings.job_search_max_pages
+        self.requests = 0
+
+    async def run(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_page(query: Dict[str, Any], page: int):
+            async with semaphore:
+                return query, page, await self.fetch(query, page)
+
+        def start(query: Dict[str, Any], page: int) -> asyncio.Task:
+            self.requests += 1
+            return asyncio.create_task(fetch_page(query, page))
+
+        def merge(query: Dict[str, Any], page: int, results: List[Dict[str, Any]]) -> int:
+            new = 0
+            for rank, job in enumerate(results, (page - 1) * PAGE_SIZE + 1):
+                if not job.get("url"):
+                    continue
+                key = canonical_url(job["url"])
+                score = query["weight"] / (RRF_K + rank)
+                if key in merged:
+                    merged[key]["search_score"] += score
+                else:
+                    merged[key] = dict(job, search_score=score)
+                    new += 1
+            return new
+
+        pending = {start(query, 1) for query in queries[:self.budget]}
+        deadline = current_deadline()
+        try:
+            while pending:
+                timeout = deadline.remaining() if deadline else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    try:
+                        query, page, results = task.result()
+                    except Exception as e:
+                        print(f"Error in job search query: {e}")
+                        continue
+                    new = merge(query, page, results)
+                    # Only dig deeper while short of results and the query still finds new postings
+                    if (
+                        new
+                        and len(results) >= PAGE_SIZE
+                        and page < self.max_pages
+                        and len(merged) < self.target_results
+                        and self.requests < self.budget
+                    ):
+                        pending.add(start(query, page + 1))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        ranked = sorted(merged.values(), key=lambda job: job["search_score"], reverse=True)
+        for job in ranked:
+            job["search_score"] = round(job["search_score"], 5)
+        return ranked
@@ -0,0 +1,154 @@
+import json
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import get_settings
+
+settings = get_settings()
+
+DEFAULT_DICTIONARY = Path(__file__).resolve().parent.parent / "data" / "skills.json"
+# Separators of resume skill lists ("Python, Go | AWS • Docker")
+_SEGMENT_RE = re.compile(r"[,;\n|•·/]+|\s-\s|\band\b")
+_WORD_RE = re.compile(r"[A-Za-z][\w+#.]*")
+# Single-letter skills (C, R) only count when uppercase and set off like a list item
+_LIST_NEIGHBOURS = set(" \t\n,;/|()[]•·")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one linear pass over the text finds every pattern occurrence"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        # Breadth-first failure links; outputs inherit those of their failure state
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[nxt] = self.goto[state].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter(self, text: str):
+        """Yield (start, end, pattern_index) for every occurrence"""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for index in self.output[node]:
+                yield i + 1 - len(self.patterns[index]), i + 1, index
+
+
+class SkillDictionary:
+    """Canonical skills with aliases, compiled into one Aho-Corasick automaton.
+
+    Text is lowercased once and scanned in a single pass. A hit counts only
+    at word boundaries, and case-sensitive terms ("Go", "JS") must match with
+    their exact casing. Overlapping hits resolve leftmost-longest, so
+    "React Native" wins over "React".
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], case_sensitive: Iterable[str] = ()):
+        self.canonical: Dict[str, str] = {}
+        for name, aliases in skills.items():
+            for term in [name] + list(aliases):
+                self.canonical.setdefault(term.lower(), name)
+        self.exact: Dict[str, Set[str]] = {}
+        for term in case_sensitive:
+            self.exact.setdefault(term.lower(), set()).add(term)
+        self.automaton = AhoCorasick(self.canonical)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SkillDictionary":
+        data = json.loads(Path(path or DEFAULT_DICTIONARY).read_text())
+        return cls(data["skills"], data.get("case_sensitive", []))
+
+    def _accept(self, text: str, start: int, end: int, pattern: str) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        if len(pattern) == 1:
+            # Lowercase "c" or "r" in prose is a word or a typo, never the language
+            if not text[start:end].isupper():
+                return False
+            if before not in _LIST_NEIGHBOURS or after not in _LIST_NEIGHBOURS:
+                return False
+        # Trailing "." is sentence punctuation, not part of a name like "Node.js"
+        if before.isalnum() or before == "_" or after.isalnum() or after in "_+#":
+            return False
+        exact = self.exact.get(pattern)
+        return exact is None or text[start:end] in exact
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Non-overlapping (start, end, canonical skill) hits in text order"""
+        lowered = text.lower()
+        hits = [
+            (start, end, self.automaton.patterns[index])
+            for start, end, index in self.automaton.iter(lowered)
+            if self._accept(text, start, end, self.automaton.patterns[index])
+        ]
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+        selected, last_end = [], 0
+        for start, end, pattern in hits:
+            if start >= last_end:
+                selected.append((start, end, self.canonical[pattern]))
+                last_end = end
+        return selected
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(skill for _, _, skill in self.find(text)))
+
+    def coverage(self, text: str) -> float:
+        """Share of short list-like segments (e.g. "Python, k8s, Terraform") that
+        contain a known skill; low coverage means the dictionary is missing things"""
+        segments = [s.strip() for s in _SEGMENT_RE.split(text)]
+        segments = [s for s in segments if s and len(_WORD_RE.findall(s)) <= 4]
+        if not segments:
+            return 1.0
+        matched = sum(1 for s in segments if self.find(s))
+        return matched / len(segments)
+
+    def canonicalize(self, skill: str) -> str:
+        """Canonical name for a known skill or alias; unknown skills are only tidied"""
+        cleaned = " ".join(skill.split())
+        return self.canonical.get(cleaned.lower(), cleaned)
+
+
+_dictionary: Optional[SkillDictionary] = None
+
+
+def get_skill_dictionary() -> SkillDictionary:
+    global _dictionary
+    if _dictionary is None:
+        _dictionary = SkillDictionary.load(settings.skills_dictionary_path or None)
+    return _dictionary
+
+
+def canonicalize_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """Map aliases to canonical names ("k8s" -> "Kubernetes") and drop duplicates, keeping order"""
+    dictionary = get_skill_dictionary()
+    canonical = (dictionary.canonicalize(s) for s in skills or [] if isinstance(s, str) and s.strip())
+    return list(dict.fromkeys(canonical))
@@ -0,0 +1,454 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+
+from config import get_settings
+from services.deadline import run_with_deadline
+from services.supabase_client import supabase_client
+
+settings = get_settings()
+
+
+class Storage(Protocol):
+    """Persistence behind MemoryService: profiles, conversations, job matches,
+    learning plans and interview sessions.
+
+    Rows are plain dicts shaped like the Supabase tables (database_schema.sql).
+    Methods raise on failure; MemoryService decides what a failed read returns.
+    """
+
+    async def load_profile(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]): ...
+
+    async def load_history(self, user_id: str, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Newest turns first, including archived sessions"""
+        ...
+
+    async def save_message(self, row: Dict[str, Any]): ...
+
+    async def load_job_matches(self, user_id: str, limit: int) -> List[Dict[str, Any]]: ...
+
+    async def replace_job_matches(self, user_ids: List[str], rows: List[Dict[str, Any]], refreshed_at: str):
+        """Upsert rows on (user_id, url), then delete the users' rows older than refreshed_at"""
+        ...
+
+    async def active_user_ids(self, since: datetime) -> List[str]: ...
+
+    async def save_learning_plan(self, row: Dict[str, Any]):
+        """Archive the user's active plan and insert this one"""
+        ...
+
+    async def save_interview_session(self, row: Dict[str, Any]): ...
+
+    async def archive_idle_conversations(
+        self, idle_before: datetime, max_sessions: int, months_ahead: int
+    ) -> Dict[str, Any]: ...
+
+
+class SupabaseStorage:
+    """Supabase (PostgREST) tables and the RPCs defined in database_schema.sql"""
+
+    def __init__(self, client=None):
+        self.client = client or supabase_client
+
+    async def _execute(self, query):
+        # The Supabase client is synchronous; run it off the event loop so
+        # concurrent requests can actually overlap
+        return await run_with_deadline(asyncio.to_thread(query.execute))
+
+    async def load_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        # maybe_single: a user without a profile row is a normal miss, not an error
+        query = self.client.table("profiles").select("*").eq("user_id", user_id).maybe_single()
+        result = await self._execute(query)
+        return result.data if result is not None else None
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]):
+        await self._execute(self.client.table("profiles").upsert(profile))
+
+    async def load_history(self, user_id: str, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        # Hot table and conversation_archives in one call (migrations/007)
+        result = await self._execute(self.client.rpc("conversation_history", {
+            "p_user_id": user_id,
+            "p_session_id": session_id,
+            "p_limit": limit
+        }))
+        return result.data or []
+
+    async def save_message(self, row: Dict[str, Any]):
+        await self._execute(self.client.table("conversations").insert(row))
+
+    async def load_job_matches(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        query = self.client.table("job_matches") \
+            .select("*") \
+            .eq("user_id", user_id) \
+            .order("fit_score", desc=True, nullsfirst=False) \
+            .limit(limit)
+        return (await self._execute(query)).data or []
+
+    async def replace_job_matches(self, user_ids: List[str], rows: List[Dict[str, Any]], refreshed_at: str):
+        if rows:
+            await self._execute(self.client.table("job_matches").upsert(rows, on_conflict="user_id,url"))
+        prune = self.client.table("job_matches") \
+            .delete() \
+            .in_("user_id", user_ids) \
+            .lt("refreshed_at", refreshed_at)
+        await self._execute(prune)
+
+    async def active_user_ids(self, since: datetime) -> List[str]:
+        result = await self._execute(self.client.rpc("active_user_ids", {"since": since.isoformat()}))
+        return [row["user_id"] for row in result.data or []]
+
+    async def save_learning_plan(self, row: Dict[str, Any]):
+        retire = self.client.table("learning_plans") \
+            .update({"status": "archived", "updated_at": row["created_at"]}) \
+            .eq("user_id", row["user_id"]) \
+            .eq("status", "active")
+        await self._execute(retire)
+        await self._execute(self.client.table("learning_plans").insert(row))
+
+    async def save_interview_session(self, row: Dict[str, Any]):
+        await self._execute(self.client.table("interview_sessions").insert(row))
+
+    async def archive_idle_conversations(
+        self, idle_before: datetime, max_sessions: int, months_ahead: int
+    ) -> Dict[str, Any]:
+        result = await self._execute(self.client.rpc("maintain_conversations", {
+            "idle_before": idle_before.isoformat(),
+            "max_sessions": max_sessions,
+            "months_ahead": months_ahead
+        }))
+        return result.data or {}
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,  -- the profile columns as one JSON object
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT,
+    session_id TEXT NOT NULL,
+    user_message TEXT NOT NULL,
+    ai_response TEXT NOT NULL,
+    agent_used TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_user_session_recent_idx
+    ON conversations (user_id, session_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS conversations_created_user_idx
+    ON conversations (created_at, user_id);
+CREATE TABLE IF NOT EXISTS conversation_archives (
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    turns BLOB NOT NULL,  -- zlib-compressed JSON list, oldest first
+    turn_count INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    last_message_at TEXT NOT NULL,
+    archived_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, session_id)
+);
+CREATE TABLE IF NOT EXISTS job_matches (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT,
+    fit_score INTEGER,
+    url TEXT,
+    description TEXT,
+    alternate_urls TEXT NOT NULL DEFAULT '[]',
+    profile_fingerprint TEXT,
+    refreshed_at TEXT,
+    created_at TEXT,
+    UNIQUE (user_id, url)
+);
+-- SQLite sorts NULLs last in DESC order already (Postgres needs NULLS LAST)
+CREATE INDEX IF NOT EXISTS job_matches_user_fit_idx
+    ON job_matches (user_id, fit_score DESC);
+CREATE TABLE IF NOT EXISTS learning_plans (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    plan_data TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS learning_plans_user_active_idx
+    ON learning_plans (user_id) WHERE status = 'active';
+CREATE TABLE IF NOT EXISTS interview_sessions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    transcript TEXT NOT NULL DEFAULT '[]',
+    feedback TEXT,
+    score INTEGER,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS interview_sessions_user_created_idx
+    ON interview_sessions (user_id, created_at DESC);
+"""
+
+# Statements are fixed strings with ? placeholders, so each pooled connection
+# compiles them once and reuses them from its statement cache
+SQL_UPSERT_PROFILE = """
+INSERT INTO profiles (user_id, data, updated_at) VALUES (?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET data = json_patch(profiles.data, excluded.data), updated_at = excluded.updated_at
+"""
+SQL_HISTORY = """
+SELECT user_message, ai_response, created_at FROM conversations
+WHERE user_id = ? AND session_id = ? ORDER BY created_at DESC LIMIT ?
+"""
+SQL_INSERT_MESSAGE = """
+INSERT INTO conversations (user_id, session_id, user_message, ai_response, agent_used, created_at)
+VALUES (:user_id, :session_id, :user_message, :ai_response, :agent_used, :created_at)
+"""
+SQL_UPSERT_MATCH = """
+INSERT INTO job_matches (user_id, title, company, location, fit_score, url, description,
+                         alternate_urls, profile_fingerprint, refreshed_at, created_at)
+VALUES (:user_id, :title, :company, :location, :fit_score, :url, :description,
+        :alternate_urls, :profile_fingerprint, :refreshed_at, :refreshed_at)
+ON CONFLICT (user_id, url) DO UPDATE SET
+    title = excluded.title, company = excluded.company, location = excluded.location,
+    fit_score = excluded.fit_score, description = excluded.description,
+    alternate_urls = excluded.alternate_urls, profile_fingerprint = excluded.profile_fingerprint,
+    refreshed_at = excluded.refreshed_at
+"""
+SQL_IDLE_SESSIONS = """
+SELECT user_id, session_id FROM conversations WHERE user_id IS NOT NULL
+GROUP BY user_id, session_id HAVING max(created_at) < ? LIMIT ?
+"""
+
+
+def _timestamp(value: datetime) -> str:
+    """ISO text in the naive-UTC form the rows are written with, so comparisons sort correctly"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+class SQLiteStorage:
+    """Local SQLite file in WAL mode, for single-node deployments and offline benchmarks.
+
+    A small pool of connections runs queries on worker threads. WAL lets
+    readers proceed while one writer commits, and synchronous=NORMAL syncs
+    at checkpoints instead of on every commit, so a write costs well under a
+    millisecond with no network hop. Several processes on one host can share
+    the file.
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: Optional[int] = None):
+        self.path = path or settings.sqlite_path
+        self.pool_size = pool_size or settings.sqlite_pool_size
+        # Connections open on first use, so a preloading server master never
+        # hands an open SQLite handle to its forked workers
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,  # a pooled connection is used by one thread at a time
+            isolation_level=None,  # transactions are explicit (BEGIN IMMEDIATE for writes)
+            cached_statements=128,
+            timeout=settings.sqlite_busy_timeout_seconds
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self._opened == 0:
+            conn.executescript(SQLITE_SCHEMA)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._connect() if self._opened < self.pool_size else None
+                if conn is not None:
+                    self._opened += 1
+            if conn is None:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """A connection inside a write transaction; taking the write lock up front avoids
+        a deadlock between two readers that both try to upgrade"""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    async def _run(self, fn, *args):
+        return await run_with_deadline(asyncio.to_thread(fn, *args))
+
+    async def load_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        def load():
+            with self._connection() as conn:
+                return conn.execute("SELECT data FROM profiles WHERE user_id = ?", (user_id,)).fetchone()
+        row = await self._run(load)
+        return {**json.loads(row["data"]), "user_id": user_id} if row else None
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]):
+        data = json.dumps({k: v for k, v in profile.items() if k != "user_id"}, default=str)
+
+        def save():
+            with self._write() as conn:
+                conn.execute(SQL_UPSERT_PROFILE, (user_id, data, profile.get("updated_at")))
+        await self._run(save)
+
+    async def load_history(self, user_id: str, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        def load():
+            with self._connection() as conn:
+                rows = [dict(r) for r in conn.execute(SQL_HISTORY, (user_id, session_id, limit))]
+                if len(rows) < limit:
+                    archived = conn.execute(
+                        "SELECT turns FROM conversation_archives WHERE user_id = ? AND session_id = ?",
+                        (user_id, session_id)
+                    ).fetchone()
+                    if archived:
+                        turns = json.loads(zlib.decompress(archived["turns"]))
+                        rows.extend(reversed(turns[-(limit - len(rows)):]))
+                return rows
+        return await self._run(load)
+
+    async def save_message(self, row: Dict[str, Any]):
+        row = {"agent_used": None, **row}
+
+        def save():
+            with self._write() as conn:
+                conn.execute(SQL_INSERT_MESSAGE, row)
+        await self._run(save)
+
+    async def load_job_matches(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        def load():
+            with self._connection() as conn:
+                return [dict(r) for r in conn.execute(
+                    "SELECT * FROM job_matches WHERE user_id = ? ORDER BY fit_score DESC LIMIT ?",
+                    (user_id, limit)
+                )]
+        rows = await self._run(load)
+        for row in rows:
+            row["alternate_urls"] = json.loads(row["alternate_urls"])
+        return rows
+
+    async def replace_job_matches(self, user_ids: List[str], rows: List[Dict[str, Any]], refreshed_at: str):
+        params = [{**row, "alternate_urls": json.dumps(row.get("alternate_urls") or [])} for row in rows]
+
+        def replace():
+            with self._write() as conn:
+                conn.executemany(SQL_UPSERT_MATCH, params)
+                conn.executemany(
+                    "DELETE FROM job_matches WHERE user_id = ? AND refreshed_at < ?",
+                    [(user_id, refreshed_at) for user_id in user_ids]
+                )
+        await self._run(replace)
+
+    async def active_user_ids(self, since: datetime) -> List[str]:
+        def load():
+            with self._connection() as conn:
+                return [r[0] for r in conn.execute(
+                    "SELECT DISTINCT user_id FROM conversations WHERE created_at >= ? AND user_id IS NOT NULL",
+                    (_timestamp(since),)
+                )]
+        return await self._run(load)
+
+    async def save_learning_plan(self, row: Dict[str, Any]):
+        def save():
+            with self._write() as conn:
+                conn.execute(
+                    "UPDATE learning_plans SET status = 'archived', updated_at = ? WHERE user_id = ? AND status = 'active'",
+                    (row["created_at"], row["user_id"])
+                )
+                conn.execute(
+                    "INSERT INTO learning_plans (user_id, plan_data, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (row["user_id"], json.dumps(row["plan_data"], default=str), row["status"],
+                     row["created_at"], row["updated_at"])
+                )
+        await self._run(save)
+
+    async def save_interview_session(self, row: Dict[str, Any]):
+        def save():
+            with self._write() as conn:
+                conn.execute(
+                    "INSERT INTO interview_sessions (user_id, role, transcript, feedback, score, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (row["user_id"], row["role"], json.dumps(row["transcript"], default=str),
+                     row.get("feedback"), row.get("score"), row["created_at"])
+                )
+        await self._run(save)
+
+    async def archive_idle_conversations(
+        self, idle_before: datetime, max_sessions: int, months_ahead: int
+    ) -> Dict[str, Any]:
+        """Same contract as maintain_conversations() in Postgres; SQLite has no partitions to manage"""
+        cutoff = _timestamp(idle_before)
+        now = _timestamp(datetime.utcnow())
+
+        def archive():
+            with self._write() as conn:
+                sessions = conn.execute(SQL_IDLE_SESSIONS, (cutoff, max_sessions)).fetchall()
+                for user_id, session_id in sessions:
+                    turns = [dict(r) for r in conn.execute(
+                        "SELECT user_message, ai_response, agent_used, created_at FROM conversations "
+                        "WHERE user_id = ? AND session_id = ? ORDER BY created_at",
+                        (user_id, session_id)
+                    )]
+                    existing = conn.execute(
+                        "SELECT turns, started_at FROM conversation_archives WHERE user_id = ? AND session_id = ?",
+                        (user_id, session_id)
+                    ).fetchone()
+                    started_at = turns[0]["created_at"]
+                    if existing:
+                        turns = json.loads(zlib.decompress(existing["turns"])) + turns
+                        started_at = existing["started_at"]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO conversation_archives "
+                        "(user_id, session_id, turns, turn_count, started_at, last_message_at, archived_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (user_id, session_id, zlib.compress(json.dumps(turns).encode()), len(turns),
+                         started_at, turns[-1]["created_at"], now)
+                    )
+                    conn.execute(
+                        "DELETE FROM conversations WHERE user_id = ? AND session_id = ?", (user_id, session_id)
+                    )
+                return len(sessions)
+        return {"sessions_archived": await self._run(archive)}
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    """Supabase when configured (or forced), otherwise the local SQLite file"""
+    global _storage
+    if _storage is None:
+        backend = settings.storage_backend
+        if backend == "supabase" or (backend == "auto" and supabase_client):
+            _storage = SupabaseStorage()
+        else:
+            _storage = SQLiteStorage()
+    return _storage
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+
+from config import get_settings
+
+settings = get_settings()
+
+# Heavy workflows that can run in the background worker (see worker.py)
+TASK_KINDS = {
+    "learning_roadmap": "generate_learning_roadmap",
+    "profile_analysis": "analyze_profile",
+    "job_matches": "find_job_matches",
+}
+
+PENDING_KEY = "career:tasks:pending"
+PROCESSING_KEY = "career:tasks:processing"
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class TaskQueue:
+    """Redis-backed queue for long-running agent workflows.
+
+    Each task is a hash at career:task:{id} holding status, progress and a
+    result summary. Pending ids live in a list; workers move them atomically
+    to a processing list while they run. A dedup key per (kind, user, payload)
+    makes enqueueing an identical pending task return the existing task
+    instead; a task with a different payload (e.g. an edited profile) is
+    queued on its own.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+
+    def _task_key(self, task_id: str) -> str:
+        return f"career:task:{task_id}"
+
+    def _dedup_key(self, kind: str, user_id: str, payload: Optional[Dict[str, Any]]) -> str:
+        digest = hashlib.sha256(json.dumps(payload or {}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        return f"career:tasks:dedup:{kind}:{user_id}:{digest}"
+
+    async def enqueue(self, kind: str, user_id: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a task, or return the identical task that is already pending"""
+        if kind not in TASK_KINDS:
+            raise ValueError(f"Unknown task kind '{kind}'")
+
+        task_id = uuid.uuid4().hex
+        dedup_key = self._dedup_key(kind, user_id, payload)
+        claimed = await self.client.set(dedup_key, task_id, nx=True, ex=settings.task_ttl_seconds)
+        if not claimed:
+            existing_id = await self.client.get(dedup_key)
+            existing = await self.get(existing_id) if existing_id else None
+            if existing and existing["status"] in ACTIVE_STATUSES:
+                return dict(existing, deduplicated=True)
+            # Stale dedup entry (task finished or expired): take it over
+            await self.client.set(dedup_key, task_id, ex=settings.task_ttl_seconds)
+
+        now = datetime.utcnow().isoformat()
+        task = {
+            "id": task_id,
+            "kind": kind,
+            "user_id": user_id,
+            "payload": json.dumps(payload or {}),
+            "status": "queued",
+            "progress": 0,
+            "stage": "queued",
+            "created_at": now,
+            "updated_at": now,
+        }
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._task_key(task_id), mapping=task)
+            pipe.expire(self._task_key(task_id), settings.task_ttl_seconds)
+            pipe.lpush(PENDING_KEY, task_id)
+            await pipe.execute()
+
+        return dict(self._decode(task), deduplicated=False)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        data = await self.client.hgetall(self._task_key(task_id))
+        return self._decode(data) if data else None
+
+    async def dequeue(self, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+        """Block until a task is available and claim it for this worker"""
+        task_id = await self.client.blmove(PENDING_KEY, PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+        if not task_id:
+            return None
+        task = await self.get(task_id)
+        if task is None:
+            # Expired before anyone picked it up
+            await self.client.lrem(PROCESSING_KEY, 1, task_id)
+            return None
+        await self.update(task_id, status="running", stage="started", progress=5)
+        task["status"] = "running"
+        return task
+
+    async def update(self, task_id: str, **fields):
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        await self.client.hset(self._task_key(task_id), mapping=fields)
+
+    async def complete(self, task: Dict[str, Any], result: Dict[str, Any]):
+        await self.update(
+            task["id"],
+            status="completed",
+            stage="done",
+            progress=100,
+            result=json.dumps(result)
+        )
+        await self._finish(task)
+
+    async def fail(self, task: Dict[str, Any], error: str):
+        await self.update(task["id"], status="failed", stage="failed", error=error)
+        await self._finish(task)
+
+    async def _finish(self, task: Dict[str, Any]):
+        dedup_key = self._dedup_key(task["kind"], task["user_id"], task.get("payload"))
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.lrem(PROCESSING_KEY, 1, task["id"])
+            pipe.expire(self._task_key(task["id"]), settings.task_result_ttl_seconds)
+            await pipe.execute()
+        # Only release the dedup slot if it still points at this task
+        if await self.client.get(dedup_key) == task["id"]:
+            await self.client.delete(dedup_key)
+
+    async def requeue_orphans(self) -> int:
+        """Move tasks left in processing by a crashed worker back to pending"""
+        moved = 0
+        while await self.client.lmove(PROCESSING_KEY, PENDING_KEY, "RIGHT", "LEFT"):
+            moved += 1
+        return moved
+
+    def _decode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        task = dict(data)
+        task["progress"] = int(task.get("progress", 0))
+        for field in ("payload", "result"):
+            if isinstance(task.get(field), str):
+                task[field] = json.loads(task[field])
+        return task
+
+
+_queue: Optional[TaskQueue] = None
+
+
+def get_task_queue() -> TaskQueue:
+    global _queue
+    if _queue is None:
+        _queue = TaskQueue()
+    return _queue
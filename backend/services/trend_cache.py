@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from config import get_settings
+from services.redis_guard import RedisCooldown, fail_fast_client
+from services.skills import canonicalize_skills
+
+settings = get_settings()
+
+REQUESTED_KEY = "career:trends:requested"
+LOCAL_MAX_ENTRIES = 10000
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_skill(skill: str) -> str:
+    return _WHITESPACE_RE.sub(" ", skill).strip().lower()
+
+
+def canonical_skills(skills: List[str]) -> List[str]:
+    """Sorted, de-duplicated, normalized skill list: the identity of a trend analysis.
+    Aliases map to their canonical skill first, so "k8s" and "Kubernetes" share an entry."""
+    return sorted({normalize_skill(s) for s in canonicalize_skills(skills)})
+
+
+class TrendCache:
+    """Precomputed market-trend analyses in Redis.
+
+    Analyses are stored per canonical skill set (career:trends:set:{digest})
+    and per individual skill (career:trends:skill:{skill}). A set seen for
+    the first time can then be answered from the analyses of its skills.
+    Every lookup records the set in a sorted set of recently requested
+    combinations, batched and written in the background every
+    trend_requested_flush_seconds. The background refresher regenerates those
+    when stale, so requests read precomputed text. A short in-process copy
+    sits in front of Redis, so a local hit makes no Redis call. Redis errors
+    degrade to the local copy (or a miss), and Redis is skipped for a cooldown
+    after one.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client or fail_fast_client()
+        self._local: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._redis = RedisCooldown("Trend cache")
+        self._requested: Dict[str, float] = {}
+        self._last_flush = 0.0
+        self._flushing: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.refreshed = 0
+
+    def _set_key(self, skills: List[str]) -> str:
+        digest = hashlib.sha1(json.dumps(skills).encode()).hexdigest()
+        return f"career:trends:set:{digest}"
+
+    def _skill_key(self, skill: str) -> str:
+        return f"career:trends:skill:{skill}"
+
+    async def _read(self, keys: List[str]) -> Dict[str, Dict[str, str]]:
+        now = time.monotonic()
+        found, missing = {}, []
+        for key in keys:
+            cached = self._local.get(key)
+            if cached and cached[0] > now:
+                found[key] = cached[1]
+            else:
+                missing.append(key)
+        if not missing or not self._redis.available():
+            return found
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in missing:
+                    pipe.hgetall(key)
+                values = await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            self._redis.failed(e)
+            return found
+        self._redis.succeeded()
+        if len(self._local) > LOCAL_MAX_ENTRIES:
+            self._local.clear()
+        for key, value in zip(missing, values):
+            if value:
+                found[key] = value
+                self._local[key] = (now + settings.trend_local_ttl_seconds, value)
+        return found
+
+    def _entry(self, text: str, skills: List[str]) -> Dict[str, str]:
+        return {"text": text, "skills": json.dumps(skills), "generated_at": str(time.time())}
+
+    async def _write(self, key: str, text: str, skills: List[str]):
+        entry = self._entry(text, skills)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=entry)
+            pipe.expire(key, int(settings.trend_cache_ttl_hours * 3600))
+            await pipe.execute()
+        self._local[key] = (time.monotonic() + settings.trend_local_ttl_seconds, entry)
+
+    async def get(self, skills: List[str]) -> Optional[str]:
+        """Trend text for a skill set: exact analysis, else one assembled from per-skill
+        analyses if they cover enough of the set, else None"""
+        canonical = canonical_skills(skills)
+        if not canonical:
+            return None
+        set_key = self._set_key(canonical)
+        entries = await self._read([set_key] + [self._skill_key(s) for s in canonical])
+        self._record_request(canonical)
+
+        if set_key in entries:
+            self.hits += 1
+            return entries[set_key]["text"]
+
+        covered = [s for s in canonical if self._skill_key(s) in entries]
+        if covered and len(covered) / len(canonical) >= settings.trend_partial_min_coverage:
+            self.partial_hits += 1
+            return "\n\n".join(
+                f"**{skill.title()}:** {entries[self._skill_key(skill)]['text']}" for skill in covered
+            )
+
+        self.misses += 1
+        return None
+
+    def _record_request(self, canonical: List[str]):
+        """Queue the set for the requested-combinations index; never waits on Redis"""
+        if len(self._requested) < LOCAL_MAX_ENTRIES:
+            self._requested[json.dumps(canonical)] = time.time()
+        if self._flushing and not self._flushing.done():
+            return
+        if time.monotonic() - self._last_flush < settings.trend_requested_flush_seconds:
+            return
+        self._last_flush = time.monotonic()
+        self._flushing = asyncio.create_task(self.flush_requested())
+
+    async def flush_requested(self):
+        """Write the queued requested sets in one ZADD"""
+        if not self._requested or not self._redis.available():
+            return
+        pending, self._requested = self._requested, {}
+        try:
+            await self.client.zadd(REQUESTED_KEY, pending)
+        except Exception as e:
+            self.errors += 1
+            self._redis.failed(e)
+            # Keep them for the next flush; sets requested meanwhile keep their newer time
+            for member, at in pending.items():
+                if len(self._requested) >= LOCAL_MAX_ENTRIES:
+                    break
+                self._requested.setdefault(member, at)
+            return
+        self._redis.succeeded()
+
+    async def put(self, skills: List[str], text: str):
+        canonical = canonical_skills(skills)
+        if not canonical or not text:
+            return
+        key = self._set_key(canonical)
+        if not self._redis.available():
+            self._local[key] = (time.monotonic() + settings.trend_local_ttl_seconds, self._entry(text, canonical))
+            return
+        try:
+            await self._write(key, text, canonical)
+        except Exception as e:
+            self.errors += 1
+            self._redis.failed(e)
+
+    async def _stale(self, keys: List[str]) -> List[str]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hget(key, "generated_at")
+            generated = await pipe.execute()
+        cutoff = time.time() - settings.trend_refresh_hours * 3600
+        return [key for key, at in zip(keys, generated) if not at or float(at) < cutoff]
+
+    async def refresh(
+        self,
+        generate_set: Callable[[List[str]], Awaitable[str]],
+        generate_skill: Callable[[str], Awaitable[str]]
+    ) -> Dict[str, int]:
+        """Regenerate stale analyses for recently requested skill sets and their skills.
+
+        At most trend_refresh_batch sets and as many skills per run, most recently
+        requested first, so one run's LLM cost is bounded.
+        """
+        now = time.time()
+        await self.client.zremrangebyscore(REQUESTED_KEY, 0, now - settings.trend_active_days * 86400)
+        requested = [json.loads(m) for m in await self.client.zrevrange(REQUESTED_KEY, 0, -1)]
+
+        set_keys = {self._set_key(skills): skills for skills in requested}
+        skill_keys = {self._skill_key(s): s for skills in requested for s in skills}
+        stale_sets = (await self._stale(list(set_keys)))[:settings.trend_refresh_batch]
+        stale_skills = (await self._stale(list(skill_keys)))[:settings.trend_refresh_batch]
+
+        semaphore = asyncio.Semaphore(settings.trend_refresh_concurrency)
+        failed = 0
+
+        async def regenerate(key: str, skills: List[str], generate: Callable[[], Awaitable[str]]):
+            nonlocal failed
+            async with semaphore:
+                try:
+                    text = await generate()
+                    await self._write(key, text, skills)
+                except Exception as e:
+                    failed += 1
+                    print(f"Error refreshing trends for {skills}: {e}")
+                    return
+            self.refreshed += 1
+
+        await asyncio.gather(
+            *(regenerate(key, set_keys[key], lambda s=set_keys[key]: generate_set(s)) for key in stale_sets),
+            *(regenerate(key, [skill_keys[key]], lambda s=skill_keys[key]: generate_skill(s)) for key in stale_skills)
+        )
+        return {
+            "requested_sets": len(requested),
+            "sets": len(stale_sets),
+            "skills": len(stale_skills),
+            "failed": failed
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "refreshed": self.refreshed
+        }
+
+
+_cache: Optional[TrendCache] = None
+
+
+def get_trend_cache() -> TrendCache:
+    global _cache
+    if _cache is None:
+        _cache = TrendCache()
+    return _cache
+
+
+def trend_cache_stats() -> Dict[str, int]:
+    return _cache.stats() if _cache else {}
@@ -0,0 +1,237 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import get_settings
+from services.deadline import run_with_deadline
+from services.job_index import JobEmbeddingIndex, claim_writer
+from services.supabase_client import supabase_client
+
+settings = get_settings()
+
+# Posting fields kept alongside each vector
+JOB_FIELDS = ("url", "title", "company", "location", "description", "posted", "content_hash")
+
+
+class PgVectorJobStore:
+    """Job embeddings in Postgres (job_postings.embedding) searched through an HNSW index"""
+
+    def __init__(self, client=None):
+        self.client = client or supabase_client
+
+    async def add_jobs(self, jobs: List[Dict[str, Any]], vectors: np.ndarray):
+        if not self.client or not jobs:
+            return
+        now = datetime.utcnow().isoformat()
+        rows = [
+            {
+                "url": job["url"],
+                "title": job.get("title", "Unknown Role"),
+                "company": job.get("company"),
+                "location": job.get("location"),
+                "description": job.get("description"),
+                "posted": job.get("posted"),
+                "content_hash": job.get("content_hash"),
+                "embedding": vector.tolist(),
+                "updated_at": now
+            }
+            for job, vector in zip(jobs, vectors)
+        ]
+        try:
+            query = self.client.table("job_postings").upsert(rows, on_conflict="url")
+            await run_with_deadline(asyncio.to_thread(query.execute))
+        except Exception as e:
+            print(f"Error indexing job postings: {e}")
+
+    async def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        if not self.client:
+            return []
+        try:
+            rpc = self.client.rpc("match_job_postings", {
+                "query_embedding": query.tolist(),
+                "match_count": k
+            })
+            result = await run_with_deadline(asyncio.to_thread(rpc.execute))
+            return result.data or []
+        except Exception as e:
+            print(f"Error searching job postings: {e}")
+            return []
+
+    async def get_jobs(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fully crawled postings (content_hash set) by URL"""
+        if not self.client or not urls:
+            return {}
+        try:
+            query = self.client.table("job_postings") \
+                .select(",".join(JOB_FIELDS)) \
+                .in_("url", urls) \
+                .not_.is_("content_hash", "null")
+            result = await run_with_deadline(asyncio.to_thread(query.execute))
+            return {row["url"]: row for row in result.data or []}
+        except Exception as e:
+            print(f"Error loading job postings: {e}")
+            return {}
+
+    async def save_profile_embedding(self, user_id: str, vector: np.ndarray):
+        if not self.client:
+            return
+        try:
+            query = self.client.table("profiles") \
+                .update({"skill_embeddings": vector.tolist()}) \
+                .eq("user_id", user_id)
+            await run_with_deadline(asyncio.to_thread(query.execute))
+        except Exception as e:
+            print(f"Error saving profile embedding: {e}")
+
+
+class InMemoryJobStore:
+    """Process-local job embeddings backed by a JobEmbeddingIndex.
+
+    Vectors are L2-normalized, so one matrix product scores every posting.
+    With job_index_path set the index is loaded memory-mapped at startup and
+    saved back periodically by one process (the first to claim the directory;
+    the others serve what they loaded). An unreadable snapshot is ignored.
+    Postings older than job_index_ttl_hours expire.
+    """
+
+    def __init__(self, dim: int, index: Optional[JobEmbeddingIndex] = None, path: Optional[str] = None):
+        self.dim = dim
+        self.path = path
+        if index is None and path:
+            try:
+                index = JobEmbeddingIndex.load(path)
+            except Exception as e:
+                # A broken snapshot must not take job search down with it
+                print(f"Ignoring unreadable job index at {path}: {e}")
+                index = None
+            if index is not None and index.dim != dim:
+                print(f"Ignoring saved job index at {path}: dim {index.dim} != {dim}")
+                index = None
+        if index is None:
+            index = JobEmbeddingIndex(dim, quantize=settings.job_index_quantize)
+        self.index = index
+        self.profiles: Dict[str, np.ndarray] = {}
+        self._last_saved = time.monotonic()
+        self._saving: Optional[asyncio.Task] = None
+
+    async def add_jobs(self, jobs: List[Dict[str, Any]], vectors: np.ndarray):
+        records = [{field: job.get(field) for field in JOB_FIELDS} for job in jobs]
+        # Postings seen again unchanged only refresh their expiry, so repeat
+        # searches do not copy a memory-mapped matrix into this worker's RAM
+        changed = [i for i, record in enumerate(records) if self.index.get(record["url"]) != record]
+        self.index.touch([record["url"] for record in records])
+        if changed:
+            self.index.add([records[i] for i in changed], np.asarray(vectors)[changed])
+        self.index.expire(time.time() - settings.job_index_ttl_hours * 3600)
+        self._maybe_save()
+
+    async def remove_jobs(self, urls: List[str]) -> int:
+        removed = self.index.remove(urls)
+        self._maybe_save()
+        return removed
+
+    async def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        return self.index.search(query, k)
+
+    async def search_batch(self, queries: np.ndarray, k: int) -> List[List[Dict[str, Any]]]:
+        return self.index.search_batch(queries, k)
+
+    async def get_jobs(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fully crawled postings (content_hash set) by URL"""
+        jobs = {}
+        for url in urls:
+            position = self.index.positions.get(url)
+            if position is not None and self.index.jobs[position].get("content_hash"):
+                jobs[url] = dict(self.index.jobs[position])
+        return jobs
+
+    async def save_profile_embedding(self, user_id: str, vector: np.ndarray):
+        self.profiles[user_id] = vector
+
+    def _maybe_save(self):
+        if not self.path or not self.index.dirty or not claim_writer(self.path):
+            return
+        if self._saving and not self._saving.done():
+            return
+        if time.monotonic() - self._last_saved < settings.job_index_save_interval_seconds:
+            return
+        self._last_saved = time.monotonic()
+        self._saving = asyncio.create_task(self.save())
+
+    async def save(self):
+        """Snapshot on the event loop, write the files off it"""
+        if not self.path or not claim_writer(self.path):
+            return
+        snapshot = self.index.snapshot()
+        self.index.dirty = False
+        try:
+            await asyncio.to_thread(JobEmbeddingIndex.write_snapshot, self.path, snapshot)
+        except Exception as e:
+            self.index.dirty = True
+            print(f"Error saving job index: {e}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class TieredJobStore:
+    """In-process index as a hot cache in front of pgvector.
+
+    Writes go to both; searches are served locally once the local index holds
+    at least k postings, otherwise they fall through to Postgres.
+    """
+
+    def __init__(self, local: InMemoryJobStore, remote: PgVectorJobStore):
+        self.local = local
+        self.remote = remote
+
+    async def add_jobs(self, jobs: List[Dict[str, Any]], vectors: np.ndarray):
+        await self.local.add_jobs(jobs, vectors)
+        await self.remote.add_jobs(jobs, vectors)
+
+    async def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        if len(self.local) >= k:
+            return await self.local.search(query, k)
+        return await self.remote.search(query, k)
+
+    async def get_jobs(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        jobs = await self.local.get_jobs(urls)
+        missing = [url for url in urls if url not in jobs]
+        if missing:
+            jobs.update(await self.remote.get_jobs(missing))
+        return jobs
+
+    async def save_profile_embedding(self, user_id: str, vector: np.ndarray):
+        await self.remote.save_profile_embedding(user_id, vector)
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+
+_store = None
+
+
+def get_job_store():
+    """pgvector when Supabase is configured (or forced), otherwise in-memory;
+    "tiered" puts the in-memory index in front of pgvector"""
+    global _store
+    if _store is None:
+        backend = settings.vector_backend
+        path = settings.job_index_path or None
+        if backend == "tiered" and supabase_client:
+            _store = TieredJobStore(InMemoryJobStore(settings.embedding_dim, path=path), PgVectorJobStore())
+        elif backend == "pgvector" or (backend == "auto" and supabase_client):
+            _store = PgVectorJobStore()
+        else:
+            _store = InMemoryJobStore(settings.embedding_dim, path=path)
+    return _store
+
+
+async def flush_job_store():
+    """Persist unsaved changes of the in-memory job index (no-op for pgvector)"""
+    store = getattr(_store, "local", _store)
+    if isinstance(store, InMemoryJobStore) and store.index.dirty:
+        await store.save()
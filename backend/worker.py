@@ -0,0 +1,165 @@
+# ============================================
+# backend/worker.py
+# Background worker for heavy agent workflows
+# Usage: python worker.py --concurrency 2 [--recover] [--refresh-interval 60] [--archive-interval 60] [--change-feed]
+# ============================================
+
+import argparse
+import asyncio
+import signal
+from typing import Any, Dict
+
+from agents.orchestrator import CareerOrchestrator
+from config import get_settings
+from services.deadline import Deadline, deadline_scope
+from services.embeddings import get_embedding_pipeline
+from services.change_feed import get_change_feed, rebuild_dashboard_counters
+from services.match_refresher import JobMatchRefresher
+from services.task_queue import TaskQueue, get_task_queue
+
+settings = get_settings()
+
+
+async def run_task(orchestrator: CareerOrchestrator, queue: TaskQueue, task: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one task and persist its results; returns a small summary for the status endpoint"""
+    task_id, kind, user_id = task["id"], task["kind"], task["user_id"]
+    payload = task.get("payload") or {}
+    memory = orchestrator.memory
+
+    if kind == "learning_roadmap":
+        await queue.update(task_id, stage="generating roadmap", progress=20)
+        plan = await orchestrator.generate_learning_roadmap(user_id)
+        await queue.update(task_id, stage="saving learning plan", progress=90)
+        await memory.save_learning_plan(user_id, plan)
+        return {
+            "weeks": len(plan.get("weeks", [])),
+            "milestones": len(plan.get("milestones", [])),
+            "resources": len(plan.get("resources", []))
+        }
+
+    if kind == "profile_analysis":
+        await queue.update(task_id, stage="loading profile", progress=10)
+        profile = payload.get("profile") or await memory.get_user_profile(user_id)
+        await queue.update(task_id, stage="analyzing profile", progress=20)
+        result = await orchestrator.analyze_profile(user_id, profile)
+        await queue.update(task_id, stage="saving profile", progress=90)
+        skills = result.get("current_skills", [])
+        await memory.save_user_profile(user_id, {"skills": skills})
+        await queue.update(task_id, stage="embedding skills", progress=95)
+        await get_embedding_pipeline().embed_profile(user_id, skills, profile.get("target_roles") or [])
+        return {
+            "skills": skills,
+            "skill_gaps": result.get("skill_gaps", []),
+            "analysis": result.get("final_response", "")
+        }
+
+    if kind == "job_matches":
+        await queue.update(task_id, stage="searching, scoring and saving jobs", progress=20)
+        jobs = await orchestrator.find_job_matches(user_id, refresh=True)
+        return {"jobs_found": len(jobs)}
+
+    raise ValueError(f"Unknown task kind '{kind}'")
+
+
+async def worker_loop(name: str, orchestrator: CareerOrchestrator, queue: TaskQueue, stop: asyncio.Event):
+    while not stop.is_set():
+        task = await queue.dequeue(timeout=2.0)
+        if task is None:
+            continue
+
+        print(f"[{name}] running {task['kind']} task {task['id']} for {task['user_id']}")
+        # Background work gets its own, longer budget than interactive requests
+        with deadline_scope(Deadline.after(settings.task_timeout_seconds)):
+            try:
+                result = await run_task(orchestrator, queue, task)
+            except Exception as e:
+                print(f"[{name}] task {task['id']} failed: {e}")
+                await queue.fail(task, str(e))
+            else:
+                await queue.complete(task, result)
+
+
+async def refresh_loop(orchestrator: CareerOrchestrator, interval_minutes: float, stop: asyncio.Event):
+    """Periodically recompute materialized job matches and cached market trends"""
+    refresher = JobMatchRefresher(orchestrator)
+    while not stop.is_set():
+        try:
+            summary = await refresher.refresh_active_users()
+            print(f"[refresher] job matches: {summary}")
+        except Exception as e:
+            print(f"[refresher] run failed: {e}")
+        try:
+            with deadline_scope(Deadline.after(settings.task_timeout_seconds)):
+                summary = await orchestrator.market_agent.refresh_trends()
+            print(f"[refresher] market trends: {summary}")
+        except Exception as e:
+            print(f"[refresher] trend refresh failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval_minutes * 60)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def archive_loop(orchestrator: CareerOrchestrator, interval_minutes: float, stop: asyncio.Event):
+    """Periodically archive idle conversation sessions (see migrations/007)"""
+    while not stop.is_set():
+        try:
+            while True:
+                summary = await orchestrator.memory.archive_idle_conversations()
+                print(f"[archiver] conversations: {summary}")
+                # A full batch means more idle sessions are waiting
+                if stop.is_set() or summary.get("sessions_archived", 0) < settings.conversation_archive_batch:
+                    break
+        except Exception as e:
+            print(f"[archiver] run failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval_minutes * 60)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main(concurrency: int, recover: bool, refresh_interval: float, archive_interval: float, change_feed: bool):
+    queue = get_task_queue()
+    orchestrator = CareerOrchestrator()
+
+    if recover:
+        moved = await queue.requeue_orphans()
+        print(f"Requeued {moved} orphaned task(s)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"Worker started with concurrency {concurrency}")
+    # Loops finish their current task before exiting on shutdown
+    loops = [worker_loop(f"worker-{i}", orchestrator, queue, stop) for i in range(concurrency)]
+    if refresh_interval > 0:
+        loops.append(refresh_loop(orchestrator, refresh_interval, stop))
+    if archive_interval > 0:
+        loops.append(archive_loop(orchestrator, archive_interval, stop))
+    if change_feed:
+        feed = get_change_feed()
+        if feed is None:
+            print("--change-feed ignored: CHANGE_FEED_DSN is not set")
+        else:
+            # Dashboard counters are shared in Redis, so one process rebuilds them
+            for table in ("job_matches", "learning_plans", "interview_sessions"):
+                feed.on(table, lambda event: rebuild_dashboard_counters(feed, event))
+            loops.append(feed.run(stop))
+    await asyncio.gather(*loops)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Career AI background worker")
+    parser.add_argument("--concurrency", type=int, default=settings.task_worker_concurrency)
+    parser.add_argument("--recover", action="store_true",
+                        help="Requeue tasks left in processing by a crashed worker (run on a single worker only)")
+    parser.add_argument("--refresh-interval", type=float, default=0,
+                        help="Minutes between job-match and market-trend refreshes (0 disables; run on one worker)")
+    parser.add_argument("--archive-interval", type=float, default=0,
+                        help="Minutes between idle-conversation archival passes (0 disables; run on one worker)")
+    parser.add_argument("--change-feed", action="store_true",
+                        help="Rebuild dashboard counters after edits made outside the API (run on one worker)")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.recover, args.refresh_interval, args.archive_interval, args.change_feed))
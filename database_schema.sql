@@ -10,24 +10,57 @@ CREATE TABLE IF NOT EXISTS profiles (
     skills TEXT[], -- Array of skills
     experience_level TEXT,
     target_roles TEXT[],
+    preferred_locations TEXT[] DEFAULT '{}',
     career_goal TEXT,
     resume_url TEXT,
-    skill_embeddings vector(1536), -- For pgvector similarity search (using Nomic/OpenAI dimensions)
+    skill_embeddings vector(768), -- For pgvector similarity search (Nomic Embed v1.5 dimensions)
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- 💬 Conversations
+-- 💬 Conversations (monthly partitions on created_at; see migrations/007)
 CREATE TABLE IF NOT EXISTS conversations (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
     user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
     session_id TEXT NOT NULL,
     user_message TEXT NOT NULL,
     ai_response TEXT NOT NULL,
     agent_used TEXT,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS conversations_default PARTITION OF conversations DEFAULT;
+
+-- History reads: one session, newest first (row bodies stay in the heap; btree
+-- entries are size-capped)
+CREATE INDEX IF NOT EXISTS conversations_user_session_recent_idx
+    ON conversations (user_id, session_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS conversations_created_user_idx
+    ON conversations (created_at) INCLUDE (user_id);
+
+-- Idle sessions, one row each. turns is [{user_message, ai_response, agent_used, created_at}], oldest first
+CREATE TABLE IF NOT EXISTS conversation_archives (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    session_id TEXT NOT NULL,
+    turns JSONB NOT NULL,
+    turn_count INTEGER NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    last_message_at TIMESTAMPTZ NOT NULL,
+    archived_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, session_id)
 );
 
+-- TOAST compresses turns either way; lz4 is faster than the default pglz where the server has it
+DO $$
+BEGIN
+    ALTER TABLE conversation_archives ALTER COLUMN turns SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    NULL;
+END;
+$$;
+
 -- 📊 Job Matches
 CREATE TABLE IF NOT EXISTS job_matches (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -38,9 +71,39 @@ CREATE TABLE IF NOT EXISTS job_matches (
     fit_score INTEGER,
     url TEXT,
     description TEXT,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    alternate_urls TEXT[] DEFAULT '{}', -- the same posting on other job boards
+    profile_fingerprint TEXT, -- skills/target_roles hash the matches were computed for
+    refreshed_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (user_id, url)
 );
 
+CREATE INDEX IF NOT EXISTS job_matches_user_fit_idx
+    ON job_matches (user_id, fit_score DESC NULLS LAST);
+
+CREATE INDEX IF NOT EXISTS job_matches_user_refreshed_idx
+    ON job_matches (user_id, refreshed_at);
+
+-- 🧭 Job Postings (embedded for similarity search)
+CREATE TABLE IF NOT EXISTS job_postings (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    description TEXT,
+    posted TEXT,
+    content_hash TEXT,  -- set once the full posting has been crawled
+    embedding vector(768),
+    expires_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS job_postings_embedding_hnsw_idx
+    ON job_postings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
 -- 🎯 Learning Roadmaps
 CREATE TABLE IF NOT EXISTS learning_plans (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -51,6 +114,9 @@ CREATE TABLE IF NOT EXISTS learning_plans (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+CREATE INDEX IF NOT EXISTS learning_plans_user_active_idx
+    ON learning_plans (user_id) WHERE status = 'active';
+
 -- 🎤 Interview Sessions
 CREATE TABLE IF NOT EXISTS interview_sessions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -62,7 +128,234 @@ CREATE TABLE IF NOT EXISTS interview_sessions (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Enable Realtime for all tables
+CREATE INDEX IF NOT EXISTS interview_sessions_user_created_idx
+    ON interview_sessions (user_id, created_at DESC) INCLUDE (role, score);
+
+-- 🔁 Users with recent conversations (batch job-match refresher)
+CREATE OR REPLACE FUNCTION active_user_ids(since TIMESTAMPTZ)
+RETURNS TABLE (user_id UUID)
+LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT c.user_id FROM conversations c WHERE c.created_at >= since;
+$$;
+
+-- 🗄️ Conversation partitions and idle-session archive (worker.py --archive-interval)
+-- Partitions conversations_YYYY_MM from from_month (default: this month)
+-- through months_ahead months from now
+CREATE OR REPLACE FUNCTION ensure_conversation_partitions(months_ahead INT DEFAULT 3, from_month DATE DEFAULT NULL)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month DATE := date_trunc('month', COALESCE(from_month, NOW()::date))::date;
+    last_month DATE := (date_trunc('month', NOW()) + make_interval(months => months_ahead))::date;
+    next_month DATE;
+    partition TEXT;
+    created INT := 0;
+BEGIN
+    WHILE month <= last_month LOOP
+        partition := 'conversations_' || to_char(month, 'YYYY_MM');
+        next_month := (month + INTERVAL '1 month')::date;
+        IF to_regclass(partition) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE conversations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM conversations_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved', month, next_month, partition);
+            EXECUTE format('ALTER TABLE conversations ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition, month, next_month);
+            created := created + 1;
+        END IF;
+        month := next_month;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+SELECT ensure_conversation_partitions();
+
+-- Move up to max_sessions sessions with no turn since idle_before into the
+-- archive. A session reopened after archival gets its new turns appended when
+-- it goes idle again.
+CREATE OR REPLACE FUNCTION archive_idle_conversations(idle_before TIMESTAMPTZ, max_sessions INT DEFAULT 500)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    archived INT;
+BEGIN
+    WITH candidates AS (
+        SELECT DISTINCT c.user_id, c.session_id
+        FROM conversations c
+        WHERE c.created_at < idle_before AND c.user_id IS NOT NULL
+    ),
+    idle AS (
+        SELECT s.user_id, s.session_id
+        FROM candidates s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM conversations r
+            WHERE r.user_id = s.user_id AND r.session_id = s.session_id AND r.created_at >= idle_before
+        )
+        LIMIT max_sessions
+    ),
+    moved AS (
+        -- Turns that arrive during the move are newer than idle_before and stay hot
+        DELETE FROM conversations c
+        USING idle i
+        WHERE c.user_id = i.user_id AND c.session_id = i.session_id AND c.created_at < idle_before
+        RETURNING c.*
+    )
+    INSERT INTO conversation_archives AS a (user_id, session_id, turns, turn_count, started_at, last_message_at)
+    SELECT user_id, session_id,
+           jsonb_agg(jsonb_build_object(
+               'user_message', user_message,
+               'ai_response', ai_response,
+               'agent_used', agent_used,
+               'created_at', created_at
+           ) ORDER BY created_at),
+           count(*), min(created_at), max(created_at)
+    FROM moved
+    GROUP BY user_id, session_id
+    ON CONFLICT (user_id, session_id) DO UPDATE SET
+        turns = a.turns || EXCLUDED.turns,
+        turn_count = a.turn_count + EXCLUDED.turn_count,
+        last_message_at = EXCLUDED.last_message_at,
+        archived_at = NOW();
+    GET DIAGNOSTICS archived = ROW_COUNT;
+    RETURN archived;
+END;
+$$;
+
+-- Detach and drop month partitions that ended before older_than and are now empty
+CREATE OR REPLACE FUNCTION drop_empty_conversation_partitions(older_than TIMESTAMPTZ)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition TEXT;
+    has_rows BOOLEAN;
+    dropped INT := 0;
+BEGIN
+    FOR partition IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'conversations'::regclass
+          AND child.relname ~ '^conversations_\d{4}_\d{2}$'
+          AND to_date(substring(child.relname FROM 15), 'YYYY_MM') + INTERVAL '1 month' <= older_than
+    LOOP
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I)', partition) INTO has_rows;
+        IF NOT has_rows THEN
+            EXECUTE format('ALTER TABLE conversations DETACH PARTITION %I', partition);
+            EXECUTE format('DROP TABLE %I', partition);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$;
+
+-- One maintenance pass: partitions ahead, archive idle sessions, drop emptied months
+CREATE OR REPLACE FUNCTION maintain_conversations(idle_before TIMESTAMPTZ, max_sessions INT DEFAULT 500, months_ahead INT DEFAULT 3)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    created INT := ensure_conversation_partitions(months_ahead);
+    archived INT := archive_idle_conversations(idle_before, max_sessions);
+BEGIN
+    RETURN jsonb_build_object(
+        'partitions_created', created,
+        'sessions_archived', archived,
+        'partitions_dropped', drop_empty_conversation_partitions(idle_before)
+    );
+END;
+$$;
+
+-- Newest p_limit turns of a session, newest first, from the hot table and the archive
+CREATE OR REPLACE FUNCTION conversation_history(p_user_id UUID, p_session_id TEXT, p_limit INT DEFAULT 10)
+RETURNS TABLE (user_message TEXT, ai_response TEXT, created_at TIMESTAMPTZ)
+LANGUAGE sql STABLE AS $$
+    (SELECT c.user_message, c.ai_response, c.created_at
+     FROM conversations c
+     WHERE c.user_id = p_user_id AND c.session_id = p_session_id
+     ORDER BY c.created_at DESC
+     LIMIT p_limit)
+    UNION ALL
+    (SELECT t->>'user_message', t->>'ai_response', (t->>'created_at')::timestamptz
+     FROM conversation_archives a, jsonb_array_elements(a.turns) WITH ORDINALITY AS e(t, n)
+     WHERE a.user_id = p_user_id AND a.session_id = p_session_id
+     ORDER BY e.n DESC
+     LIMIT p_limit)
+    ORDER BY created_at DESC
+    LIMIT p_limit;
+$$;
+
+-- 🧭 Top-K postings for a query embedding / a user's stored skill embedding
+CREATE OR REPLACE FUNCTION match_job_postings(query_embedding vector(768), match_count INT DEFAULT 10)
+RETURNS TABLE (
+    url TEXT, title TEXT, company TEXT, location TEXT, description TEXT, similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT p.url, p.title, p.company, p.location, p.description,
+           1 - (p.embedding <=> query_embedding) AS similarity
+    FROM job_postings p
+    WHERE p.embedding IS NOT NULL
+      AND (p.expires_at IS NULL OR p.expires_at > NOW())
+    ORDER BY p.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
+
+CREATE OR REPLACE FUNCTION match_job_postings_for_user(p_user_id UUID, match_count INT DEFAULT 10)
+RETURNS TABLE (
+    url TEXT, title TEXT, company TEXT, location TEXT, description TEXT, similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.*
+    FROM profiles pr,
+         LATERAL match_job_postings(pr.skill_embeddings, match_count) m
+    WHERE pr.user_id = p_user_id AND pr.skill_embeddings IS NOT NULL;
+$$;
+
+-- 📣 Row-change notifications (LISTEN career_cache) for backend cache invalidation;
+-- "external" is false for service-role writes, whose counters the backend keeps itself
+CREATE OR REPLACE FUNCTION notify_cache_change()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    row_user_id UUID;
+    claims JSONB := NULLIF(current_setting('request.jwt.claims', true), '')::jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_user_id := OLD.user_id;
+    ELSE
+        row_user_id := NEW.user_id;
+    END IF;
+    PERFORM pg_notify('career_cache', json_build_object(
+        'table', TG_TABLE_NAME,
+        'user_id', row_user_id,
+        'external', COALESCE(claims->>'role', '') <> 'service_role'
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS profiles_cache_change ON profiles;
+CREATE TRIGGER profiles_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON profiles
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS job_matches_cache_change ON job_matches;
+CREATE TRIGGER job_matches_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON job_matches
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS learning_plans_cache_change ON learning_plans;
+CREATE TRIGGER learning_plans_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON learning_plans
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS interview_sessions_cache_change ON interview_sessions;
+CREATE TRIGGER interview_sessions_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON interview_sessions
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+-- Enable Realtime for all tables (partitioned tables publish under the parent name)
+ALTER PUBLICATION supabase_realtime SET (publish_via_partition_root = true);
 ALTER PUBLICATION supabase_realtime ADD TABLE profiles;
 ALTER PUBLICATION supabase_realtime ADD TABLE conversations;
 ALTER PUBLICATION supabase_realtime ADD TABLE job_matches;
@@ -0,0 +1,25 @@
+-- 📊 Materialized per-user job matches
+-- Read paths serve job_matches ordered by fit_score; a batch refresher
+-- (backend/services/match_refresher.py) upserts them for active users.
+
+ALTER TABLE job_matches ADD COLUMN IF NOT EXISTS profile_fingerprint TEXT;
+ALTER TABLE job_matches ADD COLUMN IF NOT EXISTS refreshed_at TIMESTAMPTZ DEFAULT NOW();
+
+-- One row per posting per user so refreshes can upsert in place
+DELETE FROM job_matches a
+    USING job_matches b
+    WHERE a.user_id = b.user_id AND a.url = b.url
+      AND (a.created_at, a.id) < (b.created_at, b.id);
+ALTER TABLE job_matches
+    ADD CONSTRAINT job_matches_user_url_key UNIQUE (user_id, url);
+
+-- Dashboard read path: one user's matches, best first
+CREATE INDEX IF NOT EXISTS job_matches_user_fit_idx
+    ON job_matches (user_id, fit_score DESC NULLS LAST);
+
+-- Users with recent conversations, for the batch refresher
+CREATE OR REPLACE FUNCTION active_user_ids(since TIMESTAMPTZ)
+RETURNS TABLE (user_id UUID)
+LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT c.user_id FROM conversations c WHERE c.created_at >= since;
+$$;
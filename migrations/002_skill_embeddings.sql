@@ -0,0 +1,51 @@
+-- 🧭 Skill-embedding similarity search (pgvector)
+-- Profiles and job postings are embedded with Nomic Embed v1.5 (768 dims).
+-- skill_embeddings has never been populated, so its type can change in place.
+
+ALTER TABLE profiles ALTER COLUMN skill_embeddings TYPE vector(768);
+
+-- Job postings ingested from search/crawls, one row per URL
+CREATE TABLE IF NOT EXISTS job_postings (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    description TEXT,
+    embedding vector(768),
+    expires_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Approximate nearest-neighbour index (cosine distance)
+CREATE INDEX IF NOT EXISTS job_postings_embedding_hnsw_idx
+    ON job_postings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Top-K postings for a query embedding
+CREATE OR REPLACE FUNCTION match_job_postings(query_embedding vector(768), match_count INT DEFAULT 10)
+RETURNS TABLE (
+    url TEXT, title TEXT, company TEXT, location TEXT, description TEXT, similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT p.url, p.title, p.company, p.location, p.description,
+           1 - (p.embedding <=> query_embedding) AS similarity
+    FROM job_postings p
+    WHERE p.embedding IS NOT NULL
+      AND (p.expires_at IS NULL OR p.expires_at > NOW())
+    ORDER BY p.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
+
+-- Top-K postings for a user's stored skill embedding (single query, no round trip for the vector)
+CREATE OR REPLACE FUNCTION match_job_postings_for_user(p_user_id UUID, match_count INT DEFAULT 10)
+RETURNS TABLE (
+    url TEXT, title TEXT, company TEXT, location TEXT, description TEXT, similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.*
+    FROM profiles pr,
+         LATERAL match_job_postings(pr.skill_embeddings, match_count) m
+    WHERE pr.user_id = p_user_id AND pr.skill_embeddings IS NOT NULL;
+$$;
@@ -0,0 +1,6 @@
+-- 🕷️ Full job postings crawled through Firecrawl
+-- content_hash marks a row as fully crawled (search snippets leave it NULL) and
+-- lets the ingestion pipeline skip URLs it has already fetched.
+
+ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS posted TEXT;
+ALTER TABLE job_postings ADD COLUMN IF NOT EXISTS content_hash TEXT;
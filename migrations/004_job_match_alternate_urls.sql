@@ -0,0 +1,4 @@
+-- 🔗 Near-duplicate postings collapse into one match
+-- The canonical posting keeps its url; copies syndicated to other boards are listed here.
+
+ALTER TABLE job_matches ADD COLUMN IF NOT EXISTS alternate_urls TEXT[] DEFAULT '{}';
@@ -0,0 +1,4 @@
+-- 📍 Preferred job locations
+-- The job search planner issues one query per role and location.
+
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS preferred_locations TEXT[] DEFAULT '{}';
@@ -0,0 +1,28 @@
+-- 🗂️ Indexes for each MemoryService access path
+-- Before this migration, conversations, learning_plans and interview_sessions had
+-- only primary keys, so every per-user read scanned the whole table.
+-- backend/benchmarks/query_plans.py seeds a synthetic dataset and compares
+-- EXPLAIN ANALYZE output with and without these indexes.
+
+-- get_conversation_history: one session, newest first, LIMIT n.
+-- The index walks straight to the n newest rows. user_message and ai_response
+-- are not INCLUDEd: btree entries are capped at ~2.7 kB, and long replies would
+-- fail to insert.
+CREATE INDEX IF NOT EXISTS conversations_user_session_recent_idx
+    ON conversations (user_id, session_id, created_at DESC);
+
+-- active_user_ids(since): range on created_at answered index-only
+CREATE INDEX IF NOT EXISTS conversations_created_user_idx
+    ON conversations (created_at) INCLUDE (user_id);
+
+-- save_job_matches_bulk prune: the user's rows older than this refresh
+CREATE INDEX IF NOT EXISTS job_matches_user_refreshed_idx
+    ON job_matches (user_id, refreshed_at);
+
+-- save_learning_plan retires the user's active plan
+CREATE INDEX IF NOT EXISTS learning_plans_user_active_idx
+    ON learning_plans (user_id) WHERE status = 'active';
+
+-- Per-user interview history and dashboard counts, newest first
+CREATE INDEX IF NOT EXISTS interview_sessions_user_created_idx
+    ON interview_sessions (user_id, created_at DESC) INCLUDE (role, score);
@@ -0,0 +1,211 @@
+-- 🗄️ Monthly conversation partitions and a compressed archive for idle sessions
+-- conversations is range-partitioned on created_at, one partition per month.
+-- The worker (python worker.py --archive-interval ...) calls maintain_conversations().
+-- That call moves sessions idle longer than conversation_archive_idle_days into
+-- conversation_archives (one lz4-compressed JSONB row per session). Monthly
+-- partitions left empty by the move are dropped whole, so the hot table and its
+-- vacuum work stay proportional to recent activity. conversation_history()
+-- reads both, so an archived session can be reopened.
+
+ALTER TABLE conversations RENAME TO conversations_unpartitioned;
+ALTER INDEX conversations_pkey RENAME TO conversations_unpartitioned_pkey;
+ALTER INDEX IF EXISTS conversations_user_session_recent_idx RENAME TO conversations_unpartitioned_recent_idx;
+ALTER INDEX IF EXISTS conversations_created_user_idx RENAME TO conversations_unpartitioned_created_idx;
+
+-- The partition key has to be part of the primary key
+CREATE TABLE conversations (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    session_id TEXT NOT NULL,
+    user_message TEXT NOT NULL,
+    ai_response TEXT NOT NULL,
+    agent_used TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows for months that have no partition yet (maintenance fell behind).
+-- ensure_conversation_partitions() moves them out when it creates the month.
+CREATE TABLE conversations_default PARTITION OF conversations DEFAULT;
+
+CREATE INDEX conversations_user_session_recent_idx
+    ON conversations (user_id, session_id, created_at DESC);
+CREATE INDEX conversations_created_user_idx
+    ON conversations (created_at) INCLUDE (user_id);
+
+-- Partitions conversations_YYYY_MM from from_month (default: this month)
+-- through months_ahead months from now
+CREATE OR REPLACE FUNCTION ensure_conversation_partitions(months_ahead INT DEFAULT 3, from_month DATE DEFAULT NULL)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month DATE := date_trunc('month', COALESCE(from_month, NOW()::date))::date;
+    last_month DATE := (date_trunc('month', NOW()) + make_interval(months => months_ahead))::date;
+    next_month DATE;
+    partition TEXT;
+    created INT := 0;
+BEGIN
+    WHILE month <= last_month LOOP
+        partition := 'conversations_' || to_char(month, 'YYYY_MM');
+        next_month := (month + INTERVAL '1 month')::date;
+        IF to_regclass(partition) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE conversations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM conversations_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved', month, next_month, partition);
+            EXECUTE format('ALTER TABLE conversations ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition, month, next_month);
+            created := created + 1;
+        END IF;
+        month := next_month;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+SELECT ensure_conversation_partitions(3, (SELECT min(created_at)::date FROM conversations_unpartitioned));
+
+INSERT INTO conversations (id, user_id, session_id, user_message, ai_response, agent_used, created_at)
+SELECT id, user_id, session_id, user_message, ai_response, agent_used, COALESCE(created_at, NOW())
+FROM conversations_unpartitioned;
+
+DROP TABLE conversations_unpartitioned;
+
+-- Idle sessions, one row each. turns is [{user_message, ai_response, agent_used, created_at}], oldest first
+CREATE TABLE IF NOT EXISTS conversation_archives (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    session_id TEXT NOT NULL,
+    turns JSONB NOT NULL,
+    turn_count INTEGER NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    last_message_at TIMESTAMPTZ NOT NULL,
+    archived_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, session_id)
+);
+
+-- TOAST compresses turns either way; lz4 is faster than the default pglz where the server has it
+DO $$
+BEGIN
+    ALTER TABLE conversation_archives ALTER COLUMN turns SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    NULL;
+END;
+$$;
+
+-- Move up to max_sessions sessions with no turn since idle_before into the
+-- archive. A session reopened after archival gets its new turns appended when
+-- it goes idle again.
+CREATE OR REPLACE FUNCTION archive_idle_conversations(idle_before TIMESTAMPTZ, max_sessions INT DEFAULT 500)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    archived INT;
+BEGIN
+    WITH candidates AS (
+        SELECT DISTINCT c.user_id, c.session_id
+        FROM conversations c
+        WHERE c.created_at < idle_before AND c.user_id IS NOT NULL
+    ),
+    idle AS (
+        SELECT s.user_id, s.session_id
+        FROM candidates s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM conversations r
+            WHERE r.user_id = s.user_id AND r.session_id = s.session_id AND r.created_at >= idle_before
+        )
+        LIMIT max_sessions
+    ),
+    moved AS (
+        -- Turns that arrive during the move are newer than idle_before and stay hot
+        DELETE FROM conversations c
+        USING idle i
+        WHERE c.user_id = i.user_id AND c.session_id = i.session_id AND c.created_at < idle_before
+        RETURNING c.*
+    )
+    INSERT INTO conversation_archives AS a (user_id, session_id, turns, turn_count, started_at, last_message_at)
+    SELECT user_id, session_id,
+           jsonb_agg(jsonb_build_object(
+               'user_message', user_message,
+               'ai_response', ai_response,
+               'agent_used', agent_used,
+               'created_at', created_at
+           ) ORDER BY created_at),
+           count(*), min(created_at), max(created_at)
+    FROM moved
+    GROUP BY user_id, session_id
+    ON CONFLICT (user_id, session_id) DO UPDATE SET
+        turns = a.turns || EXCLUDED.turns,
+        turn_count = a.turn_count + EXCLUDED.turn_count,
+        last_message_at = EXCLUDED.last_message_at,
+        archived_at = NOW();
+    GET DIAGNOSTICS archived = ROW_COUNT;
+    RETURN archived;
+END;
+$$;
+
+-- Detach and drop month partitions that ended before older_than and are now empty
+CREATE OR REPLACE FUNCTION drop_empty_conversation_partitions(older_than TIMESTAMPTZ)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition TEXT;
+    has_rows BOOLEAN;
+    dropped INT := 0;
+BEGIN
+    FOR partition IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'conversations'::regclass
+          AND child.relname ~ '^conversations_\d{4}_\d{2}$'
+          AND to_date(substring(child.relname FROM 15), 'YYYY_MM') + INTERVAL '1 month' <= older_than
+    LOOP
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I)', partition) INTO has_rows;
+        IF NOT has_rows THEN
+            EXECUTE format('ALTER TABLE conversations DETACH PARTITION %I', partition);
+            EXECUTE format('DROP TABLE %I', partition);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN dropped;
+END;
+$$;
+
+-- One maintenance pass: partitions ahead, archive idle sessions, drop emptied months
+CREATE OR REPLACE FUNCTION maintain_conversations(idle_before TIMESTAMPTZ, max_sessions INT DEFAULT 500, months_ahead INT DEFAULT 3)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    created INT := ensure_conversation_partitions(months_ahead);
+    archived INT := archive_idle_conversations(idle_before, max_sessions);
+BEGIN
+    RETURN jsonb_build_object(
+        'partitions_created', created,
+        'sessions_archived', archived,
+        'partitions_dropped', drop_empty_conversation_partitions(idle_before)
+    );
+END;
+$$;
+
+-- Newest p_limit turns of a session, newest first, from the hot table and the archive
+CREATE OR REPLACE FUNCTION conversation_history(p_user_id UUID, p_session_id TEXT, p_limit INT DEFAULT 10)
+RETURNS TABLE (user_message TEXT, ai_response TEXT, created_at TIMESTAMPTZ)
+LANGUAGE sql STABLE AS $$
+    (SELECT c.user_message, c.ai_response, c.created_at
+     FROM conversations c
+     WHERE c.user_id = p_user_id AND c.session_id = p_session_id
+     ORDER BY c.created_at DESC
+     LIMIT p_limit)
+    UNION ALL
+    (SELECT t->>'user_message', t->>'ai_response', (t->>'created_at')::timestamptz
+     FROM conversation_archives a, jsonb_array_elements(a.turns) WITH ORDINALITY AS e(t, n)
+     WHERE a.user_id = p_user_id AND a.session_id = p_session_id
+     ORDER BY e.n DESC
+     LIMIT p_limit)
+    ORDER BY created_at DESC
+    LIMIT p_limit;
+$$;
+
+-- Realtime publishes changes under the parent table name rather than per partition
+ALTER PUBLICATION supabase_realtime SET (publish_via_partition_root = true);
+ALTER PUBLICATION supabase_realtime ADD TABLE conversations;
@@ -0,0 +1,54 @@
+-- 📣 Row-change notifications for backend caches
+-- Every insert, update or delete on profiles, job_matches, learning_plans and
+-- interview_sessions sends {"table", "user_id", "external"} on the career_cache
+-- channel. backend/services/change_feed.py LISTENs on a direct (session-mode)
+-- connection. Web workers invalidate their in-process caches (auth user
+-- records, live chat sessions). worker.py --change-feed rebuilds the Redis
+-- dashboard counters.
+--
+-- "external" is false for writes made with the service role. The backend
+-- keeps its counters in step itself, so only writes made elsewhere (the
+-- frontend through Supabase, SQL consoles) need a rebuild. Postgres delivers
+-- identical payloads once per transaction, so a bulk upsert of one user's
+-- matches sends one notification.
+
+CREATE OR REPLACE FUNCTION notify_cache_change()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    row_user_id UUID;
+    claims JSONB := NULLIF(current_setting('request.jwt.claims', true), '')::jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_user_id := OLD.user_id;
+    ELSE
+        row_user_id := NEW.user_id;
+    END IF;
+    PERFORM pg_notify('career_cache', json_build_object(
+        'table', TG_TABLE_NAME,
+        'user_id', row_user_id,
+        'external', COALESCE(claims->>'role', '') <> 'service_role'
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS profiles_cache_change ON profiles;
+CREATE TRIGGER profiles_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON profiles
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS job_matches_cache_change ON job_matches;
+CREATE TRIGGER job_matches_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON job_matches
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS learning_plans_cache_change ON learning_plans;
+CREATE TRIGGER learning_plans_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON learning_plans
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();
+
+DROP TRIGGER IF EXISTS interview_sessions_cache_change ON interview_sessions;
+CREATE TRIGGER interview_sessions_cache_change
+    AFTER INSERT OR UPDATE OR DELETE ON interview_sessions
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_change();